@@ -0,0 +1,149 @@
+"""
+Benchmark for cold start after an idle shutdown.
+
+Measures how long a fresh interpreter takes to import the app, failing
+(exit status 1) when the median exceeds the import-time budget. When
+uvicorn is installed it then runs src.launcher on a free port and
+measures time to first byte of GET /health three ways: the first
+request, which starts the backend; a request to the running backend;
+and a request after the backend was stopped the way idle-monitor.sh
+stops it. Run from the backend directory:
+
+    python -m benchmarks.bench_cold_start --runs 5 --budget-ms 1000
+"""
+
+import argparse
+import importlib.util
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+_IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import src.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def _environment(workdir: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")]))
+    env.setdefault("JOB_STORAGE_BACKEND", "sqlite")
+    env.setdefault("JOB_STORAGE_PATH", os.path.join(workdir, "jobs.sqlite3"))
+    env.setdefault("JOB_NOTIFY_DIR", os.path.join(workdir, "workers"))
+    return env
+
+
+def _import_times(runs: int, workdir: str) -> list:
+    times = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SNIPPET],
+            cwd=workdir,
+            env=_environment(workdir),
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return times
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _time_to_first_byte(port: int, timeout: float = 60.0) -> float:
+    started = time.perf_counter()
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as conn:
+        conn.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+        first = conn.recv(1)
+        elapsed = time.perf_counter() - started
+        response = first + conn.recv(65536)
+    if not response.startswith(b"HTTP/1.1 200"):
+        raise AssertionError(f"Unexpected response: {response[:80]!r}")
+    return elapsed
+
+
+def _listening(port: int) -> bool:
+    """Check for a listener without connecting, which would start the backend."""
+    with open("/proc/net/tcp") as f:
+        return any(
+            line.split()[1].endswith(f":{port:04X}") and line.split()[3] == "0A"
+            for line in f.readlines()[1:]
+        )
+
+
+def _wait_for(predicate, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Timed out waiting for the backend")
+        time.sleep(0.05)
+
+
+def _launcher_ttfb(workdir: str) -> dict:
+    port = _free_port()
+    pid_file = os.path.join(workdir, "backend-worker.pid")
+    launcher = subprocess.Popen(
+        [sys.executable, "-m", "src.launcher", "--host", "127.0.0.1", "--port", str(port), "--pid-file", pid_file],
+        cwd=workdir,
+        env=_environment(workdir),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        results = {}
+        # The launcher only needs a moment to bind; the backend is down until we connect
+        _wait_for(lambda: _listening(port), 10)
+        results["cold"] = _time_to_first_byte(port)
+        results["warm"] = _time_to_first_byte(port)
+        _stop_backend(pid_file)
+        results["after_idle_shutdown"] = _time_to_first_byte(port)
+        return results
+    finally:
+        launcher.send_signal(signal.SIGTERM)
+        launcher.wait(timeout=30)
+
+
+def _stop_backend(pid_file: str) -> None:
+    """Stop the running backend like idle-monitor.sh does and wait for it to exit."""
+    with open(pid_file) as f:
+        os.kill(int(f.read()), signal.SIGTERM)
+    _wait_for(lambda: not os.path.exists(pid_file), 30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time the import in")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="Largest acceptable median import time")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        times = _import_times(args.runs, workdir)
+        median_ms = statistics.median(times) * 1000
+        print(f"import src.main         median {median_ms:7.1f} ms  max {max(times) * 1000:7.1f} ms  "
+              f"(budget {args.budget_ms:.0f} ms)")
+        
+        if importlib.util.find_spec("uvicorn") is None:
+            print("uvicorn is not installed; skipping time to first byte")
+        else:
+            for label, seconds in _launcher_ttfb(workdir).items():
+                print(f"  ttfb {label:<20} {seconds * 1000:7.1f} ms")
+    
+    if median_ms > args.budget_ms:
+        print(f"FAIL: import time over budget by {median_ms - args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
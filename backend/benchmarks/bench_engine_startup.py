@@ -0,0 +1,90 @@
+"""
+Benchmark comparing per-call latency of the CLI and pooled yt-dlp engines.
+
+Uses the stub yt_dlp package in benchmarks/stubs, which simulates the
+import cost of the real extractor registry, so it runs offline. Run from
+the backend directory:
+
+    python -m benchmarks.bench_engine_startup --calls 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+STUBS_DIR = Path(__file__).resolve().parent / "stubs"
+
+# Engines and their workers must import the stub instead of the real yt_dlp
+os.environ["PYTHONPATH"] = os.pathsep.join(
+    filter(None, [str(STUBS_DIR), os.environ.get("PYTHONPATH")])
+)
+os.environ["YTDLP_COMMAND"] = f"{sys.executable} -m yt_dlp"
+
+from src.models.download_job import DownloadJob
+from src.models.download_request import DownloadRequest
+from src.services.ytdlp_engine import CliEngine, PooledEngine
+from src.services.ytdlp_service import YtDlpService
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def _summary(samples: list) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (
+        f"mean {statistics.mean(samples) * 1000:8.1f} ms  "
+        f"p50 {statistics.median(samples) * 1000:8.1f} ms  "
+        f"p95 {p95 * 1000:8.1f} ms"
+    )
+
+
+async def _measure(engine, calls: int, download_dir: str) -> dict:
+    service = YtDlpService(download_dir, engine=engine)
+    
+    started = time.perf_counter()
+    await engine.start()
+    warmup = time.perf_counter() - started
+    
+    metadata = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await engine.extract_info(URL)
+        metadata.append(time.perf_counter() - started)
+    
+    downloads = []
+    for _ in range(calls):
+        request = DownloadRequest(url=URL, format="video")
+        job = DownloadJob(request_id=request.id)
+        started = time.perf_counter()
+        await service.download_video(request, job)
+        downloads.append(time.perf_counter() - started)
+    
+    await engine.stop()
+    return {"warmup": warmup, "metadata": metadata, "download": downloads}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as download_dir:
+        engines = {
+            "cli": CliEngine(),
+            "pool": PooledEngine(size=args.pool_size),
+        }
+        for name, engine in engines.items():
+            results = await _measure(engine, args.calls, download_dir)
+            print(f"{name} engine (start-up {results['warmup'] * 1000:.1f} ms)")
+            print(f"  extract_info  {_summary(results['metadata'])}")
+            print(f"  download      {_summary(results['download'])}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
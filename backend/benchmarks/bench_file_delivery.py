@@ -0,0 +1,101 @@
+"""
+Benchmark for serving completed downloads to many concurrent clients.
+
+Drives RangeFileResponse directly through the ASGI interface, so it
+measures the cost of producing the response body without a network
+stack. Each client fetches either the whole file or a series of ranges.
+Run from the backend directory:
+
+    python -m benchmarks.bench_file_delivery --size-mb 512 --clients 32
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from starlette.responses import FileResponse
+
+from src.api.responses import RangeFileResponse
+
+
+class _Sink:
+    """ASGI send callable that counts body bytes."""
+    
+    def __init__(self):
+        self.status = None
+        self.bytes = 0
+    
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            self.bytes += len(message.get("body", b""))
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _serve(response, sink: _Sink) -> None:
+    scope = {"type": "http", "method": "GET", "headers": []}
+    await response(scope, _receive, sink)
+
+
+async def _client(path: str, size: int, ranged: bool, requests: int, starlette: bool) -> int:
+    total = 0
+    for _ in range(requests):
+        sink = _Sink()
+        if starlette:
+            response = FileResponse(path, media_type="video/mp4")
+        else:
+            headers = {}
+            if ranged:
+                # Seek somewhere and read a few MB, like a video player would
+                start = random.randrange(0, max(1, size - 4 * 1024 * 1024))
+                headers["range"] = f"bytes={start}-{start + 4 * 1024 * 1024 - 1}"
+            response = RangeFileResponse(path, headers, filename="bench.mp4")
+        await _serve(response, sink)
+        total += sink.bytes
+    return total
+
+
+async def _run(path: str, size: int, clients: int, requests: int, ranged: bool, starlette: bool) -> float:
+    started = time.perf_counter()
+    totals = await asyncio.gather(*(
+        _client(path, size, ranged, requests, starlette) for _ in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+    return sum(totals) / elapsed / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of the served file")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=2, help="Requests per client")
+    args = parser.parse_args()
+    
+    size = args.size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.mp4")
+        with open(path, "wb") as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(args.size_mb):
+                f.write(block)
+        
+        print(f"{args.clients} clients x {args.requests} requests, {args.size_mb} MB file")
+        cases = [
+            ("starlette FileResponse, full", False, True),
+            ("RangeFileResponse, full", False, False),
+            ("RangeFileResponse, 4 MB ranges", True, False)
+        ]
+        for label, ranged, starlette in cases:
+            throughput = asyncio.run(_run(path, size, args.clients, args.requests, ranged, starlette))
+            print(f"  {label:32} {throughput:10.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
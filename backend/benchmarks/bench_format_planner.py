@@ -0,0 +1,109 @@
+"""
+Benchmark for format planning.
+
+Plans video downloads of a ten-minute video with a YouTube-like format
+list (one progressive 360p file, video-only H.264/VP9/AV1 up to 1080p,
+and audio-only tracks) under several constraints. For each it reports
+the bytes the planned formats transfer and whether a merge is needed,
+next to yt-dlp's usual choice for the same height limit (the highest
+bitrate video plus the best audio), and the time one plan takes.
+Run from the backend directory:
+
+    python -m benchmarks.bench_format_planner --plans 20000
+"""
+
+import argparse
+import time
+
+from src.models.download_request import DownloadRequest
+from src.models.video_metadata import FormatInfo, VideoMetadata
+from src.services.format_planner import FormatPlanner
+
+DURATION = 600
+
+# (format_id, ext, height, vcodec, acodec, kbit/s)
+_FORMATS = [
+    ("139", "m4a", None, None, "mp4a.40.5", 49),
+    ("140", "m4a", None, None, "mp4a.40.2", 130),
+    ("251", "webm", None, None, "opus", 135),
+    ("18", "mp4", 360, "avc1.42001E", "mp4a.40.2", 600),
+    ("160", "mp4", 144, "avc1.4d400c", None, 110),
+    ("278", "webm", 144, "vp9", None, 95),
+    ("134", "mp4", 360, "avc1.4d401e", None, 400),
+    ("243", "webm", 360, "vp9", None, 320),
+    ("135", "mp4", 480, "avc1.4d401f", None, 750),
+    ("244", "webm", 480, "vp9", None, 600),
+    ("397", "mp4", 480, "av01.0.04M.08", None, 450),
+    ("136", "mp4", 720, "avc1.4d401f", None, 1500),
+    ("247", "webm", 720, "vp9", None, 1200),
+    ("398", "mp4", 720, "av01.0.05M.08", None, 900),
+    ("137", "mp4", 1080, "avc1.640028", None, 3000),
+    ("248", "webm", 1080, "vp9", None, 2400),
+    ("399", "mp4", 1080, "av01.0.08M.08", None, 1700),
+]
+
+_CASES = [
+    ("default (720p)", {}),
+    ("max 360p", {"max_height": 360}),
+    ("max 480p", {"max_height": 480}),
+    ("max 480p, prefer h264", {"max_height": 480, "preferred_codec": "h264"}),
+    ("max 1080p", {"max_height": 1080}),
+    ("max 1080p, under 40 MB", {"max_height": 1080, "max_filesize": 40_000_000}),
+]
+
+
+def _metadata() -> VideoMetadata:
+    formats = [
+        FormatInfo(format_id=format_id, ext=ext, height=height, vcodec=vcodec, acodec=acodec, tbr=tbr, protocol="https")
+        for format_id, ext, height, vcodec, acodec, tbr in _FORMATS
+    ]
+    return VideoMetadata(
+        url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        title="Benchmark video",
+        duration=DURATION,
+        thumbnail_url="https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg",
+        uploader="Benchmark",
+        view_count=0,
+        upload_date="20240101",
+        formats=formats
+    )
+
+
+def _ytdlp_choice(metadata: VideoMetadata, max_height: int) -> int:
+    """Bytes of bestvideo[height<=max_height]+bestaudio, ranked by height then bitrate."""
+    videos = [fmt for fmt in metadata.formats if fmt.has_video() and (fmt.height or 0) <= max_height]
+    audio = [fmt for fmt in metadata.formats if fmt.has_audio() and not fmt.has_video()]
+    video = max(videos, key=lambda fmt: (fmt.height or 0, fmt.tbr or 0))
+    best_audio = max(audio, key=lambda fmt: fmt.tbr or 0)
+    if video.has_audio():
+        return video.estimate_size(metadata.duration)
+    return video.estimate_size(metadata.duration) + best_audio.estimate_size(metadata.duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plans", type=int, default=20000, help="Plans to time per case")
+    args = parser.parse_args()
+    
+    metadata = _metadata()
+    planner = FormatPlanner(default_max_height=720)
+    
+    print(f"{'constraints':<26} {'formats':<10} {'merge':<6} {'planned':>10} {'yt-dlp':>10} {'us/plan':>8}")
+    for label, constraints in _CASES:
+        request = DownloadRequest(url=metadata.url, format="video", **constraints)
+        plan = planner.plan(request, metadata)
+        
+        started = time.perf_counter()
+        for _ in range(args.plans):
+            planner.plan(request, metadata)
+        per_plan_us = (time.perf_counter() - started) / args.plans * 1e6
+        
+        baseline = _ytdlp_choice(metadata, request.max_height or planner.default_max_height)
+        print(
+            f"{label:<26} {'+'.join(plan.format_ids):<10} {'yes' if plan.merge else 'no':<6} "
+            f"{plan.estimated_size / 1e6:8.1f}MB {baseline / 1e6:8.1f}MB {per_plan_us:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
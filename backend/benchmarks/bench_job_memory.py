@@ -0,0 +1,86 @@
+"""
+Benchmark for the memory cost of retained jobs.
+
+Builds finished jobs shaped like real ones (file path, byte counts,
+timestamps, stage times) and measures with tracemalloc how many bytes
+each costs kept as a pydantic DownloadJob versus as the JobRecord the
+memory job store retains, along with the time to build a status
+response from each and to rebuild a model from a record.
+Run from the backend directory:
+
+    python -m benchmarks.bench_job_memory --jobs 200000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from uuid import uuid4
+
+from src.api.status import _status_payload
+from src.models.download_job import DownloadJob, JobStage, JobStatus
+from src.models.job_record import JobRecord
+from src.storage.job_store import MemoryJobStore
+
+
+def _make_job(index: int) -> DownloadJob:
+    job = DownloadJob(request_id=str(uuid4()), artifact_key=f"{index:064x}")
+    for offset, stage in enumerate(JobStage):
+        if stage != JobStage.DONE:
+            job.stage_times[stage.value] = 1000.0 + index + offset
+    job.update_progress(0, JobStatus.PROCESSING)
+    job.update_transfer(48 * 1024 * 1024, 48 * 1024 * 1024, 4.2e6, 0, 100)
+    job.mark_completed(f"downloads/{job.id}/Some video title [{index:011d}].mp4", 48 * 1024 * 1024)
+    return job
+
+
+def _measure(build) -> tuple:
+    """Return (bytes allocated by build(), its result) with the result kept alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, value
+
+
+def _per_call_us(func, items) -> float:
+    started = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - started) / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100000, help="Finished jobs to retain")
+    args = parser.parse_args()
+    
+    jobs = [_make_job(i) for i in range(args.jobs)]
+    
+    # Only the per-job representation is measured; IDs and paths are shared by both
+    model_bytes, models = _measure(lambda: [job.model_copy(deep=True) for job in jobs])
+    record_bytes, records = _measure(lambda: [JobRecord(job) for job in jobs])
+    
+    store = MemoryJobStore()
+    store_bytes, _ = _measure(lambda: [store.save(job.model_copy(deep=True)) for job in jobs])
+    
+    sample = records[: min(len(records), 20000)]
+    payload_model_us = _per_call_us(_status_payload, models[: len(sample)])
+    payload_record_us = _per_call_us(_status_payload, sample)
+    rebuild_us = _per_call_us(JobRecord.to_job, sample)
+    
+    assert records[0].to_job().model_dump() == jobs[0].model_dump()
+    
+    print(f"{args.jobs} finished jobs")
+    print(f"  DownloadJob           {model_bytes / args.jobs:10.0f} bytes/job")
+    print(f"  JobRecord             {record_bytes / args.jobs:10.0f} bytes/job")
+    print(f"  MemoryJobStore        {store_bytes / args.jobs:10.0f} bytes/job (incl. index)")
+    print(f"  status payload        model {payload_model_us:6.2f} us  record {payload_record_us:6.2f} us")
+    print(f"  record -> model       {rebuild_us:10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark comparing the in-memory and SQLite job storage backends.
+
+Run from the backend directory:
+    
+    python -m benchmarks.bench_job_storage --jobs 100000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from src.models.download_job import DownloadJob, JobStatus
+from src.storage.job_store import MemoryJobStore
+from src.storage.sqlite_job_store import SQLiteJobStore
+
+
+def _timed(label: str, func, results: dict):
+    """Run func and record its wall-clock duration."""
+    start = time.perf_counter()
+    value = func()
+    results[label] = time.perf_counter() - start
+    return value
+
+
+def run_benchmark(store, job_count: int, progress_ticks: int) -> dict:
+    """Exercise a store with a realistic job lifecycle."""
+    results = {}
+    jobs = [DownloadJob(request_id=f"req-{i}") for i in range(job_count)]
+    
+    def insert():
+        for job in jobs:
+            store.save(job)
+        store.flush()
+    
+    def progress():
+        # Many progress ticks land on a small set of active jobs
+        active = random.sample(jobs, min(100, job_count))
+        for tick in range(progress_ticks):
+            job = active[tick % len(active)]
+            job.update_progress(tick % 101, JobStatus.PROCESSING)
+            store.save(job)
+        store.flush()
+    
+    def complete():
+        for job in jobs[: job_count // 2]:
+            job.mark_completed("/tmp/video.mp4", 1024)
+            store.save(job)
+        store.flush()
+    
+    def lookup():
+        for job in random.sample(jobs, min(10000, job_count)):
+            store.get(job.id)
+    
+    def by_status():
+        return len(store.find_by_status(JobStatus.COMPLETED))
+    
+    def by_request_id():
+        for i in range(1000):
+            store.find_by_request_id(f"req-{random.randrange(job_count)}")
+    
+    def expiring():
+        return len(store.find_expiring_before(datetime.utcnow() + timedelta(hours=25)))
+    
+    _timed("insert", insert, results)
+    _timed("progress_ticks", progress, results)
+    _timed("complete_half", complete, results)
+    _timed("get_10k", lookup, results)
+    _timed("find_by_status", by_status, results)
+    _timed("find_by_request_id_1k", by_request_id, results)
+    _timed("find_expiring_before", expiring, results)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--progress-ticks", type=int, default=100000)
+    args = parser.parse_args()
+    
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "memory": MemoryJobStore(),
+            "sqlite": SQLiteJobStore(os.path.join(tmp, "jobs.sqlite3")),
+        }
+        
+        all_results = {}
+        for name, store in backends.items():
+            all_results[name] = run_benchmark(store, args.jobs, args.progress_ticks)
+            store.close()
+        
+        print(f"{'operation':<24}" + "".join(f"{name:>12}" for name in backends))
+        for operation in all_results["memory"]:
+            row = "".join(f"{all_results[name][operation]:>11.3f}s" for name in backends)
+            print(f"{operation:<24}{row}")
+
+
+if __name__ == "__main__":
+    main()
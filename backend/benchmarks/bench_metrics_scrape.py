@@ -0,0 +1,157 @@
+"""
+Benchmark for scraping /metrics while the download pipeline is busy.
+
+Runs the whole app in-process against the stub yt_dlp package in
+benchmarks/stubs, submits a stream of downloads, and scrapes /metrics
+concurrently. Every scrape is checked to be valid exposition text with
+monotonic counters, and scrape latency is reported alongside the cost
+of a counter increment and a histogram observation on the hot path.
+Run from the backend directory:
+
+    python -m benchmarks.bench_metrics_scrape --downloads 200 --scrapers 4
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+STUBS_DIR = BACKEND_DIR / "benchmarks" / "stubs"
+
+# Engines must run the stub instead of the real yt_dlp
+os.environ["PYTHONPATH"] = os.pathsep.join(
+    filter(None, [str(STUBS_DIR), os.environ.get("PYTHONPATH")])
+)
+os.environ["YTDLP_COMMAND"] = f"{sys.executable} -m yt_dlp"
+os.environ.setdefault("STUB_YTDLP_IMPORT_DELAY", "0")
+os.environ.setdefault("STUB_YTDLP_RATE", str(4 * 1024 * 1024))
+os.environ.setdefault("JOB_STORAGE_BACKEND", "memory")
+sys.path.insert(0, str(BACKEND_DIR))
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_]+="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+
+def _parse(text: str) -> dict:
+    """Parse exposition text into {series: value}, failing on malformed lines."""
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        match = _SAMPLE.match(line)
+        if match is None:
+            raise AssertionError(f"Malformed metrics line: {line!r}")
+        samples[match.group(1) + (match.group(2) or "")] = float(match.group(3))
+    return samples
+
+
+def _check_monotonic(previous: dict, current: dict) -> None:
+    for series, value in current.items():
+        name = series.split("{", 1)[0]
+        if name.endswith(("_total", "_count", "_bucket")) and value < previous.get(series, 0):
+            raise AssertionError(f"Counter went backwards: {series} {previous[series]} -> {value}")
+
+
+def _hot_path_cost(iterations: int) -> tuple:
+    from src.services.metrics import Counter, Histogram
+    
+    counter = Counter("bench", "Benchmark counter.")
+    histogram = Histogram("bench", "Benchmark histogram.")
+    
+    started = time.perf_counter()
+    for _ in range(iterations):
+        counter.inc(65536)
+    inc_ns = (time.perf_counter() - started) / iterations * 1e9
+    
+    started = time.perf_counter()
+    for i in range(iterations):
+        histogram.observe(i % 100)
+    observe_ns = (time.perf_counter() - started) / iterations * 1e9
+    return inc_ns, observe_ns
+
+
+async def _run(downloads: int, scrapers: int, interval: float) -> None:
+    import httpx
+    
+    from src import main
+    
+    await main.startup_event()
+    transport = httpx.ASGITransport(app=main.app)
+    latencies = []
+    series_counts = []
+    done = asyncio.Event()
+    
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+        async def submit():
+            for i in range(downloads):
+                url = f"https://www.youtube.com/watch?v=bench{i:06d}"
+                # Retry while the scheduler queue is full
+                while (await client.post("/api/download", json={"url": url, "format": "video"})).status_code == 429:
+                    await asyncio.sleep(0.1)
+            while main.download.download_scheduler.get_stats()["active_workers"] or \
+                    main.download.download_scheduler.queue_depth:
+                await asyncio.sleep(0.1)
+            done.set()
+        
+        async def scrape():
+            previous = {}
+            while not done.is_set():
+                started = time.perf_counter()
+                response = await client.get("/metrics")
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200
+                assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+                current = _parse(response.text)
+                _check_monotonic(previous, current)
+                series_counts.append(len(current))
+                previous = current
+                await asyncio.sleep(interval)
+            return previous
+        
+        started = time.perf_counter()
+        results = await asyncio.gather(submit(), *(scrape() for _ in range(scrapers)))
+        elapsed = time.perf_counter() - started
+    
+    await main.shutdown_event()
+    
+    final = results[-1]
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    lag_count = final.get("ytdlp_event_loop_lag_seconds_count", 0)
+    lag_sum = final.get("ytdlp_event_loop_lag_seconds_sum", 0)
+    
+    print(f"{downloads} downloads with {scrapers} scrapers in {elapsed:.1f}s")
+    print(f"  scrapes               {len(latencies):10d}")
+    print(f"  series per scrape     {max(series_counts):10d}")
+    print(f"  scrape latency        mean {statistics.mean(latencies) * 1000:6.2f} ms  "
+          f"p95 {p95 * 1000:6.2f} ms  max {ordered[-1] * 1000:6.2f} ms")
+    print(f"  downloaded bytes      {final.get('ytdlp_downloaded_bytes_total', 0):10.0f}")
+    if lag_count:
+        print(f"  mean event loop lag   {lag_sum / lag_count * 1000:10.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--downloads", type=int, default=100, help="Downloads to submit")
+    parser.add_argument("--scrapers", type=int, default=4, help="Concurrent scrapers")
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between a scraper's requests")
+    parser.add_argument("--iterations", type=int, default=1_000_000, help="Hot path iterations")
+    args = parser.parse_args()
+    
+    inc_ns, observe_ns = _hot_path_cost(args.iterations)
+    print(f"Hot path: counter inc {inc_ns:.0f} ns, histogram observe {observe_ns:.0f} ns")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # Downloads and job data go to a scratch directory
+        os.chdir(tmp)
+        asyncio.run(_run(args.downloads, args.scrapers, args.interval))
+        os.chdir(BACKEND_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark for audio post-processing plans.
+
+Converts local sample files to MP3 and WAV with ffmpeg twice: the way
+yt-dlp's --extract-audio always does (an MP3 encode at its default
+quality) and the way the PostprocessPlanner plans it (stream copy,
+remux, or an encode at a bitrate picked from the source), with the
+same ffmpeg arguments the post-processing pool uses. CPU time of
+the ffmpeg children, output size and the planner's size estimate are
+reported per file, along with the measured MP3 encode speed to set
+POSTPROCESS_ENCODE_SPEED from. Samples are generated with ffmpeg unless
+a directory of audio files is given. Run from the backend directory:
+
+    python -m benchmarks.bench_postprocess --duration 600
+    python -m benchmarks.bench_postprocess --samples ~/Music/samples
+"""
+
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+from src.models.download_request import DownloadRequest
+from src.models.video_metadata import FormatInfo, VideoMetadata
+from src.services.postprocess_planner import PostprocessPlanner
+
+# Generated samples: file name and ffmpeg encoder arguments, like YouTube's audio formats
+_GENERATED = [
+    ("opus.webm", ["-c:a", "libopus", "-b:a", "135k"]),
+    ("aac.m4a", ["-c:a", "aac", "-b:a", "128k"]),
+    ("mp3.mp3", ["-c:a", "libmp3lame", "-b:a", "128k"]),
+    ("mp3-in-mka.mka", ["-c:a", "libmp3lame", "-b:a", "128k"]),
+    ("flac.flac", ["-c:a", "flac"]),
+]
+
+# What yt-dlp runs for --extract-audio --audio-format mp3/wav at default quality
+_BASELINE = {
+    "mp3": ["-c:a", "libmp3lame", "-q:a", "5"],
+    "wav": ["-c:a", "pcm_s16le"],
+}
+
+
+def _generate(directory: Path, duration: int) -> List[Path]:
+    source = f"sine=frequency=440:duration={duration}:sample_rate=48000"
+    paths = []
+    for name, encoder in _GENERATED:
+        path = directory / name
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-y", "-f", "lavfi", "-i", source, "-ac", "2", *encoder, str(path)],
+            check=True
+        )
+        paths.append(path)
+    return paths
+
+
+def _probe(path: Path) -> VideoMetadata:
+    """Describe a sample as metadata with a single audio-only format."""
+    info = json.loads(subprocess.run(
+        ["ffprobe", "-v", "error", "-print_format", "json", "-show_streams", "-show_format", str(path)],
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout)
+    stream = next(stream for stream in info["streams"] if stream["codec_type"] == "audio")
+    duration = float(info["format"]["duration"])
+    fmt = FormatInfo(
+        format_id="sample",
+        ext=path.suffix.lstrip("."),
+        acodec=stream["codec_name"],
+        tbr=float(info["format"].get("bit_rate") or 0) / 1000 or None,
+        filesize=path.stat().st_size,
+        asr=int(stream["sample_rate"]),
+        audio_channels=stream.get("channels")
+    )
+    return VideoMetadata(
+        url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        title=path.name,
+        duration=duration,
+        thumbnail_url="https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg",
+        uploader="Benchmark",
+        view_count=0,
+        upload_date="20240101",
+        formats=[fmt]
+    )
+
+
+def _convert(source: Path, target: Path, codec_args: List[str]) -> tuple:
+    """Run ffmpeg, returning (CPU seconds of the child, output bytes)."""
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    subprocess.run(["ffmpeg", "-v", "error", "-y", "-i", str(source), "-vn", *codec_args, str(target)], check=True)
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return cpu, target.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", help="Directory of audio files to convert instead of generated ones")
+    parser.add_argument("--duration", type=int, default=600, help="Seconds of audio in generated samples")
+    args = parser.parse_args()
+    
+    if shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None:
+        print("ffmpeg and ffprobe are required to run this benchmark")
+        sys.exit(1)
+    
+    planner = PostprocessPlanner()
+    encoded_audio = encode_cpu = 0.0
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        work = Path(workdir)
+        if args.samples:
+            samples = sorted(path for path in Path(args.samples).iterdir() if path.is_file())
+        else:
+            samples = _generate(work, args.duration)
+        
+        print(f"{'sample':<18} {'to':<4} {'action':<7} {'baseline cpu':>12} {'planned cpu':>11} "
+              f"{'baseline size':>13} {'planned size':>12} {'estimate':>10}")
+        for sample in samples:
+            metadata = _probe(sample)
+            for audio_format in ("mp3", "wav"):
+                request = DownloadRequest(url=metadata.url, format=f"audio_{audio_format}")
+                plan = planner.plan(request, metadata)
+                
+                baseline_cpu, baseline_size = _convert(sample, work / f"baseline.{audio_format}", _BASELINE[audio_format])
+                if audio_format == "mp3":
+                    encoded_audio += metadata.duration
+                    encode_cpu += baseline_cpu
+                
+                codec_args = plan.codec_args()
+                if codec_args is None:
+                    planned_cpu, planned_size = 0.0, sample.stat().st_size
+                else:
+                    planned_cpu, planned_size = _convert(sample, work / f"planned.{audio_format}", codec_args)
+                
+                estimate = f"{plan.estimated_size / 1e6:8.1f}MB" if plan.estimated_size else f"{'-':>10}"
+                print(
+                    f"{sample.name:<18} {audio_format:<4} {plan.action:<7} {baseline_cpu:11.2f}s {planned_cpu:10.2f}s "
+                    f"{baseline_size / 1e6:11.1f}MB {planned_size / 1e6:10.1f}MB {estimate}"
+                )
+    
+    stats = planner.get_stats()
+    print(f"estimated CPU saved     {stats['cpu_seconds_saved']:.2f}s (POSTPROCESS_ENCODE_SPEED={planner.encode_speed:g})")
+    if encode_cpu:
+        print(f"measured encode speed   {encoded_audio / encode_cpu:.1f} seconds of audio per CPU second")
+
+
+if __name__ == "__main__":
+    main()
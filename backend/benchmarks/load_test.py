@@ -0,0 +1,451 @@
+"""
+End-to-end load test of the API with a stub yt-dlp and a local media server.
+
+Starts a media server and the API (under uvicorn when it is installed,
+otherwise in-process), with yt-dlp replaced by the stub package in
+benchmarks/stubs fetching its media from the local server, so no
+network access is needed. N concurrent clients then drive one or more
+scenarios:
+
+    metadata  POST /api/metadata
+    download  POST /api/download, then poll /api/status until finished
+    progress  POST /api/download, then follow /api/progress over SSE
+
+Throughput, p50/p95/p99 latency and server memory are printed and
+written as JSON to benchmarks/results/ (or --output) so runs can be
+compared over time. Run from the backend directory:
+
+    python -m benchmarks.load_test --scenario metadata download progress --clients 16
+
+Use --base-url to drive an already running server instead.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.media_server import MediaServer
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+STUBS_DIR = BACKEND_DIR / "benchmarks" / "stubs"
+RESULTS_DIR = BACKEND_DIR / "benchmarks" / "results"
+
+SCENARIOS = ("metadata", "download", "progress")
+FINISHED_STATUSES = ("completed", "failed", "expired")
+
+
+def _percentiles(samples: List[float], scale: float = 1000) -> Dict[str, Optional[float]]:
+    """Summary using nearest-rank percentiles, in milliseconds by default."""
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    
+    ordered = sorted(samples)
+    
+    def rank(percent):
+        return ordered[max(1, -(-len(ordered) * percent // 100)) - 1] * scale
+    
+    return {
+        "p50": rank(50),
+        "p95": rank(95),
+        "p99": rank(99),
+        "mean": sum(ordered) / len(ordered) * scale,
+        "max": ordered[-1] * scale
+    }
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, from /proc on Linux."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class _Recorder:
+    """Per-scenario samples and counters."""
+    
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.timings: Dict[str, List[float]] = {}
+        self.events: List[int] = []
+        self.ok = 0
+        self.errors = 0
+        self.rejected = 0
+        self.bytes = 0
+        self.error_samples: List[str] = []
+    
+    def timing(self, name: str, seconds: float) -> None:
+        self.timings.setdefault(name, []).append(seconds)
+    
+    def error(self, message: str) -> None:
+        self.errors += 1
+        if len(self.error_samples) < 5:
+            self.error_samples.append(message)
+    
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "duration_seconds": elapsed,
+            "throughput_rps": self.ok / elapsed if elapsed else 0.0,
+            "bytes_per_second": self.bytes / elapsed if elapsed else 0.0,
+            "latency_ms": _percentiles(self.latencies),
+            "timings_ms": {name: _percentiles(samples) for name, samples in self.timings.items()},
+            "events_per_job": _percentiles(self.events, scale=1) if self.events else None,
+            "error_samples": self.error_samples
+        }
+
+
+class _Target:
+    """The API under test and a way to measure its memory."""
+    
+    mode = "external"
+    pid: Optional[int] = None
+    
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+    
+    async def start(self):
+        pass
+    
+    async def stop(self):
+        pass
+    
+    def client(self, timeout: float) -> httpx.AsyncClient:
+        return httpx.AsyncClient(base_url=self.base_url, timeout=timeout)
+    
+    def rss_bytes(self) -> Optional[int]:
+        return _rss_bytes(self.pid) if self.pid else None
+
+
+class _UvicornTarget(_Target):
+    """API served by uvicorn in a child process."""
+    
+    mode = "uvicorn"
+    
+    def __init__(self, env: Dict[str, str], workdir: str):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        super().__init__(f"http://127.0.0.1:{port}")
+        self.env = env
+        self.workdir = workdir
+        self.port = port
+        self.process: Optional[subprocess.Popen] = None
+    
+    async def start(self):
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "src.main:app",
+                "--app-dir", str(BACKEND_DIR), "--host", "127.0.0.1",
+                "--port", str(self.port), "--log-level", "warning"
+            ],
+            cwd=self.workdir,
+            env=self.env
+        )
+        self.pid = self.process.pid
+        
+        async with httpx.AsyncClient(base_url=self.base_url) as client:
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        return
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+        raise RuntimeError("API server did not start within 30s")
+    
+    async def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            await asyncio.to_thread(self.process.wait, 30)
+
+
+class _InProcessTarget(_Target):
+    """API run on this event loop through its ASGI interface.
+    
+    Responses are buffered by httpx's ASGI transport, so a progress
+    stream's first event arrives together with its last, and client and
+    server share one CPU. Prefer uvicorn for absolute numbers.
+    """
+    
+    mode = "inprocess"
+    
+    def __init__(self, env: Dict[str, str], workdir: str):
+        super().__init__("http://localhost")
+        self.pid = os.getpid()
+        os.environ.update(env)
+        os.chdir(workdir)
+        sys.path.insert(0, str(BACKEND_DIR))
+        from src import main
+        self.main = main
+    
+    async def start(self):
+        await self.main.startup_event()
+    
+    async def stop(self):
+        await self.main.shutdown_event()
+    
+    def client(self, timeout: float) -> httpx.AsyncClient:
+        transport = httpx.ASGITransport(app=self.main.app)
+        return httpx.AsyncClient(transport=transport, base_url=self.base_url, timeout=timeout)
+
+
+async def _submit(client: httpx.AsyncClient, url: str, user: str, rec: _Recorder) -> Optional[str]:
+    """Queue a download, retrying while the server is full."""
+    while True:
+        started = time.perf_counter()
+        response = await client.post("/api/download", json={"url": url, "format": "video", "user_id": user})
+        rec.timing("submit", time.perf_counter() - started)
+        if response.status_code in (429, 507):
+            rec.rejected += 1
+            await asyncio.sleep(0.2)
+            continue
+        if response.status_code != 200:
+            rec.error(f"POST /api/download {response.status_code}: {response.text[:200]}")
+            return None
+        return response.json()["job_id"]
+
+
+async def _metadata(client: httpx.AsyncClient, url: str, user: str, rec: _Recorder, args) -> None:
+    started = time.perf_counter()
+    response = await client.post("/api/metadata", json={"url": url})
+    if response.status_code != 200:
+        rec.error(f"POST /api/metadata {response.status_code}: {response.text[:200]}")
+        return
+    rec.latencies.append(time.perf_counter() - started)
+    rec.ok += 1
+
+
+async def _download(client: httpx.AsyncClient, url: str, user: str, rec: _Recorder, args) -> None:
+    started = time.perf_counter()
+    job_id = await _submit(client, url, user, rec)
+    if job_id is None:
+        return
+    
+    while True:
+        status = (await client.get(f"/api/status/{job_id}")).json()
+        if status["status"] in FINISHED_STATUSES:
+            break
+        await asyncio.sleep(args.poll_interval)
+    
+    if status["status"] != "completed":
+        rec.error(f"Job {job_id} {status['status']}: {status.get('error_message')}")
+        return
+    rec.latencies.append(time.perf_counter() - started)
+    rec.bytes += status["file_size"] or 0
+    rec.ok += 1
+
+
+async def _progress(client: httpx.AsyncClient, url: str, user: str, rec: _Recorder, args) -> None:
+    started = time.perf_counter()
+    job_id = await _submit(client, url, user, rec)
+    if job_id is None:
+        return
+    
+    subscribed = time.perf_counter()
+    events = 0
+    final = None
+    async with client.stream("GET", f"/api/progress/{job_id}") as response:
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            if not events:
+                rec.timing("first_event", time.perf_counter() - subscribed)
+            events += 1
+            data = json.loads(line[len("data: "):])
+            if data["status"] in FINISHED_STATUSES:
+                final = data
+                break
+    
+    rec.events.append(events)
+    if final is None or final["status"] != "completed":
+        rec.error(f"Job {job_id} stream ended with {final['status'] if final else 'no final event'}")
+        return
+    rec.latencies.append(time.perf_counter() - started)
+    rec.bytes += final["total_bytes"] or 0
+    rec.ok += 1
+
+
+_OPERATIONS = {"metadata": _metadata, "download": _download, "progress": _progress}
+
+
+async def _run_scenario(target: _Target, name: str, args, run_id: str) -> Dict[str, Any]:
+    rec = _Recorder()
+    operation = _OPERATIONS[name]
+    peak_rss = target.rss_bytes() or 0
+    done = asyncio.Event()
+    
+    async def sample_memory():
+        nonlocal peak_rss
+        while not done.is_set():
+            peak_rss = max(peak_rss, target.rss_bytes() or 0)
+            await asyncio.sleep(0.1)
+    
+    async def client_loop(client: httpx.AsyncClient, index: int):
+        for request in range(args.requests):
+            sequence = index * args.requests + request
+            if args.url_pool:
+                sequence %= args.url_pool
+            # Unique per run, so nothing is served from an earlier run's artifacts
+            url = f"https://www.youtube.com/watch?v={run_id}{name[0]}{sequence:05d}"
+            try:
+                await operation(client, url, f"loadtest-{index}", rec, args)
+            except httpx.HTTPError as e:
+                rec.error(f"{type(e).__name__}: {e}")
+    
+    sampler = asyncio.create_task(sample_memory())
+    async with target.client(args.timeout) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, index) for index in range(args.clients)))
+        elapsed = time.perf_counter() - started
+    done.set()
+    await sampler
+    
+    summary = rec.summary(elapsed)
+    summary["clients"] = args.clients
+    summary["requests"] = args.clients * args.requests
+    summary["peak_rss_bytes"] = peak_rss or None
+    return summary
+
+
+def _server_env(args, media_url: str) -> Dict[str, str]:
+    total = args.clients * args.requests
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(STUBS_DIR), os.environ.get("PYTHONPATH")])),
+        "YTDLP_COMMAND": f"{sys.executable} -m yt_dlp",
+        "YTDLP_ENGINE": args.engine,
+        "STUB_YTDLP_IMPORT_DELAY": str(args.import_delay),
+        "STUB_YTDLP_EXTRACT_DELAY": str(args.extract_delay),
+        "STUB_YTDLP_MEDIA_URL": media_url,
+        "STUB_YTDLP_CHUNK": str(args.chunk_kb * 1024),
+        "JOB_STORAGE_BACKEND": args.storage,
+        "MAX_CONCURRENT_DOWNLOADS": str(args.workers),
+        "MAX_QUEUED_DOWNLOADS": str(max(100, total)),
+        "MAX_DOWNLOADS_PER_USER": str(max(10, args.requests))
+    })
+    return env
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_summary(name: str, summary: Dict[str, Any]) -> None:
+    latency = summary["latency_ms"]
+    print(f"{name}: {summary['ok']}/{summary['requests']} ok, {summary['errors']} errors, "
+          f"{summary['rejected']} rejected in {summary['duration_seconds']:.1f}s")
+    print(f"  throughput   {summary['throughput_rps']:10.1f} req/s  "
+          f"{summary['bytes_per_second'] / (1024 * 1024):10.1f} MB/s")
+    if latency["p50"] is not None:
+        print(f"  latency      p50 {latency['p50']:9.1f} ms  p95 {latency['p95']:9.1f} ms  "
+              f"p99 {latency['p99']:9.1f} ms")
+    for timing, stats in summary["timings_ms"].items():
+        print(f"  {timing:12} p50 {stats['p50']:9.1f} ms  p95 {stats['p95']:9.1f} ms  p99 {stats['p99']:9.1f} ms")
+    if summary["events_per_job"]:
+        print(f"  events/job   p50 {summary['events_per_job']['p50']:9.0f}     "
+              f"p95 {summary['events_per_job']['p95']:9.0f}")
+    if summary["peak_rss_bytes"]:
+        print(f"  server peak RSS {summary['peak_rss_bytes'] / (1024 * 1024):7.1f} MB")
+    for message in summary["error_samples"]:
+        print(f"  error: {message}")
+
+
+async def _run(args, workdir: str) -> Dict[str, Any]:
+    media = MediaServer(size=int(args.size_mb * 1024 * 1024), rate=args.rate_mbps * 1_000_000 / 8)
+    media_url = media.start()
+    
+    env = _server_env(args, media_url)
+    if args.base_url:
+        target = _Target(args.base_url)
+    elif args.server == "uvicorn" or (args.server == "auto" and importlib.util.find_spec("uvicorn")):
+        target = _UvicornTarget(env, workdir)
+    else:
+        target = _InProcessTarget(env, workdir)
+    
+    await target.start()
+    run_id = uuid.uuid4().hex[:4]
+    scenarios = {}
+    try:
+        for name in args.scenario:
+            scenarios[name] = await _run_scenario(target, name, args, run_id)
+            _print_summary(name, scenarios[name])
+    finally:
+        await target.stop()
+        media.stop()
+    
+    return {
+        "benchmark": "load_test",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "server": target.mode,
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "media_server": media.get_stats(),
+        "client_peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "scenarios": scenarios
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=4, help="Requests per client per scenario")
+    parser.add_argument("--url-pool", type=int, default=0, help="Distinct URLs per scenario, 0 for all unique")
+    parser.add_argument("--server", choices=("auto", "uvicorn", "inprocess"), default="auto")
+    parser.add_argument("--base-url", help="Drive an already running server instead of starting one")
+    parser.add_argument("--engine", choices=("cli", "pool"), default="cli", help="YTDLP_ENGINE for the server")
+    parser.add_argument("--storage", choices=("memory", "sqlite"), default="memory", help="JOB_STORAGE_BACKEND")
+    parser.add_argument("--workers", type=int, default=5, help="MAX_CONCURRENT_DOWNLOADS for the server")
+    parser.add_argument("--size-mb", type=float, default=8, help="Size of each media file")
+    parser.add_argument("--rate-mbps", type=float, default=200, help="Media server per-connection limit, 0 for none")
+    parser.add_argument("--chunk-kb", type=int, default=64, help="Stub download chunk, one progress line each")
+    parser.add_argument("--extract-delay", type=float, default=0.2, help="Stub metadata extraction latency")
+    parser.add_argument("--import-delay", type=float, default=0.3, help="Stub yt_dlp import cost")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Status polling interval")
+    parser.add_argument("--timeout", type=float, default=300, help="HTTP client timeout")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/load_test-<time>.json)")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        results = asyncio.run(_run(args, workdir))
+        os.chdir(BACKEND_DIR)
+    
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"load_test-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Local HTTP server that serves media files to the stub yt_dlp package.
+
+Any path is answered with deterministic bytes of a fixed size, or with
+the matching file when a directory is given, optionally throttled per
+connection to mimic a remote CDN. Single byte ranges are supported.
+Point the stub at it with STUB_YTDLP_MEDIA_URL. Run from the backend
+directory:
+
+    python -m benchmarks.media_server --port 8765 --size-mb 16 --rate-mbps 40
+"""
+
+import argparse
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Bytes written per socket send, and per throttling step
+CHUNK_SIZE = 64 * 1024
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d+)-(\d*)$")
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def do_HEAD(self):
+        self._respond(send_body=False)
+    
+    def do_GET(self):
+        self._respond(send_body=True)
+    
+    def _respond(self, send_body: bool):
+        server = self.server
+        name = os.path.basename(self.path.split("?", 1)[0])
+        path = os.path.join(server.directory, name) if server.directory else None
+        if path is not None and not os.path.isfile(path):
+            self.send_error(404)
+            return
+        size = os.path.getsize(path) if path else server.size
+        
+        start, end = 0, size - 1
+        match = _RANGE_PATTERN.match(self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        if not send_body:
+            return
+        
+        server.requests += 1
+        source = open(path, "rb") if path else None
+        try:
+            if source:
+                source.seek(start)
+            started = time.perf_counter()
+            sent = 0
+            remaining = end - start + 1
+            while remaining > 0:
+                count = min(CHUNK_SIZE, remaining)
+                self.wfile.write(source.read(count) if source else server.block[:count])
+                sent += count
+                remaining -= count
+                if server.rate:
+                    ahead = sent / server.rate - (time.perf_counter() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+            server.bytes_sent += sent
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            if source:
+                source.close()
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class MediaServer:
+    """Threaded media server running in the background of the current process."""
+    
+    def __init__(
+        self,
+        size: int = 16 * 1024 * 1024,
+        rate: float = 0,
+        directory: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """Initialize MediaServer."""
+        self._server = ThreadingHTTPServer((host, port), _MediaHandler)
+        self._server.daemon_threads = True
+        self._server.size = size
+        self._server.rate = rate
+        self._server.directory = directory
+        self._server.block = bytes(range(256)) * (CHUNK_SIZE // 256)
+        self._server.requests = 0
+        self._server.bytes_sent = 0
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> str:
+        """Serve in a background thread and return the base URL."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+    
+    def serve_forever(self) -> None:
+        """Serve in the current thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+    
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def get_stats(self) -> dict:
+        return {"requests": self._server.requests, "bytes_sent": self._server.bytes_sent}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--size-mb", type=float, default=16, help="Size of every generated file")
+    parser.add_argument("--rate-mbps", type=float, default=0, help="Per-connection limit in megabits/s, 0 for none")
+    parser.add_argument("--directory", help="Serve real files from this directory instead")
+    args = parser.parse_args()
+    
+    server = MediaServer(
+        size=int(args.size_mb * 1024 * 1024),
+        rate=args.rate_mbps * 1_000_000 / 8,
+        directory=args.directory,
+        host=args.host,
+        port=args.port
+    )
+    print(f"Serving media on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
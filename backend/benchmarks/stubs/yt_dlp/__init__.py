@@ -0,0 +1,294 @@
+"""
+Stub of the yt_dlp package for offline benchmarks.
+
+Mimics the parts of the yt_dlp API the backend uses (parse_options,
+YoutubeDL.extract_info/download/sanitize_info and progress hooks) and
+simulates the import cost of the real extractor registry. Tunables:
+
+    STUB_YTDLP_IMPORT_DELAY   extra seconds spent importing (default 0.3)
+    STUB_YTDLP_EXTRACTORS     number of extractor classes built (default 1800)
+    STUB_YTDLP_FILESIZE       bytes written per download (default 1 MiB)
+    STUB_YTDLP_CHUNK          bytes per progress tick (default 64 KiB)
+    STUB_YTDLP_RATE           simulated bytes/sec, 0 for unlimited (default 0)
+    STUB_YTDLP_PLAYLIST_SIZE  entries in a playlist (list=...) URL (default 10)
+    STUB_YTDLP_ENTRY_DELAY    seconds to discover each playlist entry (default 0.05)
+    STUB_YTDLP_EXTRACT_DELAY  seconds spent "fetching" each video's metadata (default 0)
+    STUB_YTDLP_MEDIA_URL      base URL to fetch media from, e.g. a benchmarks.media_server;
+                              {id}.{ext} is appended (default unset: write zeros)
+    STUB_YTDLP_POSTPROCESS_DELAY  seconds spent on --extract-audio (default 0)
+"""
+
+import json
+import os
+import re
+import sys
+import time
+import urllib.request
+from collections import namedtuple
+
+__version__ = "2099.01.01.stub"
+
+_IMPORT_STARTED = time.perf_counter()
+
+
+class InfoExtractor:
+    """Base class of the simulated extractors."""
+    _VALID_URL = None
+
+
+def _build_extractors(count: int) -> list:
+    """Build extractor classes the way yt_dlp's lazy registry does."""
+    extractors = []
+    for index in range(count):
+        pattern = re.compile(rf"https?://(?:www\.)?site{index}\.example/(?P<id>[\w-]+)")
+        extractors.append(type(f"Site{index}IE", (InfoExtractor,), {"_VALID_URL": pattern}))
+    return extractors
+
+
+_EXTRACTORS = _build_extractors(int(os.getenv("STUB_YTDLP_EXTRACTORS", "1800")))
+
+_remaining = float(os.getenv("STUB_YTDLP_IMPORT_DELAY", "0.3")) - (time.perf_counter() - _IMPORT_STARTED)
+if _remaining > 0:
+    time.sleep(_remaining)
+
+ParsedOptions = namedtuple("ParsedOptions", ["parser", "options", "urls", "ydl_opts"])
+
+# Options that consume a value, mapped to the ydl_opts key they set
+_VALUE_OPTIONS = {
+    "-o": "outtmpl",
+    "--output": "outtmpl",
+    "-f": "format",
+    "--format": "format",
+    "--progress-template": "progress_template",
+    "--audio-format": "audioformat",
+    "--audio-quality": "audioquality",
+    "--sub-langs": "subtitleslangs",
+    "--cookies": "cookiefile",
+    "--proxy": "proxy",
+    "--postprocessor-args": "postprocessor_args",
+    "--remux-video": "remuxvideo",
+    "--print": "print",
+}
+
+_FLAG_OPTIONS = {
+    "--dump-json": "dump_single_json",
+    "-j": "dump_single_json",
+    "--no-download": "skip_download",
+    "--skip-download": "skip_download",
+    "--extract-audio": "extractaudio",
+    "-x": "extractaudio",
+    "--write-subs": "writesubtitles",
+    "--write-info-json": "writeinfojson",
+    "--newline": "progress_with_newline",
+    "--progress": "progress",
+    "--flat-playlist": "extract_flat",
+}
+
+
+def parse_options(argv=None):
+    """Parse a yt-dlp argument list into ydl options and URLs."""
+    argv = list(argv or [])
+    ydl_opts = {}
+    urls = []
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        if arg in _VALUE_OPTIONS:
+            ydl_opts[_VALUE_OPTIONS[arg]] = argv[index + 1]
+            index += 2
+            continue
+        if arg in _FLAG_OPTIONS:
+            ydl_opts[_FLAG_OPTIONS[arg]] = True
+        elif arg.startswith("-"):
+            pass
+        else:
+            urls.append(arg)
+        index += 1
+
+    if "outtmpl" in ydl_opts:
+        ydl_opts["outtmpl"] = {"default": ydl_opts["outtmpl"]}
+    return ParsedOptions(None, None, urls, ydl_opts)
+
+
+def _video_id(url: str) -> str:
+    match = re.search(r"(?:v=|youtu\.be/|/shorts/|/embed/)([\w-]+)", url)
+    return match.group(1) if match else "stubvideo00"
+
+
+def _fake_info(url: str) -> dict:
+    video_id = _video_id(url)
+    size = int(os.getenv("STUB_YTDLP_FILESIZE", str(1024 * 1024)))
+    return {
+        "id": video_id,
+        "title": f"Stub video {video_id}",
+        "duration": 212,
+        "thumbnail": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        "description": "Stub description",
+        "uploader": "Stub Uploader",
+        "view_count": 1000,
+        "upload_date": "20240101",
+        "ext": "mp4",
+        "webpage_url": url,
+        "filesize": size,
+        "subtitles": {"en": [{"ext": "vtt"}]},
+        "formats": [
+            {"format_id": "140", "ext": "m4a", "format_note": "medium", "acodec": "mp4a.40.2",
+             "vcodec": "none", "abr": 129.5, "asr": 44100, "filesize": size // 8, "protocol": "https"},
+            {"format_id": "251", "ext": "webm", "format_note": "medium", "acodec": "opus",
+             "vcodec": "none", "abr": 135.2, "asr": 48000, "filesize": size // 8, "protocol": "https"},
+            {"format_id": "18", "ext": "mp4", "format_note": "360p", "height": 360, "width": 640,
+             "fps": 30, "vcodec": "avc1.42001E", "acodec": "mp4a.40.2", "tbr": 500,
+             "filesize": size // 2, "protocol": "https"},
+            {"format_id": "22", "ext": "mp4", "format_note": "720p", "height": 720, "width": 1280,
+             "fps": 30, "vcodec": "avc1.64001F", "acodec": "mp4a.40.2", "tbr": 1200,
+             "filesize": size, "protocol": "https"},
+            {"format_id": "137", "ext": "mp4", "format_note": "1080p", "height": 1080, "width": 1920,
+             "fps": 30, "vcodec": "avc1.640028", "acodec": "none", "tbr": 4000,
+             "filesize": size * 3, "protocol": "https"},
+        ],
+    }
+
+
+def _fake_playlist(url: str) -> dict:
+    playlist_id = re.search(r"list=([\w-]+)", url).group(1)
+    count = int(os.getenv("STUB_YTDLP_PLAYLIST_SIZE", "10"))
+    delay = float(os.getenv("STUB_YTDLP_ENTRY_DELAY", "0.05"))
+
+    def entries():
+        # Discovered lazily, page by page, like the real tab extractor
+        for index in range(count):
+            time.sleep(delay)
+            video_id = f"{playlist_id[:4]}{index:07d}"
+            yield {
+                "_type": "url",
+                "ie_key": "Youtube",
+                "id": video_id,
+                "url": f"https://www.youtube.com/watch?v={video_id}",
+                "title": f"Stub video {video_id}",
+                "duration": 212,
+            }
+
+    return {"_type": "playlist", "id": playlist_id, "title": f"Stub playlist {playlist_id}", "entries": entries()}
+
+
+class YoutubeDL:
+    """Minimal stand-in for yt_dlp.YoutubeDL."""
+
+    def __init__(self, params=None):
+        self.params = dict(params or {})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def to_screen(self, message: str) -> None:
+        logger = self.params.get("logger")
+        if logger is not None:
+            logger.debug(message)
+        elif self.params.get("dump_single_json") or self.params.get("quiet"):
+            # Like yt-dlp, keep stdout clean for JSON output
+            print(message, file=sys.stderr, flush=True)
+        else:
+            print(message, flush=True)
+
+    def extract_info(self, url: str, download: bool = True, process: bool = True, ie_key=None) -> dict:
+        self.to_screen(f"[youtube] Extracting URL: {url}")
+        if "list=" in url:
+            return _fake_playlist(url)
+        info = _fake_info(url)
+        self.to_screen(f"[youtube] {info['id']}: Downloading webpage")
+        time.sleep(float(os.getenv("STUB_YTDLP_EXTRACT_DELAY", "0")))
+        self.to_screen(f"[youtube] {info['id']}: Downloading player API JSON")
+        if download:
+            self.process_info(info)
+        return info
+
+    def sanitize_info(self, info: dict) -> dict:
+        return info
+
+    def download(self, urls) -> int:
+        for url in urls:
+            self.extract_info(url, download=True)
+        return 0
+
+    def process_info(self, info: dict) -> None:
+        template = (self.params.get("outtmpl") or {}).get("default", "%(title)s.%(ext)s")
+        path = template % {"title": info["title"], "ext": info["ext"], "id": info["id"]}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if self.params.get("writeinfojson"):
+            info_path = os.path.splitext(path)[0] + ".info.json"
+            self.to_screen(f"[info] Writing video metadata as JSON to: {info_path}")
+            with open(info_path, "w") as f:
+                json.dump(info, f)
+        if self.params.get("skip_download"):
+            return
+
+        self.to_screen(f"[info] {info['id']}: Downloading 1 format(s): 22")
+        self.to_screen(f"[download] Destination: {path}")
+        media_url = os.getenv("STUB_YTDLP_MEDIA_URL")
+        if media_url:
+            source = urllib.request.urlopen(f"{media_url.rstrip('/')}/{info['id']}.{info['ext']}")
+            total = int(source.headers["Content-Length"])
+        else:
+            source = None
+            total = int(os.getenv("STUB_YTDLP_FILESIZE", str(1024 * 1024)))
+        chunk = int(os.getenv("STUB_YTDLP_CHUNK", str(64 * 1024)))
+        rate = float(os.getenv("STUB_YTDLP_RATE", "0"))
+        started = time.perf_counter()
+        written = 0
+        block = b"\0" * chunk
+        with open(path, "wb") as f:
+            while written < total:
+                data = source.read(chunk) if source else block[:min(chunk, total - written)]
+                if not data:
+                    raise OSError(f"Media stream ended after {written} of {total} bytes")
+                f.write(data)
+                written += len(data)
+                elapsed = time.perf_counter() - started
+                if rate:
+                    ahead = written / rate - elapsed
+                    if ahead > 0:
+                        time.sleep(ahead)
+                        elapsed += ahead
+                speed = written / elapsed if elapsed else None
+                self._report_progress({
+                    "status": "downloading",
+                    "downloaded_bytes": written,
+                    "total_bytes": total,
+                    "total_bytes_estimate": None,
+                    "speed": speed,
+                    "eta": int((total - written) / speed) if speed else None,
+                    "filename": path,
+                })
+        if source:
+            source.close()
+        self._report_progress({
+            "status": "finished", "downloaded_bytes": total, "total_bytes": total,
+            "total_bytes_estimate": None, "speed": None, "eta": 0, "filename": path,
+        })
+
+        if self.params.get("extractaudio"):
+            audio_path = os.path.splitext(path)[0] + "." + self.params.get("audioformat", "mp3")
+            self.to_screen(f"[ExtractAudio] Destination: {audio_path}")
+            time.sleep(float(os.getenv("STUB_YTDLP_POSTPROCESS_DELAY", "0")))
+            os.replace(path, audio_path)
+            self.to_screen(f"Deleting original file {path} (pass -k to keep)")
+
+    def _report_progress(self, status: dict) -> None:
+        for hook in self.params.get("progress_hooks") or []:
+            hook(status)
+
+        template = self.params.get("progress_template")
+        if template and not self.params.get("noprogress") and status["status"] == "downloading":
+            line = template.split(":", 1)[1] if template.startswith("download:") else template
+            line = re.sub(
+                r"%\(progress\.(\w+)\)s",
+                lambda m: "NA" if status.get(m.group(1)) is None else str(status[m.group(1)]),
+                line,
+            )
+            self.to_screen(line)
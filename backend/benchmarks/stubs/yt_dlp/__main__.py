@@ -0,0 +1,28 @@
+"""
+Command-line entry point of the stub yt_dlp package.
+"""
+
+import json
+import sys
+
+import yt_dlp
+
+
+def main(argv=None) -> int:
+    parsed = yt_dlp.parse_options(sys.argv[1:] if argv is None else argv)
+    with yt_dlp.YoutubeDL(parsed.ydl_opts) as ydl:
+        if parsed.ydl_opts.get("dump_single_json"):
+            for url in parsed.urls:
+                info = ydl.extract_info(url, download=False)
+                if info.get("_type") == "playlist" and parsed.ydl_opts.get("extract_flat"):
+                    # Flat listings print each entry as soon as it is found
+                    for entry in info["entries"]:
+                        print(json.dumps(entry), flush=True)
+                else:
+                    print(json.dumps(info), flush=True)
+            return 0
+        return ydl.download(parsed.urls)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
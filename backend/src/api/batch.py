@@ -0,0 +1,91 @@
+"""
+Batch download API endpoints for yt-dlp Web UI.
+"""
+
+from fastapi import APIRouter, HTTPException
+
+from ..models.batch_request import BatchRequest
+from ..services.batch_service import BatchService
+from .download import enqueue_download
+from .responses import zip_response
+
+router = APIRouter()
+
+# Initialize services
+batch_service = BatchService(enqueue_download)
+
+
+@router.post("/batch")
+async def start_batch(request: BatchRequest):
+    """Expand a playlist or channel and download each of its videos."""
+    try:
+        batch = batch_service.create_batch(request)
+        
+        return {
+            "batch_id": batch.id,
+            "status": batch.status,
+            "message": "Batch started"
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """Get aggregated progress of a batch and the state of its downloads."""
+    try:
+        batch = batch_service.get_batch(batch_id)
+        if not batch:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        
+        children = batch_service.get_children(batch)
+        
+        return {
+            "batch_id": batch.id,
+            "url": batch.url,
+            "status": batch.status,
+            "expanding": batch.expanding,
+            "progress": batch_service.get_progress(batch),
+            "total": batch.total,
+            "completed": batch.completed,
+            "failed": batch.failed,
+            "skipped": batch.skipped,
+            "failures": batch.failures,
+            "error_message": batch.error_message,
+            "started_at": batch.started_at,
+            "completed_at": batch.completed_at,
+            "expires_at": batch.expires_at,
+            "jobs": [
+                {"job_id": job.id, "status": job.status, "progress": job.progress}
+                for job in children
+            ]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/batch/{batch_id}/archive")
+async def download_batch_archive(batch_id: str):
+    """Download every file of a batch's completed videos as one ZIP archive."""
+    try:
+        batch = batch_service.get_batch(batch_id)
+        if not batch:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        
+        if batch.completed == 0:
+            raise HTTPException(status_code=404, detail="No completed downloads in batch")
+        
+        entries = batch_service.archive_entries(batch)
+        if not entries:
+            raise HTTPException(status_code=410, detail="Batch files have expired and been deleted")
+        
+        return zip_response(entries, f"batch-{batch.id}.zip")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
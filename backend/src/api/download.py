@@ -2,52 +2,217 @@
 Download API endpoints for yt-dlp Web UI.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Request
+from typing import Dict, Any, Optional
+import asyncio
 import os
+import time
+from pathlib import Path
 
-from ..models.download_request import DownloadRequest
+from ..models.download_request import DownloadFormat, DownloadRequest
 from ..models.download_job import DownloadJob, JobStatus
-from ..services.ytdlp_service import YtDlpService
-from ..services.file_service import FileService
-from ..storage.job_storage import get_job, save_job
+from ..services.ytdlp_service import get_ytdlp_service
+from ..services.file_service import get_file_service
+from ..services.artifact_store import ArtifactStore
+from ..services.disk_sweeper import disk_sweeper
+from ..services.download_scheduler import DownloadScheduler, SchedulerFullError
+from ..services.metrics import download_duration, downloads_finished
+from ..services.postprocess_pool import PostprocessPool, PostprocessTask
+from ..services.stage_timeline import stage_timeline
+from ..services.storage_governor import StorageFullError, StorageGovernor
+from ..services.zip_stream import ZipEntry
+from ..storage.job_storage import get_job, save_job, delete_job
+from .responses import RangeFileResponse, zip_response
 
 router = APIRouter()
 
-# Initialize services
-ytdlp_service = YtDlpService()
-file_service = FileService()
+
+async def _finish_download(job: DownloadJob, format_label: str, started: float):
+    """Record a completed download's metrics and account for its files."""
+    download_duration.labels(format=format_label).observe(time.perf_counter() - started)
+    downloads_finished.labels(format=format_label, status="completed").inc()
+    stage_timeline.record(job)
+    
+    # Account for the new files without waiting for the next sweep
+    await asyncio.to_thread(disk_sweeper.refresh, job.id)
+
+
+async def _process_download(request: DownloadRequest, job: DownloadJob):
+    """Process a download once the scheduler has assigned it a worker."""
+    format_label = DownloadFormat(request.format).value
+    started = time.perf_counter()
+    try:
+        # Download video
+        file_path, plan = await get_ytdlp_service().fetch(request, job)
+        
+        # Convert on the post-processing pool, freeing this network slot;
+        # the job stays PROCESSING until the pool reports it finished
+        if plan is not None:
+            postprocess_pool.submit(PostprocessTask(request, job, file_path, plan, started))
+            return
+        
+        # Update job with file information
+        file_size = get_file_service().get_file_size(file_path)
+        job.mark_completed(file_path, file_size)
+        save_job(job)
+        
+        await _finish_download(job, format_label, started)
+        
+    except Exception as e:
+        job.mark_failed(str(e))
+        save_job(job)
+        downloads_finished.labels(format=format_label, status="failed").inc()
+
+
+def _fail_postprocess(task: PostprocessTask, error_message: str):
+    """Fail a job whose conversion did not complete."""
+    task.job.mark_failed(error_message)
+    save_job(task.job)
+    downloads_finished.labels(format=DownloadFormat(task.request.format).value, status="failed").inc()
+
+
+async def _process_postprocess(task: PostprocessTask):
+    """Convert a fetched download once the post-processing pool has a worker for it."""
+    try:
+        await get_ytdlp_service().convert_audio(
+            task.job, task.source_path, task.plan, command_prefix=postprocess_pool.command_prefix
+        )
+        await _finish_download(task.job, DownloadFormat(task.request.format).value, task.started)
+        
+    except Exception as e:
+        _fail_postprocess(task, str(e))
+    finally:
+        download_scheduler.finish(task.job)
+
+
+def _drop_postprocess(task: PostprocessTask):
+    """Fail a fetched download still waiting for conversion when the pool stops."""
+    try:
+        _fail_postprocess(task, "Server shut down before the download was converted")
+    finally:
+        download_scheduler.finish(task.job)
+
+
+download_scheduler = DownloadScheduler(_process_download)
+postprocess_pool = PostprocessPool(_process_postprocess, on_dropped=_drop_postprocess)
+artifact_store = ArtifactStore()
+storage_governor = StorageGovernor()
+
+
+def enqueue_download(request: DownloadRequest, job: DownloadJob) -> Optional[int]:
+    """Start a saved job, returning its queue position.
+    
+    Returns None if the job was satisfied by an existing artifact or
+    attached to an identical download that is already running. Raises
+    StorageFullError if it won't fit on disk and SchedulerFullError if
+    the scheduler has no room for it.
+    """
+    # Reuse a finished download or join one already running
+    if artifact_store.attach(request, job):
+        return None
+    
+    # Reserve disk space, evicting old downloads if needed
+    storage_governor.admit(request, job)
+    
+    # Queue download for the scheduler
+    artifact_store.register_leader(job)
+    try:
+        return download_scheduler.submit(request, job)
+    except SchedulerFullError:
+        artifact_store.unregister_leader(job)
+        storage_governor.release(job)
+        raise
 
 
 @router.post("/download")
-async def start_download(request: DownloadRequest, background_tasks: BackgroundTasks):
-    """Start a download job."""
+async def start_download(request: DownloadRequest):
+    """Queue a download job."""
     try:
         # Create download job
         job = DownloadJob(request_id=request.id)
         save_job(job)
         
-        # Start download in background
-        background_tasks.add_task(
-            _process_download,
-            request,
-            job
-        )
+        try:
+            queue_position = enqueue_download(request, job)
+        except StorageFullError as e:
+            delete_job(job.id)
+            raise HTTPException(status_code=507, detail=str(e))
+        except SchedulerFullError as e:
+            delete_job(job.id)
+            raise HTTPException(status_code=429, detail=str(e))
+        
+        # Reused or joined downloads never enter the queue
+        if queue_position is None:
+            return {
+                "job_id": job.id,
+                "status": job.status,
+                "queue_position": 0,
+                "message": "Download shared with an identical request"
+            }
         
         return {
             "job_id": job.id,
             "status": job.status,
-            "message": "Download started"
+            "queue_position": queue_position,
+            "message": "Download queued"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/download/{job_id}")
-async def download_file(job_id: str):
-    """Download the completed file."""
+@router.get("/download/queue")
+async def get_queue_stats():
+    """Get download queue depth and worker occupancy."""
+    return {
+        **download_scheduler.get_stats(),
+        "engine": get_ytdlp_service().engine.get_stats(),
+        "postprocess": postprocess_pool.get_stats()
+    }
+
+
+@router.get("/download/artifacts")
+async def get_artifact_stats():
+    """Get artifact reuse and coalescing statistics."""
+    return artifact_store.get_stats()
+
+
+@router.get("/download/storage")
+async def get_storage_stats():
+    """Get disk usage and storage admission/eviction decisions."""
+    return storage_governor.get_stats()
+
+
+@router.get("/download/{job_id}/archive")
+async def download_archive(job_id: str):
+    """Download every file of a completed job (media, subtitles, info JSON) as a ZIP."""
+    try:
+        job = get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        if job.status != JobStatus.COMPLETED:
+            raise HTTPException(status_code=404, detail="Files not ready for download")
+        
+        paths = get_file_service().list_job_artifacts(job)
+        if not paths:
+            raise HTTPException(status_code=410, detail="Files have expired and been deleted")
+        
+        storage_governor.touch(job)
+        entries = [ZipEntry(path, os.path.basename(path)) for path in paths]
+        return zip_response(entries, f"{Path(job.file_path).stem}.zip")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.api_route("/download/{job_id}", methods=["GET", "HEAD"])
+async def download_file(job_id: str, http_request: Request):
+    """Download the completed file, honouring Range and conditional headers."""
     try:
         # Get job
         job = get_job(job_id)
@@ -55,18 +220,22 @@ async def download_file(job_id: str):
             raise HTTPException(status_code=404, detail="Job not found")
         
         # Check if job is completed
+        if job.status == JobStatus.EXPIRED:
+            raise HTTPException(status_code=410, detail="File has expired and been deleted")
         if job.status != JobStatus.COMPLETED:
             raise HTTPException(status_code=404, detail="File not ready for download")
         
         # Check if file exists
-        if not job.file_path or not file_service.file_exists(job.file_path):
+        if not job.file_path or not get_file_service().file_exists(job.file_path):
             raise HTTPException(status_code=410, detail="File has expired and been deleted")
         
         # Return file
-        return FileResponse(
+        storage_governor.touch(job)
+        return RangeFileResponse(
             path=job.file_path,
+            request_headers=http_request.headers,
             filename=os.path.basename(job.file_path),
-            media_type='application/octet-stream'
+            method=http_request.method
         )
         
     except HTTPException:
@@ -74,19 +243,3 @@ async def download_file(job_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-
-async def _process_download(request: DownloadRequest, job: DownloadJob):
-    """Process download in background."""
-    try:
-        # Update job status
-        job.update_progress(0, JobStatus.PROCESSING)
-        
-        # Download video
-        file_path = await ytdlp_service.download_video(request, job)
-        
-        # Update job with file information
-        file_size = file_service.get_file_size(file_path)
-        job.mark_completed(file_path, file_size)
-        
-    except Exception as e:
-        job.mark_failed(str(e))
@@ -6,12 +6,15 @@ from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
 
 from ..models.video_metadata import VideoMetadata
-from ..services.ytdlp_service import YtDlpService
+from ..services.ytdlp_service import get_ytdlp_service
 
 router = APIRouter()
 
-# Initialize service
-ytdlp_service = YtDlpService()
+
+@router.get("/metadata/cache")
+async def get_metadata_cache_stats():
+    """Get metadata cache hit/miss/eviction counters."""
+    return get_ytdlp_service().metadata_cache.get_stats()
 
 
 @router.post("/metadata")
@@ -25,7 +28,7 @@ async def get_video_metadata(request: Dict[str, str]):
         url = request["url"]
         
         # Extract metadata
-        metadata = await ytdlp_service.extract_metadata(url)
+        metadata = await get_ytdlp_service().extract_metadata(url)
         
         # Return metadata
         return {
@@ -38,7 +41,9 @@ async def get_video_metadata(request: Dict[str, str]):
             "view_count": metadata.view_count,
             "upload_date": metadata.upload_date,
             "available_formats": metadata.available_formats,
+            "formats": [fmt.model_dump() for fmt in metadata.formats],
             "available_subtitles": metadata.available_subtitles,
+            "filesize": metadata.filesize,
             "extracted_at": metadata.extracted_at
         }
         
@@ -0,0 +1,131 @@
+"""
+Metrics API endpoint for yt-dlp Web UI.
+"""
+
+from fastapi import APIRouter, Response
+from typing import List
+
+from ..services.disk_sweeper import disk_sweeper
+from ..services.format_planner import format_planner
+from ..services.postprocess_planner import postprocess_planner
+from ..services.job_waiter import job_waiter
+from ..services.metadata_cache import metadata_cache
+from ..services.metrics import Counter, Gauge, Metric, registry
+from ..services.progress_bus import progress_bus
+from ..services.ytdlp_engine import get_engine
+from ..services.ytdlp_service import get_ytdlp_service
+from . import batch, download
+
+router = APIRouter()
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _gauge(name: str, documentation: str, value: float) -> Gauge:
+    gauge = Gauge(name, documentation)
+    gauge.set(value)
+    return gauge
+
+
+def _collect_pipeline() -> List[Metric]:
+    """Read the current state of every stage of the download pipeline."""
+    scheduler = download.download_scheduler.get_stats()
+    postprocessing = download.postprocess_pool.get_stats()
+    engine = get_engine().get_stats()
+    cache = metadata_cache.get_stats()
+    artifacts = download.artifact_store.get_stats()
+    storage = download.storage_governor.get_stats()
+    batches = batch.batch_service.get_stats()
+    formats = format_planner.get_stats()
+    postprocess = postprocess_planner.get_stats()
+    
+    jobs = Counter("ytdlp_scheduler_jobs", "Jobs seen by the download scheduler, by outcome.", ["outcome"])
+    for outcome in ("submitted", "rejected", "completed", "failed"):
+        jobs.labels(outcome=outcome).inc(scheduler[outcome])
+    
+    lookups = Counter("ytdlp_metadata_cache_lookups", "Metadata cache lookups, by result.", ["result"])
+    for result in ("hits", "disk_hits", "misses", "coalesced"):
+        lookups.labels(result=result).inc(cache[result])
+    
+    plans = Counter("ytdlp_format_plans", "Video downloads planned, by kind of format choice.", ["plan"])
+    for plan in ("single", "merged", "fallback"):
+        plans.labels(plan=plan).inc(formats[plan])
+    
+    conversions = Counter("ytdlp_postprocess_plans", "Audio downloads planned, by conversion.", ["action"])
+    for action in ("copy", "remux", "encode", "unplanned"):
+        conversions.labels(action=action).inc(postprocess[action])
+    cpu_saved = Counter("ytdlp_postprocess_cpu_saved_seconds", "Estimated CPU time saved by not transcoding audio.")
+    cpu_saved.inc(postprocess["cpu_seconds_saved"])
+    
+    admissions = Counter("ytdlp_storage_admissions", "Downloads checked against free disk space, by decision.", ["decision"])
+    admissions.labels(decision="admitted").inc(storage["admitted"] - storage["admitted_after_eviction"])
+    admissions.labels(decision="admitted_after_eviction").inc(storage["admitted_after_eviction"])
+    admissions.labels(decision="refused").inc(storage["refused"])
+    admissions.labels(decision="withdrawn").inc(storage["withdrawn"])
+    eviction_runs = Counter("ytdlp_storage_eviction_runs", "Eviction passes started by the disk high watermark.")
+    eviction_runs.inc(storage["eviction_runs"])
+    evictions = Counter("ytdlp_storage_evictions", "Completed downloads evicted to free disk space.")
+    evictions.inc(storage["evicted"])
+    evicted_bytes = Counter("ytdlp_storage_evicted_bytes", "Bytes freed by evicting completed downloads.")
+    evicted_bytes.inc(storage["bytes_evicted"])
+    unestimated = Counter("ytdlp_storage_unestimated", "Downloads checked without a size estimate.")
+    unestimated.inc(storage["unestimated"])
+    
+    # Requests served by an existing or in-flight download instead of a new one
+    shared = artifacts["reused"] + artifacts["coalesced"]
+    hit_ratio = Gauge("ytdlp_cache_hit_ratio", "Fraction of lookups answered without running yt-dlp.", ["cache"])
+    hit_ratio.labels(cache="metadata").set(cache["hit_ratio"])
+    hit_ratio.labels(cache="artifacts").set(
+        shared / (shared + scheduler["submitted"]) if shared + scheduler["submitted"] else 0.0
+    )
+    
+    return [
+        _gauge("ytdlp_queue_depth", "Downloads waiting for a worker.", scheduler["queue_depth"]),
+        _gauge("ytdlp_queue_capacity", "Maximum number of queued downloads.", scheduler["max_queue_size"]),
+        _gauge("ytdlp_download_workers", "Download workers in the scheduler.", scheduler["worker_count"]),
+        _gauge("ytdlp_download_workers_active", "Download workers running a job.", scheduler["active_workers"]),
+        _gauge(
+            "ytdlp_download_jobs_handed_off",
+            "Downloaded jobs the scheduler handed to post-processing that are not finished.",
+            scheduler["handed_off"]
+        ),
+        _gauge("ytdlp_postprocess_queue_depth", "Fetched downloads waiting for conversion.", postprocessing["queue_depth"]),
+        _gauge("ytdlp_postprocess_workers", "Conversion workers in the post-processing pool.", postprocessing["worker_count"]),
+        _gauge("ytdlp_postprocess_workers_active", "Conversion workers running ffmpeg.", postprocessing["active_workers"]),
+        _gauge("ytdlp_subprocesses_active", "yt-dlp processes currently running.", engine.get("active_processes", 0)),
+        _gauge(
+            "ytdlp_download_throughput_bytes_per_second",
+            "Combined speed reported by running downloads.",
+            get_ytdlp_service().get_throughput()
+        ),
+        jobs,
+        _gauge("ytdlp_sse_subscribers", "Open progress event streams.", progress_bus.subscriber_count),
+        _gauge("ytdlp_progress_channels", "Open multiplexed progress sockets.", progress_bus.channel_count),
+        _gauge("ytdlp_status_waiters", "Status requests waiting for a job to change.", job_waiter.waiting),
+        hit_ratio,
+        lookups,
+        plans,
+        conversions,
+        cpu_saved,
+        _gauge("ytdlp_metadata_cache_entries", "Entries in the in-memory metadata cache.", cache["entries"]),
+        _gauge("ytdlp_downloads_bytes", "Bytes under the downloads directory.", disk_sweeper.total_bytes),
+        _gauge("ytdlp_disk_used_ratio", "Fraction of the downloads filesystem in use.", storage["used_ratio"]),
+        _gauge("ytdlp_disk_reserved_bytes", "Disk space reserved for running downloads.", storage["reserved_bytes"]),
+        _gauge("ytdlp_disk_evictable_bytes", "Bytes of completed downloads that may be evicted.", storage["evictable_bytes"]),
+        admissions,
+        eviction_runs,
+        evictions,
+        evicted_bytes,
+        unestimated,
+        _gauge("ytdlp_batches_expanding", "Playlists still being expanded.", batches["expanding"])
+    ]
+
+
+registry.add_collector(_collect_pipeline)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Expose pipeline metrics in the Prometheus text format."""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -2,20 +2,81 @@
 Progress API endpoints for yt-dlp Web UI.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import asyncio
 import json
+import logging
 
-from ..models.download_job import DownloadJob, JobStatus
+from ..models.download_job import DownloadJob
+from ..services.progress_bus import progress_bus, progress_payload
 from ..storage.job_storage import get_job
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _format_event(event_id: int, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Event frame."""
+    return f"id: {event_id}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.websocket("/progress/ws")
+async def progress_socket(websocket: WebSocket):
+    """Multiplex progress for many jobs over one WebSocket.
+    
+    The client sends ``{"action": "subscribe", "job_ids": [...]}`` or
+    ``{"action": "unsubscribe", "job_ids": [...]}``. The server answers
+    with frames of ``{"events": [...]}`` holding the latest state of each
+    job that changed since the previous frame, plus ``"errors"`` for
+    requests it could not honour. Finished jobs are unsubscribed
+    automatically after their final event.
+    """
+    await websocket.accept()
+    channel = progress_bus.open_channel()
+    
+    async def send_frames():
+        try:
+            async for frame in channel.frames():
+                await websocket.send_text(json.dumps(frame))
+        except Exception as e:
+            logger.debug(f"Progress socket send failed: {e}")
+    
+    sender = asyncio.create_task(send_frames())
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                action = message["action"]
+                job_ids = message["job_ids"]
+                if action not in ("subscribe", "unsubscribe"):
+                    raise ValueError(f"unknown action {action!r}")
+                if not isinstance(job_ids, list):
+                    raise TypeError("job_ids must be a list")
+            except (ValueError, KeyError, TypeError) as e:
+                channel.reject(None, f"Invalid message: {e}")
+                continue
+            
+            for job_id in job_ids:
+                job_id = str(job_id)
+                if action == "subscribe":
+                    job = get_job(job_id)
+                    if job is None:
+                        channel.reject(job_id, "Job not found")
+                    else:
+                        channel.subscribe(job)
+                else:
+                    channel.unsubscribe(job_id)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        progress_bus.close_channel(channel)
+        sender.cancel()
 
 
 @router.get("/progress/{job_id}")
-async def stream_progress(job_id: str):
+async def stream_progress(job_id: str, last_event_id: Optional[str] = Header(default=None)):
     """Stream download progress via Server-Sent Events."""
     try:
         # Get job
@@ -23,33 +84,30 @@ async def stream_progress(job_id: str):
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
+        try:
+            resume_from = int(last_event_id) if last_event_id else 0
+        except ValueError:
+            resume_from = 0
+        
         # Create SSE stream
         async def event_generator():
-            last_progress = -1
+            cursor = resume_from
             
-            while True:
-                # Get current job status
-                current_job = get_job(job_id)
-                if not current_job:
-                    break
-                
-                # Send progress update if changed
-                if current_job.progress != last_progress:
-                    event_data = {
-                        "job_id": current_job.id,
-                        "status": current_job.status,
-                        "progress": current_job.progress
-                    }
-                    
-                    yield f"data: {json.dumps(event_data)}\n\n"
-                    last_progress = current_job.progress
-                
-                # Stop if job is completed or failed
-                if current_job.status in [JobStatus.COMPLETED, JobStatus.FAILED]:
-                    break
+            # Without a resumable Last-Event-ID, start from the job's current state
+            if not cursor or not progress_bus.can_resume(job_id, cursor):
+                cursor = progress_bus.latest_event_id(job_id)
+                yield _format_event(cursor, progress_payload(job))
+                if job.is_finished():
+                    return
+            
+            # Push every subsequent change as soon as it is published
+            subscription = progress_bus.subscribe(job_id, last_event_id=cursor, refresh=lambda: get_job(job_id))
+            async for event in subscription:
+                if event is None:
+                    yield ": heartbeat\n\n"
+                    continue
                 
-                # Wait before next update
-                await asyncio.sleep(1)
+                yield _format_event(event.id, event.data)
         
         return StreamingResponse(
             event_generator(),
@@ -57,6 +115,7 @@ async def stream_progress(job_id: str):
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
+                "X-Accel-Buffering": "no",
             }
         )
         
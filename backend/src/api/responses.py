@@ -0,0 +1,327 @@
+"""
+File responses with HTTP range support for yt-dlp Web UI.
+"""
+
+import mimetypes
+import os
+import secrets
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.background import BackgroundTask
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from ..services.zip_stream import ZipEntry, ZipStream
+
+# Bytes read per chunk when the server can't send the file itself
+CHUNK_SIZE = 1024 * 1024
+
+# Requests with more ranges than this are served the whole file instead
+MAX_RANGES = 16
+
+# ASGI extension that lets the server copy file data to the socket itself
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+ByteRange = Tuple[int, int]
+
+
+def make_etag(st: os.stat_result) -> str:
+    """Build a strong ETag for a file.
+    
+    Completed downloads are never rewritten in place, so the inode, size
+    and modification time identify the exact bytes. Hard-linked copies of
+    a shared artifact get the same ETag.
+    """
+    return f'"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def guess_media_type(path: str) -> str:
+    """Guess a file's media type from its extension."""
+    media_type, _ = mimetypes.guess_type(path)
+    return media_type or "application/octet-stream"
+
+
+def parse_range_header(header: str, size: int) -> Optional[List[ByteRange]]:
+    """Parse a Range header into sorted, merged, inclusive byte ranges.
+    
+    Returns None if the header is malformed or uses another unit, in
+    which case it must be ignored. Returns an empty list if no range is
+    satisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+    
+    ranges: List[ByteRange] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start_text, sep, end_text = part.partition("-")
+        if not sep:
+            return None
+        
+        try:
+            if not start_text:
+                # Suffix range: the last N bytes
+                length = int(end_text)
+                if length <= 0:
+                    continue
+                start, end = max(0, size - length), size - 1
+            else:
+                start = int(start_text)
+                end = int(end_text) if end_text else size - 1
+                if end_text and end < start:
+                    return None
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        
+        if start < 0:
+            return None
+        if start < size:
+            ranges.append((start, end))
+    
+    # Merge overlapping and adjacent ranges so no byte is sent twice
+    ranges.sort()
+    merged: List[ByteRange] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def content_disposition(filename: str) -> str:
+    """Build an attachment Content-Disposition header for a filename."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def zip_response(entries: List[ZipEntry], filename: str) -> StreamingResponse:
+    """Stream files as a ZIP archive built while it is being sent."""
+    stream = ZipStream(entries)
+    headers = {"content-disposition": content_disposition(filename)}
+    length = stream.content_length()
+    if length is not None:
+        headers["content-length"] = str(length)
+    return StreamingResponse(stream, media_type="application/zip", headers=headers)
+
+
+def _etag_matches(header: str, etag: str, weak: bool) -> bool:
+    """Check an If-None-Match / If-Range style entity-tag list."""
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if weak:
+            candidate = candidate[2:] if candidate.startswith("W/") else candidate
+        if candidate == etag:
+            return True
+    return False
+
+
+class RangeFileResponse(Response):
+    """Serve a file with ETag, conditional and byte-range support.
+    
+    Handles If-None-Match, If-Modified-Since, If-Range and single or
+    multiple byte ranges (as multipart/byteranges). When the ASGI server
+    offers the zero-copy send extension, file data is passed to it as a
+    descriptor so the kernel copies it with sendfile; otherwise the file
+    is streamed in large chunks read off the event loop.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        request_headers: Mapping[str, str],
+        filename: Optional[str] = None,
+        media_type: Optional[str] = None,
+        method: str = "GET",
+        background: Optional[BackgroundTask] = None
+    ):
+        """Initialize RangeFileResponse."""
+        self.path = path
+        self.status_code = 200
+        self.media_type = media_type or guess_media_type(filename or path)
+        self.background = background
+        self.send_body = method.upper() != "HEAD"
+        self.ranges: List[ByteRange] = []
+        self.boundary: Optional[str] = None
+        self._parts: List[Tuple[bytes, ByteRange]] = []
+        
+        st = os.stat(path)
+        if not stat.S_ISREG(st.st_mode):
+            raise RuntimeError(f"Not a regular file: {path}")
+        self.file_size = st.st_size
+        self.etag = make_etag(st)
+        self.last_modified = formatdate(st.st_mtime, usegmt=True)
+        
+        self.init_headers({
+            "accept-ranges": "bytes",
+            "etag": self.etag,
+            "last-modified": self.last_modified,
+            "content-type": self.media_type
+        })
+        if filename:
+            self.headers["content-disposition"] = content_disposition(filename)
+        
+        self._evaluate(request_headers, st.st_mtime)
+    
+    def _evaluate(self, request_headers: Mapping[str, str], mtime: float) -> None:
+        """Apply conditional and range headers to decide what to send."""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            if _etag_matches(if_none_match, self.etag, weak=True):
+                self._not_modified()
+                return
+        elif self._not_modified_since(request_headers.get("if-modified-since"), mtime):
+            self._not_modified()
+            return
+        
+        range_header = request_headers.get("range")
+        if not range_header or not self._if_range_allows(request_headers.get("if-range")):
+            self._whole_file()
+            return
+        
+        ranges = parse_range_header(range_header, self.file_size)
+        if ranges is None or len(ranges) > MAX_RANGES:
+            self._whole_file()
+        elif not ranges:
+            self.status_code = 416
+            self.headers["content-range"] = f"bytes */{self.file_size}"
+            self.headers["content-length"] = "0"
+            del self.headers["content-type"]
+            self.send_body = False
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            self.status_code = 206
+            self.ranges = ranges
+            self.headers["content-range"] = f"bytes {start}-{end}/{self.file_size}"
+            self.headers["content-length"] = str(end - start + 1)
+        else:
+            self._multipart(ranges)
+    
+    def _not_modified_since(self, header: Optional[str], mtime: float) -> bool:
+        if not header:
+            return False
+        try:
+            return int(mtime) <= parsedate_to_datetime(header).timestamp()
+        except (TypeError, ValueError):
+            return False
+    
+    def _if_range_allows(self, header: Optional[str]) -> bool:
+        """Check If-Range; a range is only honoured if the file is unchanged."""
+        if header is None:
+            return True
+        header = header.strip()
+        if header.startswith('"') or header.startswith("W/"):
+            # Strong comparison: a weak validator never matches
+            return header == self.etag
+        return header == self.last_modified
+    
+    def _not_modified(self) -> None:
+        self.status_code = 304
+        del self.headers["content-type"]
+        if "content-disposition" in self.headers:
+            del self.headers["content-disposition"]
+        self.send_body = False
+    
+    def _whole_file(self) -> None:
+        self.ranges = [(0, self.file_size - 1)] if self.file_size else []
+        self.headers["content-length"] = str(self.file_size)
+    
+    def _multipart(self, ranges: List[ByteRange]) -> None:
+        self.status_code = 206
+        self.ranges = ranges
+        self.boundary = secrets.token_hex(16)
+        
+        length = 0
+        for start, end in ranges:
+            part_header = (
+                f"--{self.boundary}\r\n"
+                f"Content-Type: {self.media_type}\r\n"
+                f"Content-Range: bytes {start}-{end}/{self.file_size}\r\n\r\n"
+            ).encode("latin-1")
+            self._parts.append((part_header, (start, end)))
+            length += len(part_header) + (end - start + 1) + 2
+        length += len(f"--{self.boundary}--\r\n")
+        
+        self.headers["content-type"] = f"multipart/byteranges; boundary={self.boundary}"
+        self.headers["content-length"] = str(length)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self._send_response(scope, send)
+        finally:
+            if self.background is not None:
+                await self.background()
+    
+    async def _send_response(self, scope: Scope, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        
+        if not self.send_body or not self.ranges:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        
+        zerocopy = ZEROCOPY_EXTENSION in scope.get("extensions", {})
+        fd = await anyio.to_thread.run_sync(os.open, self.path, os.O_RDONLY)
+        try:
+            if self.boundary is None:
+                start, end = self.ranges[0]
+                await self._send_range(send, fd, start, end, zerocopy, more_body=False)
+                return
+            
+            for part_header, (start, end) in self._parts:
+                await send({"type": "http.response.body", "body": part_header, "more_body": True})
+                await self._send_range(send, fd, start, end, zerocopy, more_body=True)
+                await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+            closing = f"--{self.boundary}--\r\n".encode("latin-1")
+            await send({"type": "http.response.body", "body": closing, "more_body": False})
+        finally:
+            os.close(fd)
+    
+    async def _send_range(
+        self,
+        send: Send,
+        fd: int,
+        start: int,
+        end: int,
+        zerocopy: bool,
+        more_body: bool
+    ) -> None:
+        """Send bytes start..end (inclusive) of an open file."""
+        if zerocopy:
+            await send({
+                "type": ZEROCOPY_EXTENSION,
+                "file": fd,
+                "offset": start,
+                "count": end - start + 1,
+                "more_body": more_body
+            })
+            return
+        
+        # pread keeps no file position, so ranges never interfere
+        position = start
+        while position <= end:
+            size = min(CHUNK_SIZE, end - position + 1)
+            chunk = await anyio.to_thread.run_sync(os.pread, fd, size, position)
+            if not chunk:
+                raise RuntimeError(f"File shrank while being sent: {self.path}")
+            position += len(chunk)
+            await send({
+                "type": "http.response.body",
+                "body": chunk,
+                "more_body": more_body or position <= end
+            })
@@ -2,37 +2,167 @@
 Status API endpoints for yt-dlp Web UI.
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
-import os
-import time
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import JSONResponse, Response
+from fastapi.encoders import jsonable_encoder
+from typing import Dict, Any, List, Optional, Union
+import asyncio
+import hashlib
 
 from ..models.download_job import DownloadJob, JobStatus
-from ..storage.job_storage import get_job
+from ..models.job_record import JobRecord
+from ..services.activity_tracker import activity_tracker
+from ..services.job_waiter import job_waiter
+from ..services.stage_timeline import stage_timeline
+from ..storage.job_storage import get_job, peek_job
 
 router = APIRouter()
 
+# Most job IDs one bulk status request may list
+MAX_BULK_IDS = 100
+
+# Longest a bulk status request may wait for a change
+MAX_WAIT_SECONDS = 60.0
+
+
+def _status_payload(job: Union[DownloadJob, JobRecord]) -> Dict[str, Any]:
+    """Build the status response body for a job."""
+    return {
+        "job_id": job.id,
+        "version": job.version,
+        "status": job.status,
+        "progress": job.progress,
+        "file_path": job.file_path,
+        "file_size": job.file_size,
+        "downloaded_bytes": job.downloaded_bytes,
+        "total_bytes": job.total_bytes,
+        "speed": job.speed,
+        "eta": job.eta,
+        "error_message": job.error_message,
+        "cpu_seconds_saved": job.cpu_seconds_saved,
+        "started_at": job.started_at,
+        "completed_at": job.completed_at,
+        "expires_at": job.expires_at
+    }
+
+
+def _etag(job_ids: List[str]) -> str:
+    """Entity tag identifying the current version of every listed job."""
+    versions = []
+    for job_id in job_ids:
+        job = peek_job(job_id)
+        versions.append(f"{job_id}:{job.version if job else '-'}")
+    return '"' + hashlib.sha1(",".join(versions).encode()).hexdigest()[:20] + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an entity tag."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+@router.get("/status")
+async def get_bulk_status(
+    ids: str = Query(..., description="Comma-separated job IDs"),
+    wait: float = Query(default=0, ge=0, description="Seconds to wait for any of the jobs to change"),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """Get the status of several download jobs at once.
+    
+    The response carries an ETag covering every listed job's version;
+    sending it back in If-None-Match yields 304 while nothing changed.
+    With ``wait``, the request is held until one of the jobs changes
+    (relative to If-None-Match, or to their state on arrival) or the
+    wait runs out.
+    """
+    try:
+        job_ids = list(dict.fromkeys(job_id.strip() for job_id in ids.split(",") if job_id.strip()))
+        if not job_ids:
+            raise HTTPException(status_code=400, detail="No job IDs given")
+        if len(job_ids) > MAX_BULK_IDS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_IDS} job IDs per request")
+        
+        etag = _etag(job_ids)
+        if wait and (not if_none_match or _etag_matches(if_none_match, etag)):
+            baseline = etag
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + min(wait, MAX_WAIT_SECONDS)
+            while etag == baseline:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                changed = await job_waiter.wait(job_ids, remaining, lambda: _etag(job_ids) != baseline)
+                etag = _etag(job_ids)
+                if not changed:
+                    break
+        
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
+        jobs = []
+        missing = []
+        for job_id in job_ids:
+            job = peek_job(job_id)
+            if job:
+                jobs.append(_status_payload(job))
+            else:
+                missing.append(job_id)
+        
+        return JSONResponse(jsonable_encoder({"jobs": jobs, "missing": missing}), headers=headers)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/status/stages")
+async def get_stage_stats():
+    """Get per-stage duration percentiles across recently completed jobs."""
+    return stage_timeline.get_stats()
+
 
 @router.get("/status/{job_id}")
-async def get_job_status(job_id: str):
+async def get_job_status(job_id: str, if_none_match: Optional[str] = Header(default=None)):
     """Get the status of a download job."""
     try:
         # Get job
-        job = get_job(job_id)
+        job = peek_job(job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         
+        # Nothing changed since the client's copy
+        etag = _etag([job_id])
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
         # Return job status
+        return JSONResponse(jsonable_encoder(_status_payload(job)), headers=headers)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/status/{job_id}/timeline")
+async def get_job_timeline(job_id: str):
+    """Get how long a download job spent in each stage."""
+    try:
+        job = get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        timeline = job.get_timeline()
         return {
             "job_id": job.id,
             "status": job.status,
-            "progress": job.progress,
-            "file_path": job.file_path,
-            "file_size": job.file_size,
-            "error_message": job.error_message,
-            "started_at": job.started_at,
-            "completed_at": job.completed_at,
-            "expires_at": job.expires_at
+            "stages": timeline,
+            "total_seconds": sum(entry["duration_seconds"] for entry in timeline)
         }
         
     except HTTPException:
@@ -45,15 +175,18 @@ async def get_job_status(job_id: str):
 async def update_activity():
     """Update the last activity timestamp for idle monitoring."""
     try:
-        # Get the project root directory (go up from backend/src/api)
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../.."))
-        activity_file = os.path.join(project_root, ".last_activity")
-        
-        # Update activity timestamp
-        with open(activity_file, 'w') as f:
-            f.write(str(int(time.time())))
+        timestamp = activity_tracker.touch()
+        return {"status": "activity_updated", "timestamp": int(timestamp)}
         
-        return {"status": "activity_updated", "timestamp": int(time.time())}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/activity")
+async def get_activity():
+    """Get seconds since the last activity, counting work in progress as activity."""
+    try:
+        return activity_tracker.get_status()
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
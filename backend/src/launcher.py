@@ -0,0 +1,153 @@
+"""
+Socket-activated launcher for yt-dlp Web UI.
+
+Holds the API's listening socket while the backend is down and starts
+uvicorn on the first incoming connection, passing it the socket so the
+connection that woke it is served instead of refused. When the backend
+exits (e.g. stopped by idle-monitor.sh), the launcher goes back to
+waiting. Only the standard library is imported here, so the launcher
+itself costs next to nothing to keep running. Run from the backend
+directory:
+
+    python -m src.launcher --port 8000 --pid-file ../.backend-worker.pid
+"""
+
+import argparse
+import logging
+import os
+import select
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+# Default command; {fd} is replaced with the inherited listening socket
+DEFAULT_COMMAND = "{python} -m uvicorn src.main:app --fd {fd}"
+
+# A backend that exits sooner than this after starting is treated as crashed
+MIN_UPTIME_SECONDS = 5.0
+
+# Delay before restarting a crashed backend, doubling up to the maximum
+RESTART_DELAY_SECONDS = 1.0
+MAX_RESTART_DELAY_SECONDS = 30.0
+
+
+class Launcher:
+    """Starts the backend on demand on a socket it keeps open."""
+    
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        command: str = DEFAULT_COMMAND,
+        pid_file: Optional[str] = None,
+        backlog: int = 512
+    ):
+        """Initialize Launcher."""
+        self.host = host
+        self.port = port
+        self.command = command
+        self.pid_file = pid_file
+        self.backlog = backlog
+        self.logger = logging.getLogger(__name__)
+        
+        self._socket: Optional[socket.socket] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._stopping = False
+        self._restart_delay = RESTART_DELAY_SECONDS
+        
+        # Counters
+        self.starts = 0
+    
+    def bind(self) -> None:
+        """Create the listening socket the backend will inherit."""
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self._socket.listen(self.backlog)
+        self._socket.set_inheritable(True)
+        self.port = self._socket.getsockname()[1]
+    
+    def serve_forever(self) -> None:
+        """Start the backend whenever a connection arrives while it is down."""
+        if self._socket is None:
+            self.bind()
+        self.logger.info(f"Waiting for connections on {self.host}:{self.port}")
+        
+        while not self._stopping:
+            # The connection is left in the accept queue for the backend
+            readable, _, _ = select.select([self._socket], [], [], 1.0)
+            if not readable or self._stopping:
+                continue
+            
+            started = time.monotonic()
+            self._spawn()
+            returncode = self._process.wait()
+            self._process = None
+            self._remove_pid_file()
+            uptime = time.monotonic() - started
+            
+            if self._stopping:
+                break
+            if returncode != 0 and uptime < MIN_UPTIME_SECONDS:
+                self.logger.error(
+                    f"Backend exited with status {returncode} after {uptime:.1f}s, "
+                    f"restarting in {self._restart_delay:.0f}s"
+                )
+                time.sleep(self._restart_delay)
+                self._restart_delay = min(self._restart_delay * 2, MAX_RESTART_DELAY_SECONDS)
+            else:
+                self._restart_delay = RESTART_DELAY_SECONDS
+                self.logger.info(f"Backend stopped after {uptime:.0f}s, waiting for connections")
+        
+        self._socket.close()
+    
+    def stop(self, signum: Optional[int] = None, frame=None) -> None:
+        """Stop the backend, if running, and then the launcher."""
+        self._stopping = True
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+    
+    def _spawn(self) -> None:
+        args = self._build_command()
+        self._process = subprocess.Popen(args, pass_fds=(self._socket.fileno(),))
+        self.starts += 1
+        self.logger.info(f"Connection received, started backend (PID: {self._process.pid})")
+        if self.pid_file:
+            with open(self.pid_file, "w") as f:
+                f.write(str(self._process.pid))
+    
+    def _build_command(self) -> List[str]:
+        return shlex.split(
+            self.command.format(python=shlex.quote(sys.executable), fd=self._socket.fileno())
+        )
+    
+    def _remove_pid_file(self) -> None:
+        if self.pid_file:
+            try:
+                os.unlink(self.pid_file)
+            except FileNotFoundError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--command", default=DEFAULT_COMMAND, help="Backend command; {fd} is the socket, {python} this interpreter")
+    parser.add_argument("--pid-file", help="File holding the running backend's PID")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    launcher = Launcher(args.host, args.port, command=args.command, pid_file=args.pid_file)
+    signal.signal(signal.SIGTERM, launcher.stop)
+    signal.signal(signal.SIGINT, launcher.stop)
+    launcher.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,30 @@ Main FastAPI application for yt-dlp Web UI.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from datetime import datetime
+import asyncio
 import logging
+import os
 
-from .api import download, status, metadata, progress
+from .api import download, batch, status, metadata, progress, metrics
+from .services.activity_tracker import activity_tracker
 from .services.cleanup_service import CleanupService
-from .services.file_service import FileService
+from .services.expiry_scheduler import ExpiryScheduler
+from .services.metrics import event_loop_monitor
+from .services.job_waiter import job_waiter
+from .services.progress_bus import progress_bus
+from .services.ytdlp_engine import get_engine
+from .models.download_job import DownloadJob, JobStatus, notify_job_listeners
+from .storage.job_notifier import PEER_PROBE_INTERVAL, JobNotifier
+from .storage.job_storage import (
+    accept_job,
+    add_save_listener,
+    close_storage,
+    fail_interrupted_jobs,
+    get_all_jobs,
+    is_storage_shared
+)
+from .storage.leader_lock import LeaderLock
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -39,13 +58,97 @@ app.add_middleware(
 
 # Include routers
 app.include_router(download.router, prefix="/api", tags=["download"])
+app.include_router(batch.router, prefix="/api", tags=["batch"])
 app.include_router(status.router, prefix="/api", tags=["status"])
 app.include_router(metadata.router, prefix="/api", tags=["metadata"])
 app.include_router(progress.router, prefix="/api", tags=["progress"])
+app.include_router(metrics.router, tags=["metrics"])
 
 # Initialize services
-file_service = FileService()
-cleanup_service = CleanupService(file_service)
+cleanup_service = CleanupService()
+expiry_scheduler = ExpiryScheduler()
+
+
+def _on_peer_job_saved(job: DownloadJob) -> None:
+    """Apply a job saved by another worker process to this one."""
+    accept_job(job)
+    notify_job_listeners(job)
+
+
+# Work in progress keeps the idle monitor from stopping the server
+activity_tracker.add_busy_source(
+    "downloads",
+    lambda: download.download_scheduler.active_workers + download.download_scheduler.queue_depth
+)
+activity_tracker.add_busy_source(
+    "postprocessing",
+    lambda: download.postprocess_pool.active_workers + download.postprocess_pool.queue_depth
+)
+activity_tracker.add_busy_source("playlists", lambda: batch.batch_service.get_stats()["expanding"])
+activity_tracker.add_busy_source("progress_streams", lambda: progress_bus.subscriber_count)
+activity_tracker.add_busy_source("status_waiters", lambda: job_waiter.waiting)
+
+
+# Keeps worker processes (uvicorn --workers N) sharing the job store in sync
+job_notify_dir = os.getenv("JOB_NOTIFY_DIR", "data/workers")
+job_notifier = JobNotifier(job_notify_dir, _on_peer_job_saved)
+add_save_listener(job_notifier.publish)
+
+
+def _fail_interrupted_jobs() -> None:
+    """Fail the jobs of worker processes that exited; they cannot resume."""
+    live_workers = job_notifier.probe() if is_storage_shared() else None
+    interrupted = fail_interrupted_jobs(live_workers)
+    if interrupted:
+        logger.info(f"Marked {len(interrupted)} interrupted jobs as failed")
+
+
+async def _watch_workers() -> None:
+    """Notice worker processes exiting, and evict for the downloads of all of them."""
+    live_workers = job_notifier.probe()
+    departed = job_notifier.departed
+    while True:
+        await asyncio.sleep(PEER_PROBE_INTERVAL)
+        try:
+            current = job_notifier.probe()
+            if live_workers - current or job_notifier.departed != departed:
+                _fail_interrupted_jobs()
+            live_workers, departed = current, job_notifier.departed
+            
+            download.storage_governor.check()
+        except Exception as e:
+            logger.error(f"Error watching worker processes: {e}")
+
+
+async def _lead() -> None:
+    """Start the housekeeping only the elected worker process may run."""
+    _fail_interrupted_jobs()
+    
+    # Expire stored jobs as their expires_at passes; they were scheduled
+    # at startup and job changes have kept the schedule current since
+    await expiry_scheduler.start()
+    
+    # Evict completed downloads when the disk fills up
+    download.storage_governor.evicts = True
+    if is_storage_shared():
+        app.state.worker_watch = asyncio.create_task(_watch_workers())
+    
+    # Start cleanup scheduler
+    await cleanup_service.start_cleanup_scheduler()
+    logger.info("Cleanup scheduler started")
+
+
+# Elects the worker process that expires, evicts and cleans up for all of them
+leader_lock = LeaderLock(os.path.join(job_notify_dir, "leader.lock"), _lead)
+
+
+async def _warm_up_engine() -> None:
+    """Start the yt-dlp engine without holding up the first requests."""
+    try:
+        await get_engine().start()
+    except Exception as e:
+        # Downloads retry the start on demand
+        logger.error(f"Failed to warm up the yt-dlp engine: {e}")
 
 
 @app.on_event("startup")
@@ -53,9 +156,41 @@ async def startup_event():
     """Startup event handler."""
     logger.info("Starting yt-dlp Web UI API")
     
-    # Start cleanup scheduler
-    await cleanup_service.start_cleanup_scheduler()
-    logger.info("Cleanup scheduler started")
+    # Measure event loop lag for /metrics
+    await event_loop_monitor.start()
+    
+    # Join the other worker processes sharing the job store, if any
+    peers = job_notifier.start() if is_storage_shared() else 0
+    if peers:
+        logger.info(f"Sharing job state with {peers} other worker processes")
+    
+    # Read the stored jobs once: downloads from previous runs become
+    # available for reuse, and every job is scheduled to expire
+    stored_jobs = get_all_jobs().values()
+    for job in stored_jobs:
+        if job.status == JobStatus.COMPLETED:
+            download.artifact_store.index_completed_job(job)
+            download.storage_governor.track(job)
+    expiry_scheduler.load(stored_jobs)
+    
+    # Expiry, eviction and cleanup run in one worker process, taken over
+    # by another if it exits
+    app.state.worker_watch = None
+    download.storage_governor.evicts = False
+    if is_storage_shared():
+        await leader_lock.start()
+    else:
+        await _lead()
+    
+    # Warm up the yt-dlp engine in the background; the first download waits for it
+    app.state.engine_warmup = asyncio.create_task(_warm_up_engine())
+    
+    # Start download scheduler and the post-processing pool it hands conversions to
+    await download.download_scheduler.start()
+    await download.postprocess_pool.start()
+    
+    # Write user activity for the idle monitor
+    await activity_tracker.start()
 
 
 @app.on_event("shutdown")
@@ -63,9 +198,29 @@ async def shutdown_event():
     """Shutdown event handler."""
     logger.info("Shutting down yt-dlp Web UI API")
     
-    # Stop cleanup scheduler
+    # Stop playlist expansion and the download scheduler
+    await batch.batch_service.stop()
+    await download.download_scheduler.stop()
+    await download.postprocess_pool.stop()
+    await download.storage_governor.stop()
+    app.state.engine_warmup.cancel()
+    await get_engine().stop()
+    
+    # Stop cleanup and expiry schedulers
+    if app.state.worker_watch is not None:
+        app.state.worker_watch.cancel()
+    await expiry_scheduler.stop()
     await cleanup_service.stop_cleanup_scheduler()
     logger.info("Cleanup scheduler stopped")
+    
+    # Flush buffered job writes before other workers stop hearing from us,
+    # then hand leadership to one of them
+    close_storage()
+    job_notifier.stop()
+    await leader_lock.stop()
+    
+    await activity_tracker.stop()
+    await event_loop_monitor.stop()
 
 
 @app.get("/")
@@ -83,7 +238,7 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "timestamp": "2024-12-19T00:00:00Z"
+        "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
 
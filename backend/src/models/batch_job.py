@@ -0,0 +1,57 @@
+"""
+BatchJob model for yt-dlp Web UI.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from uuid import uuid4
+from pydantic import BaseModel, Field
+
+from .download_job import JobStatus
+
+
+class BatchJob(BaseModel):
+    """Parent of the download jobs created from one playlist or channel."""
+    
+    id: str = Field(default_factory=lambda: str(uuid4()))
+    request_id: str = Field(..., description="Reference to BatchRequest")
+    url: str = Field(..., description="Playlist or channel URL")
+    status: JobStatus = Field(default=JobStatus.PENDING, description="Current batch status")
+    expanding: bool = Field(default=True, description="Whether entries are still being discovered")
+    child_job_ids: List[str] = Field(default_factory=list, description="Download jobs in playlist order")
+    skipped: int = Field(default=0, ge=0, description="Entries that are not downloadable videos")
+    completed: int = Field(default=0, ge=0, description="Child jobs that completed")
+    failed: int = Field(default=0, ge=0, description="Child jobs that failed")
+    failures: List[Dict[str, str]] = Field(default_factory=list, description="Job ID, URL and error of each failed child")
+    error_message: Optional[str] = Field(default=None, description="Error details if failed")
+    started_at: Optional[datetime] = Field(default=None, description="When expansion started")
+    completed_at: Optional[datetime] = Field(default=None, description="When the last child finished")
+    expires_at: datetime = Field(
+        default_factory=lambda: datetime.utcnow() + timedelta(hours=24),
+        description="When the batch will be forgotten"
+    )
+    
+    @property
+    def total(self) -> int:
+        """Number of child jobs discovered so far."""
+        return len(self.child_job_ids)
+    
+    @property
+    def finished(self) -> int:
+        """Number of child jobs that reached a terminal status."""
+        return self.completed + self.failed
+    
+    def is_expired(self) -> bool:
+        """Check if the batch has expired."""
+        return datetime.utcnow() > self.expires_at
+    
+    def is_finished(self) -> bool:
+        """Check if the batch has reached a terminal status."""
+        return self.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.EXPIRED]
+    
+    class Config:
+        """Pydantic configuration."""
+        use_enum_values = True
+        json_encoders = {
+            datetime: lambda v: v.isoformat()
+        }
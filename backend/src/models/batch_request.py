@@ -0,0 +1,19 @@
+"""
+BatchRequest model for yt-dlp Web UI.
+"""
+
+from typing import Optional
+from pydantic import Field
+
+from .download_request import DownloadRequest
+
+
+class BatchRequest(DownloadRequest):
+    """Represents a request to download every video of a playlist or channel.
+    
+    Format, subtitle and advanced options apply to each video.
+    """
+    
+    url: str = Field(..., description="YouTube playlist or channel URL")
+    max_entries: Optional[int] = Field(default=None, ge=1, description="Maximum number of videos to download")
+    max_parallel: Optional[int] = Field(default=None, ge=1, description="Maximum videos queued or downloading at once")
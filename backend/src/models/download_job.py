@@ -2,9 +2,11 @@
 DownloadJob model for yt-dlp Web UI.
 """
 
+import os
+import time
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 from uuid import uuid4
 from pydantic import BaseModel, Field, validator
 
@@ -18,22 +20,89 @@ class JobStatus(str, Enum):
     EXPIRED = "expired"
 
 
+class JobStage(str, Enum):
+    """Stages of a download, in the order a job passes through them."""
+    QUEUED = "queued"
+    METADATA = "metadata"
+    DOWNLOAD = "download"
+    POSTPROCESS = "postprocess"
+    FINALIZE = "finalize"
+    DONE = "done"
+
+
+# Callbacks invoked whenever a job's state changes
+_job_listeners: List[Callable[["DownloadJob"], None]] = []
+
+
+def add_job_listener(listener: Callable[["DownloadJob"], None]) -> None:
+    """Register a callback invoked after every job state change."""
+    _job_listeners.append(listener)
+
+
+def remove_job_listener(listener: Callable[["DownloadJob"], None]) -> None:
+    """Unregister a job state change callback."""
+    if listener in _job_listeners:
+        _job_listeners.remove(listener)
+
+
+def notify_job_listeners(job: "DownloadJob") -> None:
+    """Run the job listeners for a job changed elsewhere, e.g. by another process."""
+    for listener in _job_listeners:
+        listener(job)
+
+
+# (pid, id) of the process that runs the jobs it creates
+_worker_id = (0, "")
+
+
+def current_worker_id() -> str:
+    """Identify this process as the owner of the jobs it creates.
+    
+    The random suffix keeps a restarted process that happens to reuse a
+    pid from claiming the jobs its predecessor left behind.
+    """
+    global _worker_id
+    pid = os.getpid()
+    if _worker_id[0] != pid:
+        _worker_id = (pid, f"{pid}-{uuid4().hex[:8]}")
+    return _worker_id[1]
+
+
 class DownloadJob(BaseModel):
     """Represents an active or completed download operation."""
     
     id: str = Field(default_factory=lambda: str(uuid4()))
     request_id: str = Field(..., description="Reference to DownloadRequest")
+    artifact_key: Optional[str] = Field(default=None, description="Key of the shared artifact this job produces")
+    worker_id: Optional[str] = Field(
+        default_factory=current_worker_id,
+        description="Worker process that runs the job"
+    )
     status: JobStatus = Field(default=JobStatus.PENDING, description="Current job status")
     progress: int = Field(default=0, ge=0, le=100, description="Download progress percentage")
     file_path: Optional[str] = Field(default=None, description="Path to downloaded file")
     file_size: Optional[int] = Field(default=None, ge=0, description="File size in bytes")
     error_message: Optional[str] = Field(default=None, description="Error details if failed")
+    downloaded_bytes: Optional[int] = Field(default=None, ge=0, description="Bytes downloaded so far")
+    total_bytes: Optional[int] = Field(default=None, ge=0, description="Expected download size in bytes")
+    speed: Optional[float] = Field(default=None, ge=0, description="Current download speed in bytes/sec")
+    eta: Optional[int] = Field(default=None, description="Estimated seconds until the download finishes")
     started_at: Optional[datetime] = Field(default=None, description="When download started")
     completed_at: Optional[datetime] = Field(default=None, description="When download finished")
     expires_at: datetime = Field(
         default_factory=lambda: datetime.utcnow() + timedelta(hours=24),
         description="When file will be deleted"
     )
+    version: int = Field(default=0, ge=0, description="Incremented on every state change")
+    cpu_seconds_saved: Optional[float] = Field(
+        default=None,
+        ge=0,
+        description="Estimated CPU time post-processing avoided by copying instead of transcoding"
+    )
+    stage_times: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Monotonic clock reading when each stage was entered"
+    )
     
     @validator('progress')
     def validate_progress(cls, v):
@@ -76,12 +145,70 @@ class DownloadJob(BaseModel):
                 self.started_at = datetime.utcnow()
             elif status in [JobStatus.COMPLETED, JobStatus.FAILED]:
                 self.completed_at = datetime.utcnow()
+        
+        self.notify_listeners()
+    
+    def update_transfer(
+        self,
+        downloaded_bytes: Optional[int],
+        total_bytes: Optional[int],
+        speed: Optional[float],
+        eta: Optional[int],
+        progress: Optional[int] = None
+    ) -> None:
+        """Update byte counters, speed and ETA from a progress tick."""
+        self.downloaded_bytes = downloaded_bytes
+        self.total_bytes = total_bytes
+        self.speed = speed
+        self.eta = eta
+        if progress is not None:
+            if not 0 <= progress <= 100:
+                raise ValueError('Progress must be between 0 and 100')
+            self.progress = progress
+        
+        self.notify_listeners()
+    
+    def mark_stage(self, stage: JobStage) -> None:
+        """Record when the job entered a stage; re-entering keeps the first time."""
+        key = JobStage(stage).value
+        if key not in self.stage_times:
+            self.stage_times[key] = time.monotonic()
+    
+    def get_timeline(self) -> List[Dict[str, Any]]:
+        """Time spent in each stage entered so far, in order.
+        
+        The current stage of an unfinished job is measured up to now.
+        """
+        entered = sorted(self.stage_times.items(), key=lambda item: item[1])
+        if not entered:
+            return []
+        
+        first = entered[0][1]
+        timeline = []
+        for index, (stage, started) in enumerate(entered):
+            if stage == JobStage.DONE:
+                break
+            if index + 1 < len(entered):
+                ended = entered[index + 1][1]
+            elif not self.is_finished():
+                ended = time.monotonic()
+            else:
+                break
+            timeline.append({
+                "stage": stage,
+                "offset_seconds": started - first,
+                "duration_seconds": ended - started
+            })
+        return timeline
     
     def mark_failed(self, error_message: str) -> None:
         """Mark job as failed with error message."""
         self.status = JobStatus.FAILED
         self.error_message = error_message
         self.completed_at = datetime.utcnow()
+        if self.stage_times:
+            self.mark_stage(JobStage.DONE)
+        self.notify_listeners()
     
     def mark_completed(self, file_path: str, file_size: int) -> None:
         """Mark job as completed with file information."""
@@ -89,7 +216,27 @@ class DownloadJob(BaseModel):
         self.progress = 100
         self.file_path = file_path
         self.file_size = file_size
+        self.speed = None
+        self.eta = 0
         self.completed_at = datetime.utcnow()
+        if self.stage_times:
+            self.mark_stage(JobStage.DONE)
+        self.notify_listeners()
+    
+    def mark_expired(self) -> None:
+        """Mark job as expired once its files have been deleted."""
+        self.status = JobStatus.EXPIRED
+        self.speed = None
+        self.notify_listeners()
+    
+    def is_finished(self) -> bool:
+        """Check if the job has reached a terminal status."""
+        return self.status in [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.EXPIRED]
+    
+    def notify_listeners(self) -> None:
+        """Notify registered listeners that this job changed."""
+        self.version += 1
+        notify_job_listeners(self)
     
     class Config:
         """Pydantic configuration."""
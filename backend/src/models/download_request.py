@@ -17,6 +17,13 @@ class DownloadFormat(str, Enum):
     METADATA = "metadata"
 
 
+class VideoCodec(str, Enum):
+    """Video codecs a video download may prefer."""
+    H264 = "h264"
+    VP9 = "vp9"
+    AV1 = "av1"
+
+
 class DownloadRequest(BaseModel):
     """Represents a user's request to download a video."""
     
@@ -24,8 +31,12 @@ class DownloadRequest(BaseModel):
     url: str = Field(..., description="YouTube video URL")
     format: DownloadFormat = Field(..., description="Download format")
     include_subtitles: bool = Field(default=False, description="Whether to download subtitles")
+    max_height: Optional[int] = Field(default=None, ge=144, le=4320, description="Largest video height in pixels")
+    max_filesize: Optional[int] = Field(default=None, gt=0, description="Largest acceptable video size in bytes")
+    preferred_codec: Optional[VideoCodec] = Field(default=None, description="Video codec to pick when several qualify")
     advanced_options: Optional[Dict[str, Any]] = Field(default=None, description="Advanced options")
     user_id: str = Field(default="anonymous", description="User identifier")
+    priority: int = Field(default=0, ge=0, le=10, description="Queue priority (lower runs first)")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     @validator('url')
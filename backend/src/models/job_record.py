@@ -0,0 +1,127 @@
+"""
+JobRecord model for yt-dlp Web UI.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from .download_job import DownloadJob, JobStage, JobStatus
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Canonical stage names, so every record shares one string per stage
+_STAGES = {stage.value: stage.value for stage in JobStage}
+
+
+def _to_micros(value: Optional[datetime]) -> Optional[int]:
+    """Convert a naive UTC datetime to integer microseconds since the epoch."""
+    return None if value is None else (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(value: Optional[int]) -> Optional[datetime]:
+    """Convert integer microseconds since the epoch back to a naive UTC datetime."""
+    return None if value is None else _EPOCH + timedelta(0, 0, value)
+
+
+class JobRecord:
+    """Compact, read-only snapshot of a finished DownloadJob.
+    
+    Finished jobs are retained long after anything mutates them, so the
+    job store keeps them in this slotted form instead of as pydantic
+    models: statuses and stage names are shared enum values, timestamps
+    are integer epoch microseconds, and stage times are a flat tuple.
+    Attribute names match DownloadJob for read access; ``to_job``
+    rebuilds the model when one is needed.
+    """
+    
+    __slots__ = (
+        "id",
+        "request_id",
+        "artifact_key",
+        "worker_id",
+        "status",
+        "progress",
+        "file_path",
+        "file_size",
+        "error_message",
+        "downloaded_bytes",
+        "total_bytes",
+        "speed",
+        "eta",
+        "started_at_us",
+        "completed_at_us",
+        "expires_at_us",
+        "version",
+        "cpu_seconds_saved",
+        "stage_times_flat"
+    )
+    
+    def __init__(self, job: DownloadJob):
+        """Initialize JobRecord from a job."""
+        self.id = job.id
+        self.request_id = job.request_id
+        self.artifact_key = job.artifact_key
+        self.worker_id = job.worker_id
+        self.status = JobStatus(job.status)
+        self.progress = job.progress
+        self.file_path = job.file_path
+        self.file_size = job.file_size
+        self.error_message = job.error_message
+        self.downloaded_bytes = job.downloaded_bytes
+        self.total_bytes = job.total_bytes
+        self.speed = job.speed
+        self.eta = job.eta
+        self.started_at_us = _to_micros(job.started_at)
+        self.completed_at_us = _to_micros(job.completed_at)
+        self.expires_at_us = _to_micros(job.expires_at)
+        self.version = job.version
+        self.cpu_seconds_saved = job.cpu_seconds_saved
+        self.stage_times_flat: Optional[Tuple] = None
+        if job.stage_times:
+            flat = []
+            for stage, entered in job.stage_times.items():
+                flat.append(_STAGES.get(stage, stage))
+                flat.append(entered)
+            self.stage_times_flat = tuple(flat)
+    
+    @property
+    def started_at(self) -> Optional[datetime]:
+        return _from_micros(self.started_at_us)
+    
+    @property
+    def completed_at(self) -> Optional[datetime]:
+        return _from_micros(self.completed_at_us)
+    
+    @property
+    def expires_at(self) -> datetime:
+        return _from_micros(self.expires_at_us)
+    
+    def is_finished(self) -> bool:
+        """Check if the job has reached a terminal status."""
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.EXPIRED)
+    
+    def to_job(self) -> DownloadJob:
+        """Rebuild the pydantic model, skipping validation of already valid data."""
+        flat = self.stage_times_flat or ()
+        return DownloadJob.model_construct(
+            id=self.id,
+            request_id=self.request_id,
+            artifact_key=self.artifact_key,
+            worker_id=self.worker_id,
+            status=self.status.value,
+            progress=self.progress,
+            file_path=self.file_path,
+            file_size=self.file_size,
+            error_message=self.error_message,
+            downloaded_bytes=self.downloaded_bytes,
+            total_bytes=self.total_bytes,
+            speed=self.speed,
+            eta=self.eta,
+            started_at=self.started_at,
+            completed_at=self.completed_at,
+            expires_at=self.expires_at,
+            version=self.version,
+            cpu_seconds_saved=self.cpu_seconds_saved,
+            stage_times=dict(zip(flat[::2], flat[1::2]))
+        )
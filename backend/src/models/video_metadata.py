@@ -7,6 +7,38 @@ from typing import List, Optional
 from pydantic import BaseModel, Field, validator
 
 
+class FormatInfo(BaseModel):
+    """One downloadable format of a video, as offered by yt-dlp."""
+    
+    format_id: str = Field(..., description="yt-dlp format ID")
+    ext: str = Field(..., description="Container extension")
+    height: Optional[int] = Field(default=None, description="Video height in pixels")
+    fps: Optional[float] = Field(default=None, description="Frames per second")
+    vcodec: Optional[str] = Field(default=None, description="Video codec, None for audio-only formats")
+    acodec: Optional[str] = Field(default=None, description="Audio codec, None for video-only formats")
+    tbr: Optional[float] = Field(default=None, description="Total bitrate in kbit/s")
+    asr: Optional[int] = Field(default=None, description="Audio sample rate in Hz")
+    audio_channels: Optional[int] = Field(default=None, description="Number of audio channels")
+    filesize: Optional[int] = Field(default=None, description="Exact or approximate size in bytes")
+    protocol: Optional[str] = Field(default=None, description="Transfer protocol (https, m3u8, ...)")
+    
+    def has_video(self) -> bool:
+        """Check if the format carries a video stream."""
+        return self.vcodec is not None
+    
+    def has_audio(self) -> bool:
+        """Check if the format carries an audio stream."""
+        return self.acodec is not None
+    
+    def estimate_size(self, duration: float) -> Optional[int]:
+        """Size in bytes, estimated from the bitrate when yt-dlp gives none."""
+        if self.filesize:
+            return self.filesize
+        if self.tbr and duration:
+            return int(self.tbr * 1000 / 8 * duration)
+        return None
+
+
 class VideoMetadata(BaseModel):
     """Contains video information extracted from YouTube."""
     
@@ -19,7 +51,9 @@ class VideoMetadata(BaseModel):
     view_count: int = Field(..., ge=0, description="Number of views")
     upload_date: str = Field(..., description="Upload date (YYYYMMDD)")
     available_formats: List[str] = Field(default_factory=list, description="Available download formats")
+    formats: List[FormatInfo] = Field(default_factory=list, description="Structured index of downloadable formats")
     available_subtitles: List[str] = Field(default_factory=list, description="Available subtitle languages")
+    filesize: Optional[int] = Field(default=None, ge=0, description="Estimated size of a video download in bytes")
     extracted_at: datetime = Field(default_factory=datetime.utcnow, description="When metadata was extracted")
     
     @validator('url')
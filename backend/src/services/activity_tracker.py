@@ -0,0 +1,132 @@
+"""
+ActivityTracker for idle monitoring in yt-dlp Web UI.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# The idle monitor runs from the project root, three levels above src/services
+DEFAULT_ACTIVITY_FILE = Path(__file__).resolve().parents[3] / ".last_activity"
+
+
+class ActivityTracker:
+    """Keeps the last user activity in memory for the idle monitor.
+    
+    Heartbeats only update a timestamp. The timestamp is written to
+    ``.last_activity`` by a background task at most once per
+    ``persist_interval`` and only when it changed, so any number of
+    tabs sending heartbeats cost no disk writes of their own; worker
+    processes sharing the file only ever move it forward. Running
+    downloads, open progress streams and other registered busy sources
+    count as activity, so the server is never idle while working.
+    """
+    
+    def __init__(self, path: Optional[str] = None, persist_interval: Optional[float] = None):
+        """Initialize ActivityTracker."""
+        self.path = Path(path or os.getenv("ACTIVITY_FILE") or DEFAULT_ACTIVITY_FILE)
+        self.persist_interval = persist_interval or float(os.getenv("ACTIVITY_PERSIST_INTERVAL", "10"))
+        self.logger = logging.getLogger(__name__)
+        
+        # A freshly started server counts as active
+        self.last_activity = time.time()
+        self._persisted: Optional[int] = None
+        self._busy_sources: Dict[str, Callable[[], int]] = {}
+        self._task: Optional[asyncio.Task] = None
+        
+        # Counters
+        self.heartbeats = 0
+        self.writes = 0
+    
+    def touch(self) -> float:
+        """Record user activity now and return the timestamp."""
+        self.heartbeats += 1
+        self.last_activity = time.time()
+        return self.last_activity
+    
+    def add_busy_source(self, name: str, count: Callable[[], int]) -> None:
+        """Register a count of work in progress that keeps the server active."""
+        self._busy_sources[name] = count
+    
+    def get_busy(self) -> Dict[str, int]:
+        """Current value of every busy source."""
+        busy = {}
+        for name, count in self._busy_sources.items():
+            try:
+                busy[name] = int(count())
+            except Exception as e:
+                self.logger.warning(f"Busy source {name} failed: {e}")
+                busy[name] = 0
+        return busy
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Last activity and idle time, with work in progress counted as activity."""
+        busy = self.get_busy()
+        if any(busy.values()):
+            self.last_activity = time.time()
+        
+        # Other worker processes may have seen more recent activity
+        self.last_activity = max(self.last_activity, self._read_persisted())
+        return {
+            "last_activity": int(self.last_activity),
+            "idle_seconds": max(0, int(time.time() - self.last_activity)),
+            "busy": busy
+        }
+    
+    async def start(self):
+        """Start persisting the activity timestamp in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._persist_loop())
+    
+    async def stop(self):
+        """Stop the background task and write the final timestamp."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.persist()
+    
+    def persist(self) -> None:
+        """Write the activity timestamp if it is newer than the last one written."""
+        timestamp = self.get_status()["last_activity"]
+        if timestamp == self._persisted or timestamp <= self._read_persisted():
+            return
+        
+        try:
+            # Replace atomically so the idle monitor never reads a partial file
+            temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            temp_path.write_text(str(timestamp))
+            os.replace(temp_path, self.path)
+            self._persisted = timestamp
+            self.writes += 1
+        except OSError as e:
+            self.logger.warning(f"Failed to write {self.path}: {e}")
+    
+    def _read_persisted(self) -> int:
+        try:
+            return int(self.path.read_text().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+    
+    async def _persist_loop(self):
+        while True:
+            self.persist()
+            await asyncio.sleep(self.persist_interval)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracker statistics."""
+        return {
+            "heartbeats": self.heartbeats,
+            "writes": self.writes,
+            "persist_interval": self.persist_interval
+        }
+
+
+# Global activity tracker
+activity_tracker = ActivityTracker()
@@ -0,0 +1,201 @@
+"""
+ArtifactStore for sharing downloads between identical requests.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..models.download_request import DownloadFormat, DownloadRequest
+from ..models.download_job import DownloadJob, JobStatus, add_job_listener
+from ..storage.job_storage import save_job
+from .metadata_cache import extract_video_id
+
+
+class Artifact:
+    """A completed download that later jobs can reuse."""
+    
+    __slots__ = ("job_id", "file_path", "file_size")
+    
+    def __init__(self, job_id: str, file_path: str, file_size: int):
+        self.job_id = job_id
+        self.file_path = file_path
+        self.file_size = file_size
+
+
+class ArtifactStore:
+    """Index of downloads keyed by (video ID, format, subtitle flag, constraints).
+    
+    A request whose artifact was already downloaded gets hard links to
+    the existing files in its own job directory (or a reference to them
+    when linking is not possible). A request whose artifact is still
+    being downloaded follows the running job: it mirrors the leader's
+    progress and receives the files when the leader completes.
+    """
+    
+    def __init__(self, base_dir: Optional[str] = None):
+        """Initialize ArtifactStore."""
+        self.base_dir = Path(base_dir) if base_dir else Path("downloads")
+        self.logger = logging.getLogger(__name__)
+        self._artifacts: Dict[str, Artifact] = {}
+        self._leaders: Dict[str, str] = {}
+        self._followers: Dict[str, List[DownloadJob]] = {}
+        
+        # Counters
+        self.reused = 0
+        self.coalesced = 0
+        self.bytes_saved = 0
+        
+        add_job_listener(self._on_job_changed)
+    
+    @staticmethod
+    def key_for(request: DownloadRequest) -> Optional[str]:
+        """Get the artifact key for a request, or None if it can't be shared."""
+        # Custom cookies, proxies or output templates can change the result
+        if request.advanced_options:
+            return None
+        
+        video_id = extract_video_id(request.url)
+        if not video_id:
+            return None
+        
+        subtitles = "subs" if request.include_subtitles else "nosubs"
+        key = f"{video_id}:{request.format}:{subtitles}"
+        
+        # Format constraints pick different files for the same video
+        if request.format == DownloadFormat.VIDEO:
+            constraints = (request.max_height, request.max_filesize, request.preferred_codec)
+            if any(constraints):
+                key += ":" + ":".join("" if value is None else str(value) for value in constraints)
+        return key
+    
+    def attach(self, request: DownloadRequest, job: DownloadJob) -> bool:
+        """Satisfy a job from an existing or in-flight download.
+        
+        Returns True if the job was completed from a stored artifact or
+        attached to a running download, False if it must be downloaded.
+        """
+        key = self.key_for(request)
+        if key is None:
+            return False
+        job.artifact_key = key
+        
+        artifact = self._artifacts.get(key)
+        if artifact is not None:
+            if self._reuse(artifact, job):
+                self.reused += 1
+                self.bytes_saved += artifact.file_size
+                return True
+            # The stored files are gone; forget them and download again
+            del self._artifacts[key]
+        
+        if key in self._leaders:
+            self._followers.setdefault(key, []).append(job)
+            self.coalesced += 1
+            return True
+        
+        return False
+    
+    def register_leader(self, job: DownloadJob) -> None:
+        """Record that a job is downloading its artifact."""
+        if job.artifact_key:
+            self._leaders[job.artifact_key] = job.id
+    
+    def unregister_leader(self, job: DownloadJob) -> None:
+        """Forget a leader that will not run, e.g. because it was rejected."""
+        if job.artifact_key and self._leaders.get(job.artifact_key) == job.id:
+            del self._leaders[job.artifact_key]
+    
+    def index_completed_job(self, job: DownloadJob) -> None:
+        """Add a completed job's files to the index (used at startup)."""
+        if job.artifact_key and job.file_path and os.path.exists(job.file_path):
+            self._artifacts[job.artifact_key] = Artifact(job.id, job.file_path, job.file_size or 0)
+    
+    def _on_job_changed(self, job: DownloadJob) -> None:
+        """Mirror a leader's state onto its followers."""
+        key = job.artifact_key
+        if not key:
+            return
+        
+        if job.status == JobStatus.EXPIRED:
+            # Stop handing out files that are being deleted
+            artifact = self._artifacts.get(key)
+            if artifact is not None and artifact.job_id == job.id:
+                del self._artifacts[key]
+            return
+        
+        if self._leaders.get(key) != job.id:
+            return
+        
+        followers = self._followers.get(key, [])
+        
+        if job.status == JobStatus.COMPLETED:
+            del self._leaders[key]
+            self._followers.pop(key, None)
+            artifact = Artifact(job.id, job.file_path, job.file_size or 0)
+            self._artifacts[key] = artifact
+            for follower in followers:
+                if self._reuse(artifact, follower):
+                    self.bytes_saved += artifact.file_size
+                else:
+                    follower.mark_failed("Shared download finished but its files are missing")
+                    save_job(follower)
+        elif job.status == JobStatus.FAILED:
+            del self._leaders[key]
+            self._followers.pop(key, None)
+            for follower in followers:
+                follower.mark_failed(job.error_message or "Shared download failed")
+                save_job(follower)
+        else:
+            for follower in followers:
+                follower.status = job.status
+                if job.started_at and not follower.started_at:
+                    follower.started_at = job.started_at
+                follower.update_transfer(
+                    job.downloaded_bytes,
+                    job.total_bytes,
+                    job.speed,
+                    job.eta,
+                    progress=job.progress
+                )
+                save_job(follower)
+    
+    def _reuse(self, artifact: Artifact, job: DownloadJob) -> bool:
+        """Give a job its own links to an artifact's files."""
+        source_dir = Path(artifact.file_path).parent
+        if not Path(artifact.file_path).exists():
+            return False
+        
+        job_dir = self.base_dir / job.id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        file_path = artifact.file_path
+        
+        try:
+            for source in source_dir.iterdir():
+                if source.is_file():
+                    os.link(source, job_dir / source.name)
+            file_path = str(job_dir / Path(artifact.file_path).name)
+        except OSError as e:
+            # Hard links need the same filesystem; fall back to sharing the path
+            self.logger.debug(f"Hard link failed for job {job.id}, sharing files: {e}")
+        
+        job.mark_completed(file_path, artifact.file_size)
+        save_job(job)
+        
+        # Point later reuses at the newest copy, which expires last
+        if file_path != artifact.file_path:
+            artifact.job_id = job.id
+            artifact.file_path = file_path
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get artifact store statistics."""
+        return {
+            "artifacts": len(self._artifacts),
+            "inflight": len(self._leaders),
+            "followers": sum(len(jobs) for jobs in self._followers.values()),
+            "reused": self.reused,
+            "coalesced": self.coalesced,
+            "bytes_saved": self.bytes_saved
+        }
@@ -0,0 +1,258 @@
+"""
+BatchService for fanning playlist downloads out into child jobs.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..models.batch_job import BatchJob
+from ..models.batch_request import BatchRequest
+from ..models.download_job import DownloadJob, JobStatus, add_job_listener
+from ..models.download_request import DownloadRequest
+from ..storage.job_storage import get_job, save_job
+from .download_scheduler import SchedulerFullError
+from .file_service import FileService, get_file_service
+from .metadata_cache import extract_video_id
+from .ytdlp_service import YtDlpService, get_ytdlp_service
+from .zip_stream import ZipEntry
+
+# Seconds to wait before retrying a child the scheduler had no room for
+ADMIT_RETRY_INTERVAL = 1.0
+
+# Fields of a BatchRequest that don't carry over to its child requests
+_BATCH_ONLY_FIELDS = {"id", "url", "created_at", "max_entries", "max_parallel"}
+
+
+def _entry_url(entry: Dict[str, Any]) -> Optional[str]:
+    """Get the video URL of a flat playlist entry, or None if it isn't a video."""
+    url = entry.get("url") or entry.get("webpage_url")
+    if url and extract_video_id(url):
+        return url
+    
+    if entry.get("ie_key") == "Youtube" and entry.get("id"):
+        return f"https://www.youtube.com/watch?v={entry['id']}"
+    return None
+
+
+class BatchService:
+    """Service for expanding playlists into bounded fan-out downloads.
+    
+    Entries are streamed from a flat playlist listing. Each one becomes a
+    child DownloadJob as soon as it is discovered, and at most
+    ``max_parallel`` children per batch are queued or downloading at
+    once, so a large playlist can't crowd out other users' downloads.
+    """
+    
+    def __init__(
+        self,
+        enqueue: Callable[[DownloadRequest, DownloadJob], int],
+        ytdlp_service: Optional[YtDlpService] = None,
+        max_parallel: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        file_service: Optional[FileService] = None
+    ):
+        """Initialize BatchService."""
+        self.enqueue = enqueue
+        self._ytdlp_service = ytdlp_service
+        self._file_service = file_service
+        self.max_parallel = max_parallel or int(os.getenv("BATCH_MAX_PARALLEL", "3"))
+        self.max_entries = max_entries or int(os.getenv("BATCH_MAX_ENTRIES", "500"))
+        self.logger = logging.getLogger(__name__)
+        self._batches: Dict[str, BatchJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._children: Dict[str, Tuple[str, str]] = {}
+        
+        add_job_listener(self._on_job_changed)
+    
+    @property
+    def ytdlp_service(self) -> YtDlpService:
+        # Built on first use rather than when the API modules are imported
+        if self._ytdlp_service is None:
+            self._ytdlp_service = get_ytdlp_service()
+        return self._ytdlp_service
+    
+    @property
+    def file_service(self) -> FileService:
+        if self._file_service is None:
+            self._file_service = get_file_service()
+        return self._file_service
+    
+    def create_batch(self, request: BatchRequest) -> BatchJob:
+        """Create a batch and start expanding it in the background."""
+        self._purge_expired()
+        
+        batch = BatchJob(request_id=request.id, url=request.url)
+        self._batches[batch.id] = batch
+        self._slots[batch.id] = asyncio.Semaphore(request.max_parallel or self.max_parallel)
+        self._tasks[batch.id] = asyncio.create_task(self._run(batch, request))
+        return batch
+    
+    def get_batch(self, batch_id: str) -> Optional[BatchJob]:
+        """Get a batch by ID."""
+        return self._batches.get(batch_id)
+    
+    def get_children(self, batch: BatchJob) -> List[DownloadJob]:
+        """Get a batch's child jobs in playlist order."""
+        children = []
+        for job_id in batch.child_job_ids:
+            job = get_job(job_id)
+            if job:
+                children.append(job)
+        return children
+    
+    def get_progress(self, batch: BatchJob) -> int:
+        """Average progress of a batch's children."""
+        if batch.status == JobStatus.COMPLETED:
+            return 100
+        children = self.get_children(batch)
+        if not children:
+            return 0
+        return sum(child.progress for child in children) // len(children)
+    
+    def archive_entries(self, batch: BatchJob) -> List[ZipEntry]:
+        """Get ZIP entries for every file of a batch's completed children.
+        
+        Names are prefixed with the video's playlist position so the
+        archive lists them in playlist order.
+        """
+        entries = []
+        for index, job in enumerate(self.get_children(batch), start=1):
+            if job.status != JobStatus.COMPLETED:
+                continue
+            for path in self.file_service.list_job_artifacts(job):
+                entries.append(ZipEntry(path, f"{index:03d} - {os.path.basename(path)}"))
+        return entries
+    
+    async def stop(self):
+        """Cancel every running expansion."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _run(self, batch: BatchJob, request: BatchRequest):
+        """Expand a playlist and feed its entries to the scheduler."""
+        batch.status = JobStatus.PROCESSING
+        batch.started_at = datetime.utcnow()
+        limit = min(request.max_entries or self.max_entries, self.max_entries)
+        child_fields = request.model_dump(exclude=_BATCH_ONLY_FIELDS)
+        
+        # Entries are consumed while the listing is still being fetched
+        entries: asyncio.Queue = asyncio.Queue()
+        
+        def on_entry(entry: Dict[str, Any]):
+            entries.put_nowait(entry)
+        
+        expansion = asyncio.create_task(self.ytdlp_service.expand_playlist(request.url, on_entry))
+        expansion.add_done_callback(lambda _: entries.put_nowait(None))
+        
+        try:
+            while True:
+                entry = await entries.get()
+                if entry is None:
+                    break
+                
+                url = _entry_url(entry)
+                if url is None:
+                    batch.skipped += 1
+                    continue
+                
+                child_request = DownloadRequest(url=url, **child_fields)
+                child = DownloadJob(request_id=child_request.id)
+                save_job(child)
+                batch.child_job_ids.append(child.id)
+                self._children[child.id] = (batch.id, url)
+                
+                await self._admit(batch, child_request, child)
+                
+                if batch.total >= limit:
+                    expansion.cancel()
+                    break
+            
+            try:
+                await expansion
+            except asyncio.CancelledError:
+                # Stopped early because the entry limit was reached
+                if batch.total < limit:
+                    raise
+            except Exception as e:
+                batch.error_message = str(e)
+                self.logger.error(f"Batch {batch.id} expansion failed: {e}")
+        except asyncio.CancelledError:
+            expansion.cancel()
+            raise
+        finally:
+            batch.expanding = False
+            self._tasks.pop(batch.id, None)
+            self._check_finished(batch)
+    
+    async def _admit(self, batch: BatchJob, request: DownloadRequest, job: DownloadJob):
+        """Wait for a free batch slot, then hand a child to the scheduler."""
+        await self._slots[batch.id].acquire()
+        while True:
+            try:
+                self.enqueue(request, job)
+                return
+            except SchedulerFullError:
+                await asyncio.sleep(ADMIT_RETRY_INTERVAL)
+    
+    def _on_job_changed(self, job: DownloadJob) -> None:
+        """Count finished children and free their batch slot."""
+        if not job.is_finished():
+            return
+        
+        batch_id, url = self._children.pop(job.id, (None, None))
+        batch = self._batches.get(batch_id) if batch_id else None
+        if batch is None:
+            return
+        
+        if job.status == JobStatus.COMPLETED:
+            batch.completed += 1
+        else:
+            batch.failed += 1
+            batch.failures.append({
+                "job_id": job.id,
+                "url": url,
+                "error": job.error_message or "Unknown error"
+            })
+        
+        self._slots[batch.id].release()
+        self._check_finished(batch)
+    
+    def _check_finished(self, batch: BatchJob) -> None:
+        """Move a batch to its terminal status once every child is done."""
+        if batch.expanding or batch.is_finished() or batch.finished < batch.total:
+            return
+        
+        if batch.completed:
+            batch.status = JobStatus.COMPLETED
+        else:
+            batch.status = JobStatus.FAILED
+            if not batch.error_message:
+                if batch.total:
+                    batch.error_message = f"All {batch.total} downloads failed"
+                else:
+                    batch.error_message = "No downloadable videos found"
+        batch.completed_at = datetime.utcnow()
+        self._slots.pop(batch.id, None)
+        self.logger.info(
+            f"Batch {batch.id} finished: {batch.completed} completed, {batch.failed} failed"
+        )
+    
+    def _purge_expired(self) -> None:
+        """Forget finished batches past their expiry."""
+        for batch_id, batch in list(self._batches.items()):
+            if batch.is_finished() and batch.is_expired():
+                del self._batches[batch_id]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batch statistics."""
+        return {
+            "batches": len(self._batches),
+            "expanding": len(self._tasks),
+            "children_pending": len(self._children)
+        }
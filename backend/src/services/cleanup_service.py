@@ -4,24 +4,38 @@ CleanupService for handling automatic file cleanup.
 
 import asyncio
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 
-from ..models.download_job import DownloadJob, JobStatus
-from .file_service import FileService
+from ..models.download_job import DownloadJob
+from .disk_sweeper import DiskSweeper, disk_sweeper as shared_disk_sweeper
+from .file_service import FileService, get_file_service
 
 
 class CleanupService:
     """Service for handling automatic cleanup of expired files and jobs."""
     
-    def __init__(self, file_service: FileService, cleanup_interval_hours: int = 1):
+    def __init__(
+        self,
+        file_service: Optional[FileService] = None,
+        cleanup_interval_hours: int = 1,
+        disk_sweeper: Optional[DiskSweeper] = None
+    ):
         """Initialize CleanupService."""
-        self.file_service = file_service
+        self._file_service = file_service
+        self.disk_sweeper = disk_sweeper or shared_disk_sweeper
         self.cleanup_interval_hours = cleanup_interval_hours
         self.logger = logging.getLogger(__name__)
         self._cleanup_task = None
         self._running = False
     
+    @property
+    def file_service(self) -> FileService:
+        # Built on first use rather than when the API modules are imported
+        if self._file_service is None:
+            self._file_service = get_file_service()
+        return self._file_service
+    
     async def start_cleanup_scheduler(self):
         """Start the automatic cleanup scheduler."""
         if self._running:
@@ -44,6 +58,7 @@ class CleanupService:
             except asyncio.CancelledError:
                 pass
         
+        self.disk_sweeper.close()
         self.logger.info("Cleanup scheduler stopped")
     
     async def _cleanup_loop(self):
@@ -65,7 +80,8 @@ class CleanupService:
     async def cleanup_expired_files(self) -> List[str]:
         """Clean up expired files from disk."""
         try:
-            cleaned_files = self.file_service.cleanup_expired_files(max_age_hours=24)
+            # Scans and deletes off the event loop in time-sliced batches
+            cleaned_files = await self.disk_sweeper.sweep(max_age_hours=24)
             
             if cleaned_files:
                 self.logger.info(f"Cleaned up {len(cleaned_files)} expired files")
@@ -96,7 +112,7 @@ class CleanupService:
                             self.logger.info(f"Cleaned up file for expired job: {job.id}")
                     
                     # Mark job as expired
-                    job.status = JobStatus.EXPIRED
+                    job.mark_expired()
                     cleaned_jobs.append(job.id)
             
             if cleaned_jobs:
@@ -142,7 +158,7 @@ class CleanupService:
         """Force cleanup of all files and return statistics."""
         try:
             # Clean up all files older than 1 hour
-            cleaned_files = self.file_service.cleanup_expired_files(max_age_hours=1)
+            cleaned_files = await self.disk_sweeper.sweep(max_age_hours=1)
             
             # Get disk usage statistics
             total_space = self.file_service.get_total_space()
@@ -151,6 +167,7 @@ class CleanupService:
             
             return {
                 "cleaned_files": len(cleaned_files),
+                "downloads_bytes": self.disk_sweeper.total_bytes,
                 "total_space": total_space,
                 "used_space": used_space,
                 "available_space": available_space,
@@ -172,6 +189,7 @@ class CleanupService:
             "total_space": self.file_service.get_total_space(),
             "used_space": self.file_service.get_used_space(),
             "available_space": self.file_service.get_available_space(),
+            "sweeper": self.disk_sweeper.get_stats(),
             "last_check": datetime.utcnow().isoformat()
         }
 
@@ -0,0 +1,286 @@
+"""
+DiskSweeper for incremental cleanup and accounting of the downloads directory.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .metrics import sweep_duration
+
+# A file on disk, as (st_dev, st_ino)
+FileKey = Tuple[int, int]
+
+
+class DiskSweeper:
+    """Deletes old entries under the downloads directory without blocking.
+    
+    The directory is walked with ``os.scandir`` in a worker thread, one
+    time-sliced batch at a time, and expired entries are removed by a
+    small pool of delete threads. The files of every job directory are
+    cached against the directory's mtime, so the running total of bytes
+    on disk is kept up to date without rescanning unchanged directories.
+    
+    Files are counted by inode, because shared artifacts are hard-linked
+    into several job directories: a linked file counts once in the total,
+    and only frees space once every directory linking it is deleted.
+    """
+    
+    def __init__(
+        self,
+        base_dir: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        slice_seconds: Optional[float] = None,
+        delete_workers: Optional[int] = None
+    ):
+        """Initialize DiskSweeper."""
+        self.base_dir = Path(base_dir) if base_dir else Path("downloads")
+        self.batch_size = batch_size or int(os.getenv("SWEEP_BATCH_SIZE", "500"))
+        self.slice_seconds = slice_seconds or float(os.getenv("SWEEP_SLICE_SECONDS", "0.05"))
+        self.delete_workers = delete_workers or int(os.getenv("SWEEP_DELETE_WORKERS", "4"))
+        self.logger = logging.getLogger(__name__)
+        
+        # Entry name -> (mtime_ns when measured, files under it)
+        self._entries: Dict[str, Tuple[int, Tuple[FileKey, ...]]] = {}
+        # File -> [bytes, entries linking to it]
+        self._files: Dict[FileKey, List[int]] = {}
+        self._lock = threading.Lock()
+        self._sweep_lock: Optional[asyncio.Lock] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.total_bytes = 0
+        
+        # Counters
+        self.sweeps = 0
+        self.entries_scanned = 0
+        self.directories_measured = 0
+        self.deleted = 0
+        self.bytes_freed = 0
+        self.last_sweep_seconds = 0.0
+    
+    async def sweep(self, max_age_hours: float = 24) -> List[str]:
+        """Delete entries not modified for max_age_hours and return their paths."""
+        if self._sweep_lock is None:
+            self._sweep_lock = asyncio.Lock()
+        
+        async with self._sweep_lock:
+            started = time.monotonic()
+            cutoff = time.time() - max_age_hours * 3600
+            try:
+                entries = await asyncio.to_thread(os.scandir, self.base_dir)
+            except FileNotFoundError:
+                return []
+            
+            seen: Set[str] = set()
+            deleted: List[str] = []
+            try:
+                while not await asyncio.to_thread(self._sweep_slice, entries, cutoff, seen, deleted):
+                    # Let other threads and the event loop run between slices
+                    await asyncio.sleep(0)
+            finally:
+                entries.close()
+            
+            # Forget entries removed by someone else since the last sweep
+            with self._lock:
+                for name in set(self._entries) - seen:
+                    self._release(name)
+            
+            self.sweeps += 1
+            self.last_sweep_seconds = time.monotonic() - started
+            sweep_duration.observe(self.last_sweep_seconds)
+            if deleted:
+                self.logger.info(f"Swept {len(deleted)} expired entries in {self.last_sweep_seconds:.2f}s")
+            return deleted
+    
+    def refresh(self, name: str) -> int:
+        """Re-measure one entry of the downloads directory, e.g. a finished job's.
+        
+        Returns the bytes deleting the entry would free.
+        """
+        entry_path = self.base_dir / name
+        try:
+            st = entry_path.stat()
+        except OSError:
+            self._forget(name)
+            return 0
+        
+        files = self._measure(str(entry_path)) if entry_path.is_dir() else {(st.st_dev, st.st_ino): st.st_size}
+        self._record(name, st.st_mtime_ns, files)
+        return self.get_directory_size(name) or 0
+    
+    def close(self) -> None:
+        """Shut down the delete threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _sweep_slice(self, entries, cutoff: float, seen: Set[str], deleted: List[str]) -> bool:
+        """Process one batch of directory entries; return True when the scan is done."""
+        deadline = time.monotonic() + self.slice_seconds
+        deletions = []
+        done = False
+        
+        for _ in range(self.batch_size):
+            entry = next(entries, None)
+            if entry is None:
+                done = True
+                break
+            
+            self.entries_scanned += 1
+            try:
+                st = entry.stat(follow_symlinks=False)
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            
+            if st.st_mtime < cutoff:
+                future = self._delete_executor().submit(self._delete, entry.path, is_dir)
+                deletions.append((entry.name, entry.path, future))
+            else:
+                seen.add(entry.name)
+                self._account(entry.name, entry.path, st, is_dir)
+            
+            if time.monotonic() >= deadline:
+                break
+        
+        for name, path, future in deletions:
+            if future.result():
+                freed = self._forget(name)
+                self.deleted += 1
+                self.bytes_freed += freed
+                deleted.append(path)
+            else:
+                seen.add(name)
+        
+        return done
+    
+    def _account(self, name: str, path: str, st: os.stat_result, is_dir: bool) -> None:
+        """Update the cached size of an entry if it changed since last measured."""
+        cached = self._entries.get(name)
+        if cached is not None and cached[0] == st.st_mtime_ns:
+            return
+        
+        files = self._measure(path) if is_dir else {(st.st_dev, st.st_ino): st.st_size}
+        self._record(name, st.st_mtime_ns, files)
+    
+    def _measure(self, path: str, files: Optional[Dict[FileKey, int]] = None) -> Dict[FileKey, int]:
+        """Sizes of the files under a directory, keyed by inode."""
+        self.directories_measured += 1
+        if files is None:
+            files = {}
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            self._measure(entry.path, files)
+                        else:
+                            st = entry.stat(follow_symlinks=False)
+                            files[(st.st_dev, st.st_ino)] = st.st_size
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return files
+    
+    def _record(self, name: str, mtime_ns: int, files: Dict[FileKey, int]) -> None:
+        with self._lock:
+            self._release(name)
+            for key, size in files.items():
+                linked = self._files.get(key)
+                if linked is None:
+                    self._files[key] = [size, 1]
+                    self.total_bytes += size
+                else:
+                    linked[1] += 1
+            self._entries[name] = (mtime_ns, tuple(files))
+    
+    def _forget(self, name: str) -> int:
+        with self._lock:
+            return self._release(name)
+    
+    def _release(self, name: str) -> int:
+        """Drop an entry's links (lock held) and return the bytes no entry links to any more."""
+        previous = self._entries.pop(name, None)
+        if previous is None:
+            return 0
+        
+        freed = 0
+        for key in previous[1]:
+            linked = self._files[key]
+            linked[1] -= 1
+            if not linked[1]:
+                del self._files[key]
+                freed += linked[0]
+        self.total_bytes -= freed
+        return freed
+    
+    def _delete(self, path: str, is_dir: bool) -> bool:
+        try:
+            if is_dir:
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            return True
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            self.logger.warning(f"Failed to delete {path}: {e}")
+            return False
+    
+    def _delete_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.delete_workers, thread_name_prefix="disk-sweeper"
+            )
+        return self._executor
+    
+    def get_directory_size(self, name: str) -> Optional[int]:
+        """Get the bytes only a job directory holds, if it has been measured.
+        
+        Files hard-linked from other directories are left out, since
+        deleting this directory would not free them.
+        """
+        with self._lock:
+            cached = self._entries.get(name)
+            if cached is None:
+                return None
+            return sum(self._files[key][0] for key in cached[1] if self._files[key][1] == 1)
+    
+    def get_freeable_bytes(self, names: Iterable[str]) -> int:
+        """Get the bytes deleting all of the given entries would free.
+        
+        A hard-linked file counts once, and only if every entry linking
+        to it is among them.
+        """
+        with self._lock:
+            links: Dict[FileKey, int] = {}
+            for name in names:
+                cached = self._entries.get(name)
+                if cached is not None:
+                    for key in cached[1]:
+                        links[key] = links.get(key, 0) + 1
+            return sum(self._files[key][0] for key, count in links.items() if count == self._files[key][1])
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sweeper statistics."""
+        return {
+            "tracked_entries": len(self._entries),
+            "tracked_files": len(self._files),
+            "total_bytes": self.total_bytes,
+            "sweeps": self.sweeps,
+            "entries_scanned": self.entries_scanned,
+            "directories_measured": self.directories_measured,
+            "deleted": self.deleted,
+            "bytes_freed": self.bytes_freed,
+            "last_sweep_seconds": self.last_sweep_seconds
+        }
+
+
+# Shared sweeper for the downloads directory
+disk_sweeper = DiskSweeper()
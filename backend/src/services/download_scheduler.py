@@ -0,0 +1,205 @@
+"""
+DownloadScheduler for bounding concurrent yt-dlp downloads.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..models.download_request import DownloadRequest
+from ..models.download_job import DownloadJob, JobStage, JobStatus
+from ..storage.job_storage import save_job
+
+
+class SchedulerFullError(Exception):
+    """Raised when a download cannot be admitted to the queue."""
+
+
+class DownloadScheduler:
+    """Queue of pending downloads served by a fixed pool of workers.
+    
+    Jobs stay PENDING while queued and are moved to PROCESSING by the
+    worker that picks them up, so the number of concurrent yt-dlp
+    processes never exceeds ``worker_count``.
+    
+    A handler may return while its job is still running, having handed
+    it on (e.g. to the post-processing pool). The worker is then free
+    for the next download, but the job keeps counting against its
+    user's limit until whoever took it over calls ``finish``.
+    """
+    
+    ORDERING_FIFO = "fifo"
+    ORDERING_PRIORITY = "priority"
+    
+    def __init__(
+        self,
+        handler: Callable[[DownloadRequest, DownloadJob], Awaitable[None]],
+        worker_count: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        max_jobs_per_user: Optional[int] = None,
+        ordering: Optional[str] = None
+    ):
+        """Initialize DownloadScheduler."""
+        self.handler = handler
+        self.worker_count = worker_count or int(os.getenv("MAX_CONCURRENT_DOWNLOADS", "5"))
+        self.max_queue_size = max_queue_size or int(os.getenv("MAX_QUEUED_DOWNLOADS", "100"))
+        self.max_jobs_per_user = max_jobs_per_user or int(os.getenv("MAX_DOWNLOADS_PER_USER", "10"))
+        self.ordering = (ordering or os.getenv("DOWNLOAD_QUEUE_ORDERING", self.ORDERING_FIFO)).lower()
+        if self.ordering not in (self.ORDERING_FIFO, self.ORDERING_PRIORITY):
+            raise ValueError(f"Unknown queue ordering: {self.ordering}")
+        
+        self.logger = logging.getLogger(__name__)
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers = []
+        self._sequence = itertools.count()
+        self._active_jobs: Dict[str, str] = {}
+        self._user_jobs: Dict[str, int] = {}
+        self._handed_off: Dict[str, str] = {}
+        self._running = False
+        
+        # Counters
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+    
+    async def start(self):
+        """Start the worker pool."""
+        if self._running:
+            return
+        
+        self._running = True
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(index))
+            for index in range(self.worker_count)
+        ]
+        self.logger.info(
+            f"Download scheduler started ({self.worker_count} workers, {self.ordering} ordering)"
+        )
+    
+    async def stop(self):
+        """Stop the worker pool, cancelling in-flight downloads."""
+        if not self._running:
+            return
+        
+        self._running = False
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.logger.info("Download scheduler stopped")
+    
+    def submit(self, request: DownloadRequest, job: DownloadJob) -> int:
+        """Admit a download into the queue and return its queue position.
+        
+        Raises SchedulerFullError when the queue is full or the user
+        already has too many downloads queued or running.
+        """
+        if not self._running:
+            raise SchedulerFullError("Download scheduler is not running")
+        
+        if self._queue.qsize() >= self.max_queue_size:
+            self._rejected += 1
+            raise SchedulerFullError("Download queue is full, try again later")
+        
+        user_jobs = self._user_jobs.get(request.user_id, 0)
+        if user_jobs >= self.max_jobs_per_user:
+            self._rejected += 1
+            raise SchedulerFullError(
+                f"Too many downloads in progress for user {request.user_id}"
+            )
+        
+        priority = request.priority if self.ordering == self.ORDERING_PRIORITY else 0
+        job.mark_stage(JobStage.QUEUED)
+        self._queue.put_nowait((priority, next(self._sequence), request, job))
+        self._user_jobs[request.user_id] = user_jobs + 1
+        self._submitted += 1
+        
+        return self._queue.qsize()
+    
+    async def _worker_loop(self, index: int):
+        """Take downloads off the queue and run them one at a time."""
+        while self._running:
+            _, _, request, job = await self._queue.get()
+            try:
+                await self._run_job(request, job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Worker {index} failed to process job {job.id}: {e}")
+            finally:
+                self._queue.task_done()
+    
+    async def _run_job(self, request: DownloadRequest, job: DownloadJob):
+        """Move a job to PROCESSING and hand it to the download handler."""
+        self._active_jobs[job.id] = request.user_id
+        try:
+            job.mark_stage(JobStage.METADATA)
+            job.update_progress(0, JobStatus.PROCESSING)
+            save_job(job)
+            
+            await self.handler(request, job)
+            
+            if not job.is_finished():
+                self._handed_off[job.id] = request.user_id
+            elif job.status == JobStatus.FAILED:
+                self._failed += 1
+            else:
+                self._completed += 1
+        except Exception as e:
+            self._failed += 1
+            job.mark_failed(str(e))
+            save_job(job)
+        finally:
+            del self._active_jobs[job.id]
+            if job.id not in self._handed_off:
+                self._release_user(request.user_id)
+    
+    def finish(self, job: DownloadJob) -> None:
+        """Count a job the handler handed on once it is no longer running."""
+        user_id = self._handed_off.pop(job.id, None)
+        if user_id is None:
+            return
+        
+        if job.status == JobStatus.COMPLETED:
+            self._completed += 1
+        else:
+            self._failed += 1
+        self._release_user(user_id)
+    
+    def _release_user(self, user_id: str) -> None:
+        remaining = self._user_jobs.get(user_id, 1) - 1
+        if remaining > 0:
+            self._user_jobs[user_id] = remaining
+        else:
+            self._user_jobs.pop(user_id, None)
+    
+    @property
+    def queue_depth(self) -> int:
+        """Number of downloads waiting for a worker."""
+        return self._queue.qsize() if self._queue else 0
+    
+    @property
+    def active_workers(self) -> int:
+        """Number of workers currently running a download."""
+        return len(self._active_jobs)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        return {
+            "running": self._running,
+            "ordering": self.ordering,
+            "worker_count": self.worker_count,
+            "active_workers": self.active_workers,
+            "idle_workers": self.worker_count - self.active_workers,
+            "handed_off": len(self._handed_off),
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "completed": self._completed,
+            "failed": self._failed
+        }
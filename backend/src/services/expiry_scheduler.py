@@ -0,0 +1,202 @@
+"""
+ExpiryScheduler for expiring download jobs when their expires_at passes.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..models.download_job import DownloadJob, JobStatus, add_job_listener
+from ..storage.job_storage import delete_job, get_job, save_job
+from .disk_sweeper import DiskSweeper, disk_sweeper as shared_disk_sweeper
+from .file_service import FileService, get_file_service
+from .progress_bus import progress_bus
+
+# What happens to a job when its deadline passes
+_EXPIRE = 0
+_PURGE = 1
+
+# Seconds between checks on a job that is past expiry but still running
+_RUNNING_RECHECK_SECONDS = 300
+
+
+def _epoch(value: datetime) -> float:
+    """Convert a naive UTC datetime to an epoch timestamp."""
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+class ExpiryScheduler:
+    """Min-heap of job deadlines served by a single timer task.
+    
+    Each job has at most one live heap entry: first its ``expires_at``,
+    when its files are deleted and it moves to EXPIRED, then the end of
+    the grace period, when its record is dropped. Stale entries left by
+    a changed deadline are skipped when popped, so the heap only ever
+    holds roughly one entry per stored job.
+    """
+    
+    def __init__(
+        self,
+        file_service: Optional[FileService] = None,
+        grace_seconds: Optional[float] = None,
+        disk_sweeper: Optional[DiskSweeper] = None
+    ):
+        """Initialize ExpiryScheduler."""
+        self._file_service = file_service
+        self.grace_seconds = grace_seconds if grace_seconds is not None else float(
+            os.getenv("JOB_EXPIRY_GRACE_SECONDS", "3600")
+        )
+        self.disk_sweeper = disk_sweeper or shared_disk_sweeper
+        self.logger = logging.getLogger(__name__)
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._scheduled: Dict[str, Tuple[float, int]] = {}
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        
+        # Counters
+        self.expired = 0
+        self.purged = 0
+        
+        add_job_listener(self._on_job_changed)
+    
+    @property
+    def file_service(self) -> FileService:
+        # Built on first use rather than when the API modules are imported
+        if self._file_service is None:
+            self._file_service = get_file_service()
+        return self._file_service
+    
+    def load(self, jobs: Iterable[DownloadJob]) -> None:
+        """Schedule jobs restored from storage."""
+        for job in jobs:
+            self.schedule(job)
+    
+    def schedule(self, job: DownloadJob) -> None:
+        """Schedule the next expiry step for a job, replacing any earlier one."""
+        if job.status == JobStatus.EXPIRED:
+            deadline, phase = _epoch(job.expires_at) + self.grace_seconds, _PURGE
+        else:
+            deadline, phase = _epoch(job.expires_at), _EXPIRE
+        self._push(job.id, deadline, phase)
+    
+    async def start(self):
+        """Start the timer task."""
+        if self._task is not None:
+            return
+        
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        self.logger.info(f"Expiry scheduler started ({len(self._scheduled)} jobs scheduled)")
+    
+    async def stop(self):
+        """Stop the timer task."""
+        if self._task is None:
+            return
+        
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.logger.info("Expiry scheduler stopped")
+    
+    def _push(self, job_id: str, deadline: float, phase: int) -> None:
+        if self._scheduled.get(job_id) == (deadline, phase):
+            return
+        
+        self._scheduled[job_id] = (deadline, phase)
+        heapq.heappush(self._heap, (deadline, next(self._sequence), job_id, phase))
+        
+        # Wake the timer if this deadline is now the earliest
+        if self._wakeup is not None and self._heap[0][2] == job_id:
+            self._wakeup.set()
+    
+    def _on_job_changed(self, job: DownloadJob) -> None:
+        """Track new jobs and changed deadlines as jobs are updated."""
+        scheduled = self._scheduled.get(job.id)
+        if scheduled is None or scheduled[1] == _EXPIRE:
+            self.schedule(job)
+    
+    async def _run(self):
+        """Sleep until the earliest deadline, then process every due job."""
+        while True:
+            try:
+                self._wakeup.clear()
+                timeout = None
+                if self._heap:
+                    timeout = max(0.0, self._heap[0][0] - time.time())
+                
+                if timeout is None or timeout > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                        continue
+                    except asyncio.TimeoutError:
+                        pass
+                
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    deadline, _, job_id, phase = heapq.heappop(self._heap)
+                    if self._scheduled.get(job_id) != (deadline, phase):
+                        # Superseded by a later schedule() call
+                        continue
+                    del self._scheduled[job_id]
+                    
+                    if phase == _EXPIRE:
+                        await self._expire(job_id)
+                    else:
+                        self._purge(job_id)
+                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error in expiry scheduler: {e}")
+                await asyncio.sleep(1)
+    
+    async def _expire(self, job_id: str) -> None:
+        """Delete a job's files and mark it expired."""
+        job = get_job(job_id)
+        if job is None:
+            return
+        
+        if job.expires_at and _epoch(job.expires_at) > time.time():
+            # The deadline was extended after this entry was pushed
+            self.schedule(job)
+            return
+        
+        if job.status in [JobStatus.PENDING, JobStatus.PROCESSING]:
+            # Never pull files out from under a running download
+            self._push(job.id, time.time() + _RUNNING_RECHECK_SECONDS, _EXPIRE)
+            return
+        
+        job_dir = self.file_service.base_dir / job.id
+        await asyncio.to_thread(self.file_service.delete_directory, str(job_dir))
+        await asyncio.to_thread(self.disk_sweeper.refresh, job.id)
+        
+        job.mark_expired()
+        save_job(job)
+        self.expired += 1
+        self.logger.debug(f"Expired job {job.id}")
+    
+    def _purge(self, job_id: str) -> None:
+        """Drop an expired job's record."""
+        delete_job(job_id)
+        progress_bus.discard(job_id)
+        self.purged += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get expiry statistics."""
+        return {
+            "scheduled": len(self._scheduled),
+            "heap_size": len(self._heap),
+            "next_deadline": self._heap[0][0] if self._heap else None,
+            "grace_seconds": self.grace_seconds,
+            "expired": self.expired,
+            "purged": self.purged
+        }
@@ -132,6 +132,26 @@ class FileService:
         
         return files
     
+    def list_job_artifacts(self, job: DownloadJob) -> List[str]:
+        """List every finished file a completed job produced, sorted by name.
+        
+        Looks next to the job's main file, so jobs that share another
+        job's download see that download's files.
+        """
+        if not job.file_path:
+            return []
+        
+        job_dir = Path(job.file_path).parent
+        files = []
+        try:
+            for item in job_dir.iterdir():
+                if item.is_file() and item.suffix not in (".part", ".ytdl"):
+                    files.append(str(item))
+        except OSError:
+            pass
+        
+        return sorted(files)
+    
     def get_file_info(self, file_path: str) -> Optional[dict]:
         """Get file information."""
         try:
@@ -173,3 +193,14 @@ class FileService:
             return True
         except OSError:
             return False
+
+
+_file_service: Optional[FileService] = None
+
+
+def get_file_service() -> FileService:
+    """Get the FileService shared by the API and background services."""
+    global _file_service
+    if _file_service is None:
+        _file_service = FileService()
+    return _file_service
@@ -0,0 +1,178 @@
+"""
+FormatPlanner for choosing what a video download fetches.
+"""
+
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.download_request import DownloadRequest
+from ..models.video_metadata import FormatInfo, VideoMetadata
+
+# Codec filter prefixes yt-dlp reports for each preferable codec
+_CODEC_PREFIXES = {
+    "h264": ("avc1", "h264"),
+    "vp9": ("vp09", "vp9"),
+    "av1": ("av01", "av1"),
+}
+
+# Protocols that are not a media download (e.g. storyboard images)
+_SKIPPED_PROTOCOLS = ("mhtml",)
+
+# Audio containers that merge with a video container without re-encoding
+_AUDIO_EXTS = {"mp4": "m4a", "webm": "webm"}
+
+
+class FormatPlan:
+    """The formats one video download fetches."""
+    
+    __slots__ = ("selector", "format_ids", "estimated_size", "merge")
+    
+    def __init__(
+        self,
+        selector: str,
+        format_ids: Tuple[str, ...] = (),
+        estimated_size: Optional[int] = None,
+        merge: bool = False
+    ):
+        self.selector = selector
+        self.format_ids = format_ids
+        self.estimated_size = estimated_size
+        self.merge = merge
+
+
+class FormatPlanner:
+    """Picks the cheapest formats that meet a request's constraints.
+    
+    Candidates are single files with audio and video, and video-only
+    formats paired with an audio-only one, limited to the requested
+    maximum height and size. The tallest remaining height wins, then
+    the preferred codec; at that point a single file beats a pair, so
+    no merge runs after the download when it isn't needed, and the
+    fewest bytes decide between the rest. Without a format index
+    (metadata not cached) the constraints are handed to yt-dlp as a
+    format selector instead.
+    """
+    
+    def __init__(self, default_max_height: Optional[int] = None):
+        """Initialize FormatPlanner."""
+        self.default_max_height = default_max_height or int(os.getenv("DEFAULT_MAX_HEIGHT", "720"))
+        self.logger = logging.getLogger(__name__)
+        
+        # Counters
+        self.single = 0
+        self.merged = 0
+        self.fallback = 0
+    
+    def plan(self, request: DownloadRequest, metadata: Optional[VideoMetadata] = None) -> FormatPlan:
+        """Plan a video download, using the format index of metadata if given."""
+        max_height = request.max_height or self.default_max_height
+        fallback = self.fallback_selector(max_height, request.max_filesize, request.preferred_codec)
+        
+        choice = None
+        if metadata is not None and metadata.formats:
+            choice = self._choose(metadata, max_height, request.max_filesize, request.preferred_codec)
+        if choice is None:
+            self.fallback += 1
+            return FormatPlan(fallback)
+        
+        formats, size = choice
+        format_ids = tuple(fmt.format_id for fmt in formats)
+        if len(formats) > 1:
+            self.merged += 1
+        else:
+            self.single += 1
+        
+        # Formats can disappear between extraction and download
+        return FormatPlan(f"{'+'.join(format_ids)}/{fallback}", format_ids, size, len(formats) > 1)
+    
+    def estimate_size(self, request: DownloadRequest, metadata: VideoMetadata) -> Optional[int]:
+        """Size of the formats a video download would fetch, if known."""
+        if not metadata.formats:
+            return None
+        choice = self._choose(
+            metadata,
+            request.max_height or self.default_max_height,
+            request.max_filesize,
+            request.preferred_codec
+        )
+        return choice[1] if choice else None
+    
+    def fallback_selector(
+        self,
+        max_height: int,
+        max_filesize: Optional[int] = None,
+        preferred_codec: Optional[str] = None
+    ) -> str:
+        """Build a yt-dlp format selector expressing the constraints."""
+        limits = f"[height<={max_height}]"
+        if max_filesize:
+            limits += f"[filesize<=?{max_filesize}]"
+        
+        selectors = []
+        if preferred_codec:
+            selectors.append(f"bestvideo{limits}[vcodec^={_CODEC_PREFIXES[preferred_codec][0]}]+bestaudio")
+        selectors.append(f"bestvideo{limits}+bestaudio")
+        selectors.append(f"best{limits}")
+        return "/".join(selectors)
+    
+    def _choose(
+        self,
+        metadata: VideoMetadata,
+        max_height: int,
+        max_filesize: Optional[int],
+        preferred_codec: Optional[str]
+    ) -> Optional[Tuple[List[FormatInfo], Optional[int]]]:
+        usable = [
+            fmt for fmt in metadata.formats
+            if fmt.protocol not in _SKIPPED_PROTOCOLS and (fmt.height or 0) <= max_height
+        ]
+        candidates = [[fmt] for fmt in usable if fmt.has_video() and fmt.has_audio()]
+        
+        audio = [fmt for fmt in usable if fmt.has_audio() and not fmt.has_video()]
+        if audio:
+            for video in (fmt for fmt in usable if fmt.has_video() and not fmt.has_audio()):
+                candidates.append([video, self._best_audio(audio, video)])
+        
+        best = None
+        for formats in candidates:
+            size = self._size(formats, metadata.duration)
+            if max_filesize and size is not None and size > max_filesize:
+                continue
+            key = self._rank(formats, size, preferred_codec)
+            if best is None or key < best[0]:
+                best = (key, formats, size)
+        return (best[1], best[2]) if best else None
+    
+    @staticmethod
+    def _best_audio(audio: List[FormatInfo], video: FormatInfo) -> FormatInfo:
+        """Highest-bitrate audio, preferring one that merges without re-encoding."""
+        matching = [fmt for fmt in audio if fmt.ext == _AUDIO_EXTS.get(video.ext)]
+        return max(matching or audio, key=lambda fmt: fmt.tbr or 0)
+    
+    @staticmethod
+    def _size(formats: List[FormatInfo], duration: float) -> Optional[int]:
+        sizes = [fmt.estimate_size(duration) for fmt in formats]
+        return None if None in sizes else sum(sizes)
+    
+    @staticmethod
+    def _rank(formats: List[FormatInfo], size: Optional[int], preferred_codec: Optional[str]) -> tuple:
+        """Sort key: tallest, preferred codec, no merge, then known and smallest size."""
+        video = formats[0]
+        codec_miss = bool(preferred_codec) and not (video.vcodec or "").startswith(
+            _CODEC_PREFIXES[preferred_codec]
+        )
+        return (-(video.height or 0), codec_miss, len(formats) > 1, size is None, size or 0)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get planning statistics."""
+        return {
+            "single": self.single,
+            "merged": self.merged,
+            "fallback": self.fallback,
+            "default_max_height": self.default_max_height
+        }
+
+
+# Global format planner
+format_planner = FormatPlanner()
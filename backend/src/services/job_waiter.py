@@ -0,0 +1,103 @@
+"""
+JobWaiter for long-polling job changes in yt-dlp Web UI.
+"""
+
+import asyncio
+import threading
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from ..models.download_job import DownloadJob, add_job_listener
+
+
+class JobWaiter:
+    """Parks requests until any of the jobs they watch changes.
+    
+    A waiting request costs one future, registered under every job it
+    watches; a job change resolves the futures registered for it and
+    forgets them. Nothing is kept for jobs nobody is waiting on.
+    """
+    
+    def __init__(self):
+        """Initialize JobWaiter."""
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._waiting = 0
+        
+        # Counters
+        self.woken = 0
+        self.timed_out = 0
+    
+    def notify(self, job: DownloadJob) -> None:
+        """Wake requests waiting on a job (used as a job listener), from any thread."""
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            # Nobody can be waiting any more once the serving loop has closed
+            if not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._wake, job.id)
+        elif job.id in self._waiters:
+            self._wake(job.id)
+    
+    def _wake(self, job_id: str) -> None:
+        for waiter in self._waiters.pop(job_id, ()):
+            if not waiter.done():
+                waiter.set_result(job_id)
+    
+    async def wait(
+        self,
+        job_ids: Iterable[str],
+        timeout: float,
+        changed: Callable[[], bool]
+    ) -> bool:
+        """Wait up to timeout seconds for any of the jobs to change.
+        
+        ``changed`` is checked once the request is registered, so a
+        change that landed between the caller's last look and the
+        registration is not missed. Returns False on timeout.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._loop_thread = threading.get_ident()
+        
+        job_ids = list(job_ids)
+        waiter = loop.create_future()
+        for job_id in job_ids:
+            self._waiters.setdefault(job_id, set()).add(waiter)
+        self._waiting += 1
+        
+        try:
+            if changed():
+                return True
+            await asyncio.wait_for(waiter, timeout)
+            self.woken += 1
+            return True
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return False
+        finally:
+            self._waiting -= 1
+            for job_id in job_ids:
+                waiters = self._waiters.get(job_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[job_id]
+    
+    @property
+    def waiting(self) -> int:
+        """Number of requests currently waiting."""
+        return self._waiting
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get waiter statistics."""
+        return {
+            "waiting": self._waiting,
+            "watched_jobs": len(self._waiters),
+            "woken": self.woken,
+            "timed_out": self.timed_out
+        }
+
+
+# Global job waiter, fed by every DownloadJob state change
+job_waiter = JobWaiter()
+add_job_listener(job_waiter.notify)
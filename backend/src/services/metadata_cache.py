@@ -0,0 +1,256 @@
+"""
+MetadataCache for reusing yt-dlp metadata lookups.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from ..models.video_metadata import VideoMetadata
+
+
+_VIDEO_ID_PATTERN = re.compile(r"^[\w-]{6,}$")
+_PATH_PREFIXES = ("/embed/", "/v/", "/shorts/", "/live/")
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """Extract the canonical YouTube video ID from any supported URL form."""
+    try:
+        parsed = urlparse(url.strip())
+    except ValueError:
+        return None
+    
+    host = (parsed.hostname or "").lower()
+    candidate = None
+    
+    if host == "youtu.be":
+        candidate = parsed.path.lstrip("/").split("/")[0]
+    elif host.endswith("youtube.com"):
+        if parsed.path == "/watch":
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        else:
+            for prefix in _PATH_PREFIXES:
+                if parsed.path.startswith(prefix):
+                    candidate = parsed.path[len(prefix):].split("/")[0]
+                    break
+    
+    if candidate and _VIDEO_ID_PATTERN.match(candidate):
+        return candidate
+    return None
+
+
+def cache_key_for_url(url: str) -> str:
+    """Get the cache key for a URL, falling back to the URL itself."""
+    return extract_video_id(url) or url.strip()
+
+
+class MetadataCache:
+    """Size-bounded LRU cache of VideoMetadata with TTL expiry.
+    
+    Entries are keyed by canonical video ID so every URL form of a video
+    shares one entry. Concurrent misses for the same key share a single
+    load (single-flight). An optional on-disk tier keeps entries across
+    restarts.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        disk_dir: Optional[str] = None
+    ):
+        """Initialize MetadataCache."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.logger = logging.getLogger(__name__)
+        self._entries: "OrderedDict[str, Tuple[float, VideoMetadata]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    async def get_or_load(
+        self,
+        url: str,
+        loader: Callable[[], Awaitable[VideoMetadata]]
+    ) -> VideoMetadata:
+        """Return cached metadata for url, calling loader at most once per key."""
+        key = cache_key_for_url(url)
+        
+        while True:
+            metadata = self.get(key)
+            if metadata is not None:
+                return self._for_url(metadata, url)
+            
+            # Join a load that is already running for this key
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self.coalesced += 1
+            try:
+                return self._for_url(await asyncio.shield(inflight), url)
+            except asyncio.CancelledError:
+                # The caller running the load was cancelled, not this one: retry
+                if not inflight.cancelled():
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            metadata = None
+            if self.disk_dir:
+                metadata = await asyncio.to_thread(self._read_disk, key)
+            
+            if metadata is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                metadata = await loader()
+                if self.disk_dir:
+                    await asyncio.to_thread(self._write_disk, key, metadata)
+            
+            self.put(key, metadata)
+            future.set_result(metadata)
+            return self._for_url(metadata, url)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelled, e.g. by a client disconnect; callers waiting on it retry
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+    
+    def get(self, key: str) -> Optional[VideoMetadata]:
+        """Get a live in-memory entry, counting a hit if found."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, metadata = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return metadata
+    
+    def peek(self, url_or_key: str) -> Optional[VideoMetadata]:
+        """Get a live in-memory entry without touching LRU order or counters."""
+        entry = self._entries.get(cache_key_for_url(url_or_key))
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+    
+    def put(self, key: str, metadata: VideoMetadata) -> None:
+        """Insert an entry, evicting the least recently used if full."""
+        self._store(key, metadata)
+    
+    def invalidate(self, url_or_key: str) -> None:
+        """Drop an entry from every tier."""
+        key = cache_key_for_url(url_or_key)
+        self._entries.pop(key, None)
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+    
+    def _store(self, key: str, metadata: VideoMetadata) -> None:
+        self._entries[key] = (time.time() + self.ttl_seconds, metadata)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def _for_url(self, metadata: VideoMetadata, url: str) -> VideoMetadata:
+        """Return metadata reporting the URL the caller asked about."""
+        if metadata.url == url:
+            return metadata
+        return metadata.model_copy(update={"url": url})
+    
+    def _disk_path(self, key: str) -> Path:
+        safe_key = re.sub(r"[^\w-]", "_", key)
+        return self.disk_dir / f"{safe_key}.json"
+    
+    def _read_disk(self, key: str) -> Optional[VideoMetadata]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if entry.get("key") != key or entry.get("expires_at", 0) <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        
+        try:
+            return VideoMetadata.model_validate(entry["metadata"])
+        except Exception:
+            return None
+    
+    def _write_disk(self, key: str, metadata: VideoMetadata) -> None:
+        path = self._disk_path(key)
+        entry = {
+            "key": key,
+            "expires_at": time.time() + self.ttl_seconds,
+            "metadata": metadata.model_dump(mode="json")
+        }
+        try:
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"Failed to write metadata cache entry {key}: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.disk_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "disk_tier": str(self.disk_dir) if self.disk_dir else None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "inflight": len(self._inflight),
+            "hit_ratio": (lookups - self.misses) / lookups if lookups else 0.0
+        }
+
+
+# Shared metadata cache for every YtDlpService instance
+metadata_cache = MetadataCache(
+    max_entries=int(os.getenv("METADATA_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("METADATA_CACHE_TTL_SECONDS", "3600")),
+    disk_dir=os.getenv("METADATA_CACHE_DIR") or None
+)
@@ -0,0 +1,268 @@
+"""
+Metrics in the Prometheus text exposition format for yt-dlp Web UI.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; spans quick sweeps and extractions up to hour-long downloads
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+# Seconds of event loop delay beyond the expected wake-up time
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+# A collected sample: metric name suffix, label pairs and value
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels)
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base of metrics with optional labels.
+    
+    Updates are plain attribute arithmetic with no locking. They run on
+    the event loop thread, and a scrape that races a rare off-loop update
+    can at worst be one observation behind.
+    """
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], "Metric"] = {}
+    
+    def labels(self, **labels: str) -> "Metric":
+        """Get the child metric for a set of label values."""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+    
+    def _new_child(self) -> "Metric":
+        return type(self)(self.name, self.documentation)
+    
+    def samples(self) -> List[Sample]:
+        if not self.labelnames:
+            return self._own_samples(())
+        
+        samples = []
+        for key, child in list(self._children.items()):
+            samples.extend(child._own_samples(tuple(zip(self.labelnames, key))))
+        return samples
+    
+    def _own_samples(self, labels) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0
+    
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+    
+    def _own_samples(self, labels) -> List[Sample]:
+        return [("_total", labels, self.value)]
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0
+    
+    def set(self, value: float) -> None:
+        self.value = value
+    
+    def _own_samples(self, labels) -> List[Sample]:
+        return [("", labels, self.value)]
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets."""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+    
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+    
+    def _own_samples(self, labels) -> List[Sample]:
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            samples.append(("_bucket", labels + (("le", _format_value(bound)),), cumulative))
+        samples.append(("_sum", labels, self.sum))
+        samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """Metrics and scrape-time collectors rendered together."""
+    
+    def __init__(self):
+        """Initialize MetricsRegistry."""
+        self.logger = logging.getLogger(__name__)
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DURATION_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        """Register a callable returning metrics built at scrape time."""
+        self._collectors.append(collector)
+    
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            try:
+                metrics.extend(collector())
+            except Exception as e:
+                self.logger.error(f"Metrics collector failed: {e}")
+        
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class EventLoopMonitor:
+    """Measures how late the event loop wakes a sleeping task."""
+    
+    def __init__(self, histogram: Histogram, gauge: Gauge, interval: float = 0.5):
+        """Initialize EventLoopMonitor."""
+        self.histogram = histogram
+        self.gauge = gauge
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.histogram.observe(lag)
+            self.gauge.set(lag)
+
+
+# Shared registry and the metrics recorded on the hot path
+registry = MetricsRegistry()
+
+metadata_duration = registry.histogram(
+    "ytdlp_metadata_extraction_duration_seconds",
+    "Time spent extracting metadata with yt-dlp (cache misses only)."
+)
+download_duration = registry.histogram(
+    "ytdlp_download_duration_seconds",
+    "Time from a worker starting a download to its completion.",
+    labelnames=("format",)
+)
+downloads_finished = registry.counter(
+    "ytdlp_downloads",
+    "Downloads that finished, by format and outcome.",
+    labelnames=("format", "status")
+)
+downloaded_bytes = registry.counter(
+    "ytdlp_downloaded_bytes",
+    "Bytes received by yt-dlp across all downloads; rate() gives throughput."
+)
+stage_duration = registry.histogram(
+    "ytdlp_job_stage_duration_seconds",
+    "Time completed downloads spent in each stage.",
+    labelnames=("stage",)
+)
+sweep_duration = registry.histogram(
+    "ytdlp_cleanup_sweep_duration_seconds",
+    "Time taken by each sweep of the downloads directory."
+)
+event_loop_lag = registry.histogram(
+    "ytdlp_event_loop_lag_seconds",
+    "Delay between when the event loop should have woken a task and when it did.",
+    buckets=LAG_BUCKETS
+)
+event_loop_lag_last = registry.gauge(
+    "ytdlp_event_loop_lag_last_seconds",
+    "Most recent event loop lag measurement."
+)
+event_loop_monitor = EventLoopMonitor(event_loop_lag, event_loop_lag_last)
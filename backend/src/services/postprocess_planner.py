@@ -0,0 +1,197 @@
+"""
+PostprocessPlanner for choosing how audio downloads are converted.
+"""
+
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from ..models.download_request import DownloadFormat, DownloadRequest
+from ..models.video_metadata import FormatInfo, VideoMetadata
+
+# Constant bitrates offered for MP3 encodes, in kbit/s
+MP3_BITRATES = (96, 128, 160, 192, 256, 320)
+
+# Codecs that decode to PCM without loss
+_LOSSLESS_CODECS = ("flac", "alac", "pcm")
+
+# WAV output is 16-bit PCM
+_WAV_BYTES_PER_SAMPLE = 2
+
+# ffmpeg audio encoder per output format, and its settings when no bitrate is planned
+_ENCODERS = {
+    "mp3": ["-c:a", "libmp3lame", "-q:a", "5"],
+    "wav": ["-c:a", "pcm_s16le"],
+}
+
+
+def _codec(fmt: FormatInfo) -> str:
+    return (fmt.acodec or "").split(".")[0].lower()
+
+
+class PostprocessPlan:
+    """How an audio download is fetched and converted."""
+    
+    __slots__ = ("audio_format", "action", "source", "bitrate", "estimated_size", "cpu_seconds_saved")
+    
+    def __init__(
+        self,
+        audio_format: str,
+        action: str,
+        source: Optional[FormatInfo] = None,
+        bitrate: Optional[int] = None,
+        estimated_size: Optional[int] = None,
+        cpu_seconds_saved: Optional[float] = None
+    ):
+        self.audio_format = audio_format
+        self.action = action
+        self.source = source
+        self.bitrate = bitrate
+        self.estimated_size = estimated_size
+        self.cpu_seconds_saved = cpu_seconds_saved
+    
+    @property
+    def fetch_args(self) -> List[str]:
+        """yt-dlp arguments that download the source stream without converting it."""
+        return ["-f", f"{self.source.format_id}/bestaudio" if self.source else "bestaudio"]
+    
+    @property
+    def args(self) -> List[str]:
+        """yt-dlp arguments that download and convert in one run."""
+        args = self.fetch_args + ["--extract-audio", "--audio-format", self.audio_format]
+        if self.bitrate:
+            args.extend(["--audio-quality", f"{self.bitrate}K"])
+        return args
+    
+    def codec_args(self) -> Optional[List[str]]:
+        """ffmpeg output arguments for the conversion, or None if the source is used as is."""
+        if self.action == "copy":
+            return None
+        if self.action == "remux":
+            return ["-c:a", "copy"]
+        if self.bitrate:
+            return ["-c:a", "libmp3lame", "-b:a", f"{self.bitrate}k"]
+        return list(_ENCODERS[self.audio_format])
+
+
+class PostprocessPlanner:
+    """Avoids transcoding audio downloads where the source allows it.
+    
+    The audio stream is picked from the cached format index. For MP3, an
+    MP3 source is fetched as is ("copy") or stream-copied out of its
+    container ("remux"), so no encoder runs; any other source is encoded
+    at the smallest standard bitrate that keeps up with the source's
+    ("encode"), since a higher one only adds bytes. For WAV, a lossless
+    source is preferred and the output size follows from its sample rate
+    and channels. CPU time saved is estimated from the duration and
+    ``encode_speed``, the seconds of audio one core encodes to MP3 per
+    second, which benchmarks/bench_postprocess.py measures. Without a
+    format index the download falls back to yt-dlp's own choice
+    ("unplanned").
+    """
+    
+    def __init__(self, encode_speed: Optional[float] = None):
+        """Initialize PostprocessPlanner."""
+        self.encode_speed = encode_speed or float(os.getenv("POSTPROCESS_ENCODE_SPEED", "40"))
+        self.logger = logging.getLogger(__name__)
+        
+        # Counters
+        self.actions: Dict[str, int] = {"copy": 0, "remux": 0, "encode": 0, "unplanned": 0}
+        self.cpu_seconds_saved = 0.0
+    
+    def plan(self, request: DownloadRequest, metadata: Optional[VideoMetadata] = None) -> PostprocessPlan:
+        """Plan the fetch and conversion of an audio download."""
+        plan = self._plan(request, metadata)
+        self.actions[plan.action] += 1
+        self.cpu_seconds_saved += plan.cpu_seconds_saved or 0.0
+        return plan
+    
+    def estimate_size(self, request: DownloadRequest, metadata: VideoMetadata) -> Optional[int]:
+        """Size of the converted audio, if the format index allows an estimate."""
+        return self._plan(request, metadata).estimated_size
+    
+    def choose_bitrate(self, source_kbps: Optional[float]) -> Optional[int]:
+        """Smallest MP3 bitrate at or above the source's, or None if unknown."""
+        if not source_kbps:
+            return None
+        for bitrate in MP3_BITRATES:
+            if bitrate >= source_kbps:
+                return bitrate
+        return MP3_BITRATES[-1]
+    
+    def _plan(self, request: DownloadRequest, metadata: Optional[VideoMetadata]) -> PostprocessPlan:
+        target = DownloadFormat(request.format)
+        if target == DownloadFormat.AUDIO_MP3:
+            return self._plan_mp3(metadata)
+        if target == DownloadFormat.AUDIO_WAV:
+            return self._plan_wav(metadata)
+        raise ValueError(f"No post-processing for format: {target.value}")
+    
+    def _plan_mp3(self, metadata: Optional[VideoMetadata]) -> PostprocessPlan:
+        sources = self._audio_sources(metadata)
+        if not sources:
+            return PostprocessPlan("mp3", "unplanned")
+        
+        duration = metadata.duration
+        mp3 = [fmt for fmt in sources if _codec(fmt) == "mp3"]
+        if mp3:
+            source = max(mp3, key=lambda fmt: fmt.tbr or 0)
+            return PostprocessPlan(
+                "mp3",
+                "copy" if source.ext == "mp3" else "remux",
+                source,
+                estimated_size=source.estimate_size(duration),
+                cpu_seconds_saved=round(duration / self.encode_speed, 2)
+            )
+        
+        source = max(sources, key=lambda fmt: fmt.tbr or 0)
+        bitrate = self.choose_bitrate(source.tbr)
+        return PostprocessPlan(
+            "mp3",
+            "encode",
+            source,
+            bitrate,
+            estimated_size=int(bitrate * 1000 / 8 * duration) if bitrate else None,
+            cpu_seconds_saved=0.0
+        )
+    
+    def _plan_wav(self, metadata: Optional[VideoMetadata]) -> PostprocessPlan:
+        sources = self._audio_sources(metadata)
+        if not sources:
+            return PostprocessPlan("wav", "unplanned")
+        
+        # Decoding lossless audio to PCM is cheap and keeps every sample
+        source = max(sources, key=lambda fmt: (_codec(fmt).startswith(_LOSSLESS_CODECS), fmt.tbr or 0))
+        estimated_size = None
+        if source.asr:
+            estimated_size = int(metadata.duration * source.asr * (source.audio_channels or 2) * _WAV_BYTES_PER_SAMPLE)
+        
+        if _codec(source).startswith("pcm"):
+            action = "copy" if source.ext == "wav" else "remux"
+        else:
+            action = "encode"
+        return PostprocessPlan(
+            "wav",
+            action,
+            source,
+            estimated_size=estimated_size,
+            cpu_seconds_saved=0.0
+        )
+    
+    @staticmethod
+    def _audio_sources(metadata: Optional[VideoMetadata]) -> List[FormatInfo]:
+        if metadata is None:
+            return []
+        return [fmt for fmt in metadata.formats if fmt.has_audio() and not fmt.has_video()]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get post-processing planning statistics."""
+        return {
+            **self.actions,
+            "cpu_seconds_saved": round(self.cpu_seconds_saved, 2),
+            "encode_speed": self.encode_speed
+        }
+
+
+# Global post-processing planner
+postprocess_planner = PostprocessPlanner()
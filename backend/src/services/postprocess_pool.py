@@ -0,0 +1,205 @@
+"""
+PostprocessPool for running CPU-bound conversions apart from downloads.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from ..models.download_request import DownloadRequest
+from ..models.download_job import DownloadJob, JobStage, JobStatus
+from .postprocess_planner import PostprocessPlan
+
+
+def parse_cpu_list(value: str) -> Set[int]:
+    """Parse a CPU list such as ``0-3,6`` into a set of CPU numbers."""
+    cpus = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+class PostprocessTask:
+    """A fetched download waiting for its conversion."""
+    
+    __slots__ = ("request", "job", "source_path", "plan", "started")
+    
+    def __init__(
+        self,
+        request: DownloadRequest,
+        job: DownloadJob,
+        source_path: str,
+        plan: PostprocessPlan,
+        started: float
+    ):
+        self.request = request
+        self.job = job
+        self.source_path = source_path
+        self.plan = plan
+        self.started = started
+
+
+class PostprocessPool:
+    """Queue of fetched downloads converted by a pool sized to the CPUs.
+    
+    Download workers hand a job over as soon as its media is fetched, so
+    a long conversion never holds a network slot, and at most
+    ``worker_count`` conversions run at once, so they never oversubscribe
+    the CPUs. Converter processes are started through ``nice`` and, if
+    ``cpus`` is set, ``taskset``, leaving the event loop and the
+    downloads responsive. Conversions still queued when the pool stops
+    are handed to ``on_dropped`` so their jobs do not hang.
+    """
+    
+    def __init__(
+        self,
+        handler: Callable[[PostprocessTask], Awaitable[None]],
+        worker_count: Optional[int] = None,
+        nice: Optional[int] = None,
+        cpus: Optional[str] = None,
+        on_dropped: Optional[Callable[[PostprocessTask], None]] = None
+    ):
+        """Initialize PostprocessPool."""
+        self.handler = handler
+        self.on_dropped = on_dropped
+        self.worker_count = worker_count or int(os.getenv("POSTPROCESS_WORKERS", "0")) or os.cpu_count() or 1
+        self.nice = nice if nice is not None else int(os.getenv("POSTPROCESS_NICE", "10"))
+        cpu_list = cpus if cpus is not None else os.getenv("POSTPROCESS_CPUS", "")
+        self.cpus = parse_cpu_list(cpu_list) or None
+        
+        self.logger = logging.getLogger(__name__)
+        self.command_prefix = self._build_command_prefix()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._active_jobs: Set[str] = set()
+        self._running = False
+        
+        # Counters
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._dropped = 0
+        self._busy_seconds = 0.0
+    
+    def _build_command_prefix(self) -> List[str]:
+        """Build the argv prefix that lowers a converter's priority and CPU set."""
+        prefix = []
+        if self.nice:
+            if shutil.which("nice"):
+                prefix.extend(["nice", "-n", str(self.nice)])
+            else:
+                self.logger.warning("nice not found, converters run at normal priority")
+        if self.cpus:
+            if shutil.which("taskset"):
+                prefix.extend(["taskset", "-c", ",".join(str(cpu) for cpu in sorted(self.cpus))])
+            else:
+                self.logger.warning("taskset not found, converters may run on any CPU")
+        return prefix
+    
+    async def start(self):
+        """Start the worker pool."""
+        if self._running:
+            return
+        
+        self._running = True
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker_loop(index))
+            for index in range(self.worker_count)
+        ]
+        self.logger.info(
+            f"Post-processing pool started ({self.worker_count} workers, nice {self.nice}"
+            + (f", CPUs {sorted(self.cpus)})" if self.cpus else ")")
+        )
+    
+    async def stop(self):
+        """Stop the worker pool, cancelling running conversions and dropping queued ones."""
+        if not self._running:
+            return
+        
+        self._running = False
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        
+        while not self._queue.empty():
+            task = self._queue.get_nowait()
+            self._dropped += 1
+            if self.on_dropped is None:
+                continue
+            try:
+                self.on_dropped(task)
+            except Exception as e:
+                self.logger.error(f"Failed to drop queued job {task.job.id}: {e}")
+        
+        self.logger.info("Post-processing pool stopped")
+    
+    def submit(self, task: PostprocessTask) -> int:
+        """Queue a fetched download for conversion and return its queue position."""
+        if not self._running:
+            raise RuntimeError("Post-processing pool is not running")
+        
+        task.job.mark_stage(JobStage.POSTPROCESS)
+        self._queue.put_nowait(task)
+        self._submitted += 1
+        return self._queue.qsize()
+    
+    async def _worker_loop(self, index: int):
+        """Take fetched downloads off the queue and convert them one at a time."""
+        while self._running:
+            task = await self._queue.get()
+            self._active_jobs.add(task.job.id)
+            started = time.perf_counter()
+            try:
+                await self.handler(task)
+                if task.job.status == JobStatus.FAILED:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failed += 1
+                self.logger.error(f"Post-processing worker {index} failed on job {task.job.id}: {e}")
+            finally:
+                self._busy_seconds += time.perf_counter() - started
+                self._active_jobs.discard(task.job.id)
+                self._queue.task_done()
+    
+    @property
+    def queue_depth(self) -> int:
+        """Number of fetched downloads waiting for a worker."""
+        return self._queue.qsize() if self._queue else 0
+    
+    @property
+    def active_workers(self) -> int:
+        """Number of workers currently converting."""
+        return len(self._active_jobs)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get post-processing pool statistics."""
+        return {
+            "running": self._running,
+            "worker_count": self.worker_count,
+            "active_workers": self.active_workers,
+            "idle_workers": self.worker_count - self.active_workers,
+            "queue_depth": self.queue_depth,
+            "nice": self.nice,
+            "cpus": sorted(self.cpus) if self.cpus else None,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "dropped": self._dropped,
+            "busy_seconds": round(self._busy_seconds, 2)
+        }
@@ -0,0 +1,372 @@
+"""
+ProgressBus for pushing job progress to live subscribers.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+
+from ..models.download_job import DownloadJob, add_job_listener
+
+
+def progress_payload(job: DownloadJob) -> Dict[str, Any]:
+    """Build the progress event body for a job."""
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "downloaded_bytes": job.downloaded_bytes,
+        "total_bytes": job.total_bytes,
+        "speed": job.speed,
+        "eta": job.eta
+    }
+
+
+class ProgressEvent:
+    """A single progress update for a job."""
+    
+    __slots__ = ("id", "job_id", "data", "final")
+    
+    def __init__(self, id: int, job_id: str, data: Dict[str, Any], final: bool):
+        self.id = id
+        self.job_id = job_id
+        self.data = data
+        self.final = final
+
+
+class _Topic:
+    """Per-job event buffer and the subscribers waiting on it."""
+    
+    __slots__ = ("events", "waiters", "wake_scheduled", "subscribers", "channels")
+    
+    def __init__(self, buffer_size: int):
+        self.events: Deque[ProgressEvent] = deque(maxlen=buffer_size)
+        self.waiters: Set[asyncio.Future] = set()
+        self.wake_scheduled = False
+        self.subscribers = 0
+        self.channels: Set["ProgressChannel"] = set()
+
+
+class ProgressBus:
+    """In-process publish/subscribe bus for job progress.
+    
+    Subscribers park on a future and cost nothing until their job
+    publishes. Publishes within one event loop iteration are coalesced
+    into a single wake-up, and slow subscribers skip straight to the
+    newest event. The last few events per job are kept in a ring buffer
+    so a reconnecting client can resume from its Last-Event-ID.
+    """
+    
+    def __init__(
+        self,
+        buffer_size: int = 16,
+        heartbeat_interval: float = 15.0,
+        channel_tick: Optional[float] = None,
+        channel_max_jobs: Optional[int] = None
+    ):
+        """Initialize ProgressBus."""
+        self.buffer_size = buffer_size
+        self.heartbeat_interval = heartbeat_interval
+        self.channel_tick = channel_tick or float(os.getenv("PROGRESS_CHANNEL_TICK", "0.25"))
+        self.channel_max_jobs = channel_max_jobs or int(os.getenv("PROGRESS_CHANNEL_MAX_JOBS", "1000"))
+        self.logger = logging.getLogger(__name__)
+        self._topics: Dict[str, _Topic] = {}
+        self._subscribers = 0
+        self._channels: Set["ProgressChannel"] = set()
+        self._event_ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+    
+    def publish_job(self, job: DownloadJob) -> None:
+        """Publish the current state of a job (used as a job listener)."""
+        self.publish(job.id, progress_payload(job), final=job.is_finished())
+    
+    def publish(self, job_id: str, data: Dict[str, Any], final: bool = False) -> None:
+        """Publish an event for a job, from any thread."""
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            self._loop.call_soon_threadsafe(self._publish, job_id, data, final)
+        else:
+            self._publish(job_id, data, final)
+    
+    def _publish(self, job_id: str, data: Dict[str, Any], final: bool) -> None:
+        topic = self._topics.get(job_id)
+        if topic is None:
+            if final:
+                # Nobody is watching a finished job; don't retain a topic for it
+                return
+            topic = self._topics[job_id] = _Topic(self.buffer_size)
+        
+        if topic.events and topic.events[-1].data == data:
+            return
+        
+        event = ProgressEvent(next(self._event_ids), job_id, data, final)
+        topic.events.append(event)
+        
+        if topic.waiters and not topic.wake_scheduled:
+            topic.wake_scheduled = True
+            self._loop.call_soon(self._wake, job_id, topic)
+        
+        for channel in list(topic.channels):
+            channel.offer(event)
+        
+        if final and not topic.subscribers and not topic.waiters and self._topics.get(job_id) is topic:
+            del self._topics[job_id]
+    
+    def _wake(self, job_id: str, topic: _Topic) -> None:
+        """Resolve every waiter on a topic."""
+        topic.wake_scheduled = False
+        waiters, topic.waiters = topic.waiters, set()
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+    
+    def latest_event_id(self, job_id: str) -> int:
+        """Get the ID of the newest buffered event for a job, or 0."""
+        topic = self._topics.get(job_id)
+        if topic is None or not topic.events:
+            return 0
+        return topic.events[-1].id
+    
+    def can_resume(self, job_id: str, last_event_id: int) -> bool:
+        """Check if events after last_event_id are still buffered."""
+        topic = self._topics.get(job_id)
+        if topic is None or not topic.events:
+            return False
+        return topic.events[0].id <= last_event_id + 1
+    
+    async def subscribe(
+        self,
+        job_id: str,
+        last_event_id: int = 0,
+        refresh: Optional[Callable[[], Optional[DownloadJob]]] = None
+    ) -> AsyncIterator[Optional[ProgressEvent]]:
+        """Yield events for a job newer than last_event_id.
+        
+        Buffered events are replayed first; after that only the newest
+        event is yielded on each wake-up. ``None`` is yielded as a
+        heartbeat when nothing was published for heartbeat_interval.
+        Iteration ends after a final event.
+        
+        A finished job publishes nothing more, so a final event sent
+        before the subscription started would be missed. ``refresh`` is
+        called once the subscription is registered to look the job up
+        again; if it has finished (or is gone) in the meantime, its
+        final state is yielded and iteration ends.
+        """
+        self._bind_loop()
+        loop = asyncio.get_running_loop()
+        topic = self._topics.get(job_id)
+        if topic is None:
+            topic = self._topics[job_id] = _Topic(self.buffer_size)
+        topic.subscribers += 1
+        self._subscribers += 1
+        
+        try:
+            if refresh is not None and not any(event.id > last_event_id for event in topic.events):
+                job = refresh()
+                if job is None:
+                    return
+                if job.is_finished():
+                    yield ProgressEvent(next(self._event_ids), job_id, progress_payload(job), True)
+                    return
+            
+            # Replay anything buffered since the client's last event
+            for event in list(topic.events):
+                if event.id > last_event_id:
+                    last_event_id = event.id
+                    yield event
+                    if event.final:
+                        return
+            
+            while True:
+                # Catch up on anything published while the consumer was busy
+                event = topic.events[-1] if topic.events else None
+                if event is not None and event.id > last_event_id:
+                    last_event_id = event.id
+                    yield event
+                    if event.final:
+                        return
+                    continue
+                
+                waiter = loop.create_future()
+                topic.waiters.add(waiter)
+                try:
+                    await asyncio.wait_for(waiter, self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield None
+                finally:
+                    topic.waiters.discard(waiter)
+        finally:
+            self._release(job_id, topic)
+    
+    def attach(self, job_id: str, channel: "ProgressChannel") -> None:
+        """Deliver every future event for a job to a channel."""
+        self._bind_loop()
+        topic = self._topics.get(job_id)
+        if topic is None:
+            topic = self._topics[job_id] = _Topic(self.buffer_size)
+        if channel not in topic.channels:
+            topic.channels.add(channel)
+            topic.subscribers += 1
+            self._subscribers += 1
+    
+    def detach(self, job_id: str, channel: "ProgressChannel") -> None:
+        """Stop delivering a job's events to a channel."""
+        topic = self._topics.get(job_id)
+        if topic is not None and channel in topic.channels:
+            topic.channels.discard(channel)
+            self._release(job_id, topic)
+    
+    def open_channel(self) -> "ProgressChannel":
+        """Open a channel that batches progress for many jobs."""
+        channel = ProgressChannel(self, tick=self.channel_tick, max_jobs=self.channel_max_jobs)
+        self._channels.add(channel)
+        return channel
+    
+    def close_channel(self, channel: "ProgressChannel") -> None:
+        """Close a channel and detach it from its jobs."""
+        channel.close()
+        self._channels.discard(channel)
+    
+    def _release(self, job_id: str, topic: _Topic) -> None:
+        """Drop one subscription, and the topic once nobody needs it."""
+        topic.subscribers -= 1
+        self._subscribers -= 1
+        if not topic.subscribers and self._topics.get(job_id) is topic:
+            if not topic.events or topic.events[-1].final:
+                del self._topics[job_id]
+    
+    def discard(self, job_id: str) -> None:
+        """Forget a job's buffered events."""
+        topic = self._topics.get(job_id)
+        if topic is not None and not topic.subscribers:
+            del self._topics[job_id]
+    
+    @property
+    def subscriber_count(self) -> int:
+        """Number of active subscriptions across all jobs."""
+        return self._subscribers
+    
+    @property
+    def channel_count(self) -> int:
+        """Number of open multiplexed channels."""
+        return len(self._channels)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bus statistics."""
+        return {
+            "topics": len(self._topics),
+            "subscribers": self.subscriber_count,
+            "channels": len(self._channels),
+            "buffer_size": self.buffer_size,
+            "heartbeat_interval": self.heartbeat_interval,
+            "channel_tick": self.channel_tick
+        }
+    
+    def _bind_loop(self) -> None:
+        """Remember the event loop so other threads can publish safely."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._loop_thread = threading.get_ident()
+
+
+class ProgressChannel:
+    """Progress for many jobs, delivered to one client in periodic batches.
+    
+    Events offered by the bus are coalesced per job, so a frame carries
+    at most one update per job however often it changed during a tick.
+    A job is dropped from the channel after its final update is queued.
+    """
+    
+    def __init__(self, bus: ProgressBus, tick: float = 0.25, max_jobs: int = 1000):
+        """Initialize ProgressChannel."""
+        self.bus = bus
+        self.tick = tick
+        self.max_jobs = max_jobs
+        self.jobs: Set[str] = set()
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._errors: List[Dict[str, Any]] = []
+        self._ready = asyncio.Event()
+        self._closed = False
+    
+    def subscribe(self, job: DownloadJob) -> None:
+        """Start following a job; its current state goes out in the next frame."""
+        if job.id in self.jobs:
+            return
+        if len(self.jobs) >= self.max_jobs:
+            self.reject(job.id, f"Subscription limit of {self.max_jobs} jobs reached")
+            return
+        
+        self._queue(job.id, progress_payload(job))
+        if not job.is_finished():
+            self.jobs.add(job.id)
+            self.bus.attach(job.id, self)
+    
+    def unsubscribe(self, job_id: str) -> None:
+        """Stop following a job and drop any update not yet sent."""
+        if job_id in self.jobs:
+            self.jobs.discard(job_id)
+            self.bus.detach(job_id, self)
+        self._pending.pop(job_id, None)
+    
+    def reject(self, job_id: Optional[str], detail: str) -> None:
+        """Report a failed request to the client in the next frame."""
+        self._errors.append({"job_id": job_id, "detail": detail})
+        self._ready.set()
+    
+    def offer(self, event: ProgressEvent) -> None:
+        """Take an event from the bus (called for every attached job)."""
+        self._queue(event.job_id, event.data)
+        if event.final:
+            self.jobs.discard(event.job_id)
+            self.bus.detach(event.job_id, self)
+    
+    def _queue(self, job_id: str, data: Dict[str, Any]) -> None:
+        self._pending[job_id] = data
+        self._ready.set()
+    
+    async def frames(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a frame of coalesced updates at most once per tick."""
+        loop = asyncio.get_running_loop()
+        sent_at = -self.tick
+        
+        while not self._closed:
+            await self._ready.wait()
+            
+            # Let updates accumulate until a tick has passed since the last frame
+            delay = sent_at + self.tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            self._ready.clear()
+            pending, self._pending = self._pending, {}
+            errors, self._errors = self._errors, []
+            if not pending and not errors:
+                continue
+            
+            frame: Dict[str, Any] = {"events": list(pending.values())}
+            if errors:
+                frame["errors"] = errors
+            sent_at = loop.time()
+            yield frame
+    
+    def close(self) -> None:
+        """Detach from every job."""
+        if self._closed:
+            return
+        self._closed = True
+        for job_id in list(self.jobs):
+            self.bus.detach(job_id, self)
+        self.jobs.clear()
+        self._pending.clear()
+        self._ready.set()
+
+
+# Global progress bus, fed by every DownloadJob state change
+progress_bus = ProgressBus()
+add_job_listener(progress_bus.publish_job)
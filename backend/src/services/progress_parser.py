@@ -0,0 +1,85 @@
+"""
+Parser for yt-dlp machine-readable progress lines.
+"""
+
+import re
+from typing import Optional
+
+
+# Marker that prefixes every line rendered from PROGRESS_TEMPLATE
+PROGRESS_MARKER = "[progress]"
+
+# Passed to yt-dlp as --progress-template so that, together with
+# --newline, each progress tick is one space-separated line on stdout.
+# Unknown values are rendered as "NA".
+PROGRESS_TEMPLATE = (
+    "download:" + PROGRESS_MARKER +
+    " %(progress.downloaded_bytes)s"
+    " %(progress.total_bytes)s"
+    " %(progress.total_bytes_estimate)s"
+    " %(progress.speed)s"
+    " %(progress.eta)s"
+)
+
+# Fallback for yt-dlp's human-readable "[download]  42.0% of ..." lines
+_PERCENT_PATTERN = re.compile(r"^\[download\]\s+(\d+(?:\.\d+)?)%")
+
+
+class ProgressUpdate:
+    """A single progress tick reported by yt-dlp."""
+    
+    __slots__ = ("percent", "downloaded_bytes", "total_bytes", "speed", "eta")
+    
+    def __init__(
+        self,
+        percent: Optional[int] = None,
+        downloaded_bytes: Optional[int] = None,
+        total_bytes: Optional[int] = None,
+        speed: Optional[float] = None,
+        eta: Optional[int] = None
+    ):
+        self.percent = percent
+        self.downloaded_bytes = downloaded_bytes
+        self.total_bytes = total_bytes
+        self.speed = speed
+        self.eta = eta
+
+
+def _number(value: str) -> Optional[float]:
+    """Parse a template field, returning None for "NA" and garbage."""
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_progress_line(line: str) -> Optional[ProgressUpdate]:
+    """Parse one line of yt-dlp output into a ProgressUpdate.
+    
+    Returns None for lines that carry no progress information.
+    """
+    if line.startswith(PROGRESS_MARKER):
+        fields = line[len(PROGRESS_MARKER):].split()
+        if len(fields) != 5:
+            return None
+        
+        downloaded, total, estimate, speed, eta = (_number(field) for field in fields)
+        total = total or estimate
+        
+        percent = None
+        if downloaded is not None and total:
+            percent = min(100, int(downloaded * 100 / total))
+        
+        return ProgressUpdate(
+            percent=percent,
+            downloaded_bytes=int(downloaded) if downloaded is not None else None,
+            total_bytes=int(total) if total else None,
+            speed=speed,
+            eta=int(eta) if eta is not None else None
+        )
+    
+    match = _PERCENT_PATTERN.match(line)
+    if match:
+        return ProgressUpdate(percent=min(100, int(float(match.group(1)))))
+    
+    return None
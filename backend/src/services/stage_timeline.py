@@ -0,0 +1,93 @@
+"""
+StageTimeline for per-stage download latency statistics.
+"""
+
+import os
+import re
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from ..models.download_job import DownloadJob, JobStage, JobStatus
+from .metrics import stage_duration
+from .progress_parser import PROGRESS_MARKER
+
+# Prefixes of the lines yt-dlp's ffmpeg post-processors print as they start
+_POSTPROCESS_PATTERN = re.compile(
+    r"^\[(?:ExtractAudio|Merger|VideoConvertor|VideoRemuxer|Fixup\w+|Embed\w+|"
+    r"ThumbnailsConvertor|SubtitlesConvertor|Metadata|ModifyChapters|SplitChapters|"
+    r"SponsorBlock|ffmpeg)\]"
+)
+
+# Percentiles reported for every stage
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_stage_line(line: str) -> Optional[JobStage]:
+    """Get the stage a line of yt-dlp output shows the download has reached.
+    
+    Returns None for lines that carry no stage information, such as the
+    extractor's own messages while metadata is being fetched.
+    """
+    if line.startswith(PROGRESS_MARKER) or line.startswith("[download]"):
+        return JobStage.DOWNLOAD
+    if line.startswith("[") and _POSTPROCESS_PATTERN.match(line):
+        return JobStage.POSTPROCESS
+    return None
+
+
+def _percentile(ordered: list, percent: int) -> float:
+    """Nearest-rank percentile of a sorted, non-empty list."""
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[rank - 1]
+
+
+class StageTimeline:
+    """Rolling per-stage duration samples from recently completed jobs.
+    
+    Each completed job contributes the time it spent in every stage it
+    passed through. Only the last ``window`` jobs are kept, so the
+    percentiles follow the current workload.
+    """
+    
+    def __init__(self, window: Optional[int] = None):
+        """Initialize StageTimeline."""
+        self.window = window or int(os.getenv("STAGE_TIMELINE_WINDOW", "1000"))
+        self._samples: Dict[str, Deque[float]] = {
+            stage.value: deque(maxlen=self.window)
+            for stage in JobStage if stage != JobStage.DONE
+        }
+        self.jobs_recorded = 0
+    
+    def record(self, job: DownloadJob) -> None:
+        """Add a completed job's stage durations to the samples."""
+        if job.status != JobStatus.COMPLETED:
+            return
+        
+        for entry in job.get_timeline():
+            self._samples[entry["stage"]].append(entry["duration_seconds"])
+            stage_duration.labels(stage=entry["stage"]).observe(entry["duration_seconds"])
+        self.jobs_recorded += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get duration percentiles per stage and the stage that dominates p95."""
+        stages = {}
+        for stage, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            stats = {"count": len(ordered)}
+            for percent in PERCENTILES:
+                stats[f"p{percent}"] = _percentile(ordered, percent)
+            stats["max"] = ordered[-1]
+            stages[stage] = stats
+        
+        return {
+            "window": self.window,
+            "jobs_recorded": self.jobs_recorded,
+            "stages": stages,
+            "dominant_stage": max(stages, key=lambda stage: stages[stage]["p95"]) if stages else None
+        }
+
+
+# Shared stage statistics for every download
+stage_timeline = StageTimeline()
@@ -0,0 +1,265 @@
+"""
+StorageGovernor for disk-space admission control and artifact eviction.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..models.download_job import DownloadJob, JobStatus, add_job_listener
+from ..models.download_request import DownloadFormat, DownloadRequest
+from ..storage.job_storage import get_job, save_job
+from .disk_sweeper import DiskSweeper, disk_sweeper as shared_disk_sweeper
+from .download_scheduler import SchedulerFullError
+from .file_service import FileService, get_file_service
+from .format_planner import FormatPlanner, format_planner as shared_format_planner
+from .metadata_cache import MetadataCache, metadata_cache as shared_metadata_cache
+from .postprocess_planner import PostprocessPlanner, postprocess_planner as shared_postprocess_planner
+
+# Bytes per second of output, for estimates made from duration alone
+_BYTE_RATES = {
+    DownloadFormat.VIDEO: 1_500_000 // 8,
+    DownloadFormat.AUDIO_MP3: 192_000 // 8,
+    DownloadFormat.AUDIO_WAV: 44_100 * 2 * 2,
+}
+
+# Assumed size of a metadata-only download
+_METADATA_ESTIMATE = 1024 * 1024
+
+# Seconds a disk usage reading is reused
+_USAGE_TTL = 1.0
+
+
+class StorageFullError(SchedulerFullError):
+    """Raised when a download would not fit on disk even after eviction."""
+
+
+class StorageGovernor:
+    """Admission control and LRU eviction driven by disk watermarks.
+    
+    A new download is admitted only if disk usage, plus space reserved
+    for downloads already running, plus its estimated size stays under
+    the high watermark, either now or once evictable artifacts are
+    removed. Crossing the high watermark evicts completed artifacts in
+    least-recently-downloaded order until usage falls to the low
+    watermark. Evictable space comes from the disk sweeper's accounting,
+    so a shared artifact hard-linked into several job directories only
+    counts once all of them can be evicted.
+    
+    When several worker processes share the downloads directory, only
+    the elected leader evicts (``evicts``); it calls ``check`` now and
+    then, since the others' downloads fill the disk too.
+    """
+    
+    def __init__(
+        self,
+        file_service: Optional[FileService] = None,
+        high_watermark: Optional[float] = None,
+        low_watermark: Optional[float] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        disk_sweeper: Optional[DiskSweeper] = None,
+        format_planner: Optional[FormatPlanner] = None,
+        postprocess_planner: Optional[PostprocessPlanner] = None
+    ):
+        """Initialize StorageGovernor."""
+        self._file_service = file_service
+        self.high_watermark = high_watermark or float(os.getenv("STORAGE_HIGH_WATERMARK", "0.90"))
+        self.low_watermark = low_watermark or float(os.getenv("STORAGE_LOW_WATERMARK", "0.80"))
+        if not 0 < self.low_watermark < self.high_watermark <= 1:
+            raise ValueError("Storage watermarks must satisfy 0 < low < high <= 1")
+        
+        self.metadata_cache = metadata_cache or shared_metadata_cache
+        self.disk_sweeper = disk_sweeper or shared_disk_sweeper
+        self.format_planner = format_planner or shared_format_planner
+        self.postprocess_planner = postprocess_planner or shared_postprocess_planner
+        self.logger = logging.getLogger(__name__)
+        
+        # Completed jobs, least recently downloaded first
+        self._artifacts: "OrderedDict[str, None]" = OrderedDict()
+        self._reservations: Dict[str, int] = {}
+        self._usage = None
+        self._usage_read_at = 0.0
+        self._eviction_task: Optional[asyncio.Task] = None
+        self.evicts = True
+        
+        # Counters
+        self.admitted = 0
+        self.admitted_after_eviction = 0
+        self.refused = 0
+        self.withdrawn = 0
+        self.unestimated = 0
+        self.eviction_runs = 0
+        self.evicted = 0
+        self.bytes_evicted = 0
+        
+        add_job_listener(self._on_job_changed)
+    
+    @property
+    def file_service(self) -> FileService:
+        # Built on first use rather than when the API modules are imported
+        if self._file_service is None:
+            self._file_service = get_file_service()
+        return self._file_service
+    
+    def estimate_size(self, request: DownloadRequest) -> Optional[int]:
+        """Estimate a download's size from cached metadata, if available."""
+        if request.format == DownloadFormat.METADATA:
+            return _METADATA_ESTIMATE
+        
+        metadata = self.metadata_cache.peek(request.url)
+        if metadata is None:
+            return None
+        
+        if request.format == DownloadFormat.VIDEO:
+            planned = self.format_planner.estimate_size(request, metadata)
+            if planned or metadata.filesize:
+                return planned or metadata.filesize
+        else:
+            planned = self.postprocess_planner.estimate_size(request, metadata)
+            if planned:
+                return planned
+        return int(metadata.duration * _BYTE_RATES[request.format])
+    
+    def admit(self, request: DownloadRequest, job: DownloadJob) -> None:
+        """Reserve space for a download, raising StorageFullError if it can't fit."""
+        estimate = self.estimate_size(request)
+        if estimate is None:
+            self.unestimated += 1
+            estimate = 0
+        
+        total, used = self._disk_usage()
+        high_limit = total * self.high_watermark
+        projected = used + sum(self._reservations.values()) + estimate
+        
+        if projected > high_limit:
+            evictable = self.disk_sweeper.get_freeable_bytes(self._artifacts)
+            if projected - evictable > high_limit:
+                self.refused += 1
+                raise StorageFullError(
+                    "Not enough disk space for this download, try again later"
+                )
+            self.admitted_after_eviction += 1
+        
+        self._reservations[job.id] = estimate
+        self.admitted += 1
+        
+        # Keep headroom for the next burst, not just this download
+        if projected > high_limit or used > high_limit:
+            self._start_eviction()
+    
+    def release(self, job: DownloadJob) -> None:
+        """Drop a job's space reservation, e.g. after it was rejected."""
+        if self._reservations.pop(job.id, None) is not None:
+            self.withdrawn += 1
+    
+    def track(self, job: DownloadJob) -> None:
+        """Make a completed job's files eligible for eviction."""
+        if job.id in self._artifacts:
+            return
+        
+        self._artifacts[job.id] = None
+        if self.disk_sweeper.get_directory_size(job.id) is None:
+            # Files linked in from a shared artifact are measured nowhere else
+            try:
+                asyncio.get_running_loop().run_in_executor(None, self.disk_sweeper.refresh, job.id)
+            except RuntimeError:
+                self.disk_sweeper.refresh(job.id)
+    
+    def touch(self, job: DownloadJob) -> None:
+        """Record that a job's files were downloaded by a client."""
+        if job.id in self._artifacts:
+            self._artifacts.move_to_end(job.id)
+    
+    def check(self) -> None:
+        """Start evicting if disk usage is over the high watermark."""
+        total, used = self._disk_usage()
+        if used + sum(self._reservations.values()) > total * self.high_watermark:
+            self._start_eviction()
+    
+    async def stop(self):
+        """Wait for a running eviction to finish."""
+        if self._eviction_task is not None:
+            await asyncio.gather(self._eviction_task, return_exceptions=True)
+    
+    def _on_job_changed(self, job: DownloadJob) -> None:
+        """Release reservations and track artifacts as jobs finish."""
+        if not job.is_finished():
+            return
+        
+        self._reservations.pop(job.id, None)
+        if job.status == JobStatus.COMPLETED:
+            self.track(job)
+        else:
+            self._artifacts.pop(job.id, None)
+    
+    def _disk_usage(self):
+        """Get (total, used) bytes of the downloads filesystem."""
+        now = time.monotonic()
+        if self._usage is None or now - self._usage_read_at > _USAGE_TTL:
+            usage = shutil.disk_usage(self.file_service.base_dir)
+            self._usage = (usage.total, usage.used)
+            self._usage_read_at = now
+        return self._usage
+    
+    def _start_eviction(self) -> None:
+        if not self.evicts:
+            return
+        if self._eviction_task is None or self._eviction_task.done():
+            self._eviction_task = asyncio.create_task(self._evict())
+    
+    async def _evict(self) -> None:
+        """Evict least recently downloaded artifacts down to the low watermark."""
+        self.eviction_runs += 1
+        usage = await asyncio.to_thread(shutil.disk_usage, self.file_service.base_dir)
+        to_free = usage.used + sum(self._reservations.values()) - usage.total * self.low_watermark
+        freed = 0
+        
+        while freed < to_free and self._artifacts:
+            job_id, _ = self._artifacts.popitem(last=False)
+            job = get_job(job_id)
+            if job is None or job.status != JobStatus.COMPLETED:
+                continue
+            
+            # Files still linked from other jobs' directories stay on disk
+            size = self.disk_sweeper.get_directory_size(job_id) or 0
+            job_dir = self.file_service.base_dir / job_id
+            if not await asyncio.to_thread(self.file_service.delete_directory, str(job_dir)):
+                continue
+            await asyncio.to_thread(self.disk_sweeper.refresh, job_id)
+            
+            job.mark_expired()
+            save_job(job)
+            freed += size
+            self.evicted += 1
+            self.bytes_evicted += size
+        
+        # Re-read usage on the next admission
+        self._usage = None
+        if freed:
+            self.logger.info(f"Evicted {freed} bytes of completed downloads to free disk space")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get disk usage and governor decision counters."""
+        total, used = self._disk_usage()
+        return {
+            "total_bytes": total,
+            "used_bytes": used,
+            "used_ratio": used / total if total else 0.0,
+            "high_watermark": self.high_watermark,
+            "low_watermark": self.low_watermark,
+            "reserved_bytes": sum(self._reservations.values()),
+            "evictable_artifacts": len(self._artifacts),
+            "evictable_bytes": self.disk_sweeper.get_freeable_bytes(self._artifacts),
+            "admitted": self.admitted,
+            "admitted_after_eviction": self.admitted_after_eviction,
+            "refused": self.refused,
+            "withdrawn": self.withdrawn,
+            "unestimated": self.unestimated,
+            "eviction_runs": self.eviction_runs,
+            "evicted": self.evicted,
+            "bytes_evicted": self.bytes_evicted
+        }
@@ -0,0 +1,424 @@
+"""
+Engines that execute yt-dlp commands for YtDlpService.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shlex
+import sys
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Upper bound on a single line of yt-dlp output
+STREAM_LINE_LIMIT = 1024 * 1024
+
+# Worker messages carry whole info dicts, which can be large
+WORKER_MESSAGE_LIMIT = 64 * 1024 * 1024
+
+# Directory containing the ``src`` package, used to launch pool workers
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+async def read_lines(stream: asyncio.StreamReader, handle_line: Callable[[str], None]):
+    """Feed each line of a subprocess stream to handle_line until EOF."""
+    while True:
+        try:
+            raw = await stream.readline()
+        except ValueError:
+            # Line longer than the stream limit; skip the oversized chunk
+            continue
+        if not raw:
+            break
+        
+        line = raw.decode(errors="replace").strip()
+        if line:
+            handle_line(line)
+
+
+class YtDlpEngine:
+    """Runs yt-dlp on behalf of YtDlpService.
+    
+    Commands are yt-dlp command lines whose first element is the program
+    name; each engine decides how that program is actually invoked.
+    Output is reported line by line in yt-dlp's screen format.
+    """
+    
+    async def start(self):
+        """Prepare the engine for use."""
+    
+    async def stop(self):
+        """Release the engine's resources."""
+    
+    async def extract_info(self, url: str) -> Dict[str, Any]:
+        """Extract the info dict for a URL without downloading."""
+        raise NotImplementedError
+    
+    async def run_download(self, cmd: List[str], cwd: Path, on_line: Callable[[str], None]) -> None:
+        """Run a download command, raising if it fails."""
+        raise NotImplementedError
+    
+    async def expand_playlist(self, url: str, on_entry: Callable[[Dict[str, Any]], None]) -> None:
+        """List a playlist without resolving its entries.
+        
+        Each flat entry is passed to on_entry as soon as yt-dlp discovers
+        it, so callers can act on the first entries while later pages are
+        still being fetched.
+        """
+        raise NotImplementedError
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get engine statistics."""
+        return {"engine": self.name}
+    
+    @property
+    def name(self) -> str:
+        return type(self).__name__
+
+
+class CliEngine(YtDlpEngine):
+    """Runs every command as a fresh yt-dlp subprocess."""
+    
+    def __init__(self, command: Optional[str] = None):
+        """Initialize CliEngine."""
+        self.command = shlex.split(command or os.getenv("YTDLP_COMMAND", "yt-dlp"))
+        self.active_processes = 0
+    
+    @property
+    def name(self) -> str:
+        return "cli"
+    
+    @asynccontextmanager
+    async def _subprocess(self, *args: str, **kwargs):
+        """Run yt-dlp with piped output, counting it while it is active."""
+        process = await asyncio.create_subprocess_exec(
+            *self.command, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            **kwargs
+        )
+        self.active_processes += 1
+        try:
+            yield process
+        finally:
+            self.active_processes -= 1
+    
+    async def extract_info(self, url: str) -> Dict[str, Any]:
+        async with self._subprocess("--dump-json", "--no-download", url) as process:
+            stdout, stderr = await process.communicate()
+        
+        if process.returncode != 0:
+            raise Exception(f"yt-dlp failed: {stderr.decode()}")
+        
+        return json.loads(stdout.decode())
+    
+    async def run_download(self, cmd: List[str], cwd: Path, on_line: Callable[[str], None]) -> None:
+        # Keep the tail of stderr for error reporting
+        stderr_tail = deque(maxlen=20)
+        
+        async with self._subprocess(*cmd[1:], cwd=cwd, limit=STREAM_LINE_LIMIT) as process:
+            # Drain both pipes concurrently so neither can fill up and stall yt-dlp
+            try:
+                await asyncio.gather(
+                    read_lines(process.stdout, on_line),
+                    read_lines(process.stderr, stderr_tail.append)
+                )
+                await process.wait()
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+        
+        if process.returncode != 0:
+            error_output = "\n".join(stderr_tail)
+            raise Exception(f"Download failed: {error_output}")
+    
+    async def expand_playlist(self, url: str, on_entry: Callable[[Dict[str, Any]], None]) -> None:
+        def handle_line(line: str):
+            # --dump-json with --flat-playlist prints one entry per line
+            if line.startswith("{"):
+                on_entry(json.loads(line))
+        
+        stderr_tail = deque(maxlen=20)
+        args = ("--flat-playlist", "--lazy-playlist", "--dump-json", url)
+        async with self._subprocess(*args, limit=STREAM_LINE_LIMIT) as process:
+            try:
+                await asyncio.gather(
+                    read_lines(process.stdout, handle_line),
+                    read_lines(process.stderr, stderr_tail.append)
+                )
+                await process.wait()
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+        
+        if process.returncode != 0:
+            error_output = "\n".join(stderr_tail)
+            raise Exception(f"Playlist expansion failed: {error_output}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "engine": self.name,
+            "active_processes": self.active_processes
+        }
+
+
+class _PoolWorker:
+    """A warm worker process and its pipe."""
+    
+    __slots__ = ("process", "jobs_run")
+    
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.jobs_run = 0
+    
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+    
+    async def send(self, message: Dict[str, Any]) -> None:
+        self.process.stdin.write((json.dumps(message) + "\n").encode())
+        await self.process.stdin.drain()
+    
+    async def receive(self) -> Dict[str, Any]:
+        raw = await self.process.stdout.readline()
+        if not raw:
+            raise Exception("yt-dlp worker exited unexpectedly")
+        return json.loads(raw)
+    
+    async def kill(self) -> None:
+        if self.alive:
+            self.process.kill()
+        await self.process.wait()
+
+
+class PooledEngine(YtDlpEngine):
+    """Dispatches commands to a pool of worker processes with yt_dlp imported.
+    
+    Each worker pays the interpreter start-up and extractor import cost
+    once and then serves jobs sent over its stdin, streaming output lines
+    and the final result back over its stdout. Workers are recycled after
+    ``max_jobs_per_worker`` jobs and replaced if they crash.
+    
+    ``size`` workers serve downloads. Another ``reserved`` workers only
+    serve metadata extraction and playlist expansion, so those stay
+    quick while every download worker is busy; they also use a download
+    worker when one is idle.
+    """
+    
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_jobs_per_worker: Optional[int] = None,
+        reserved: Optional[int] = None
+    ):
+        """Initialize PooledEngine."""
+        self.size = size or int(os.getenv("YTDLP_POOL_SIZE", os.getenv("MAX_CONCURRENT_DOWNLOADS", "5")))
+        self.max_jobs_per_worker = max_jobs_per_worker or int(os.getenv("YTDLP_POOL_MAX_JOBS", "100"))
+        self.reserved = reserved if reserved is not None else int(os.getenv("YTDLP_POOL_RESERVED", "1"))
+        self.logger = logging.getLogger(__name__)
+        self._idle: Optional[asyncio.Queue] = None
+        self._reserved: Optional[asyncio.Queue] = None
+        self._workers: List[_PoolWorker] = []
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._jobs_dispatched = 0
+        self._workers_spawned = 0
+    
+    @property
+    def name(self) -> str:
+        return "pool"
+    
+    async def start(self):
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            
+            idle = asyncio.Queue()
+            reserved = asyncio.Queue()
+            workers = await asyncio.gather(*(self._spawn() for _ in range(self.size + self.reserved)))
+            for index, worker in enumerate(workers):
+                (idle if index < self.size else reserved).put_nowait(worker)
+            self._reserved = reserved
+            self._idle = idle
+            self.logger.info(
+                f"Started {self.size} yt-dlp pool workers and {self.reserved} reserved for metadata"
+            )
+    
+    async def stop(self):
+        workers, self._workers = self._workers, []
+        self._idle = None
+        self._reserved = None
+        for worker in workers:
+            if worker.alive:
+                worker.process.stdin.close()
+        await asyncio.gather(*(worker.kill() for worker in workers), return_exceptions=True)
+    
+    async def extract_info(self, url: str) -> Dict[str, Any]:
+        result = await self._dispatch({"op": "extract_info", "url": url}, None, light=True)
+        return result["info"]
+    
+    async def run_download(self, cmd: List[str], cwd: Path, on_line: Callable[[str], None]) -> None:
+        await self._dispatch(
+            {"op": "download", "args": cmd[1:], "cwd": str(Path(cwd).resolve())},
+            on_line
+        )
+    
+    async def expand_playlist(self, url: str, on_entry: Callable[[Dict[str, Any]], None]) -> None:
+        await self._dispatch({"op": "expand_playlist", "url": url}, None, on_entry, light=True)
+    
+    async def _dispatch(
+        self,
+        message: Dict[str, Any],
+        on_line: Optional[Callable[[str], None]],
+        on_entry: Optional[Callable[[Dict[str, Any]], None]] = None,
+        light: bool = False
+    ) -> Dict[str, Any]:
+        """Run one request on an idle worker and return its result message."""
+        if self._idle is None:
+            await self.start()
+        
+        worker, idle = await self._acquire(light)
+        healthy = False
+        try:
+            if not worker.alive:
+                worker = await self._replace(worker)
+            
+            self._jobs_dispatched += 1
+            worker.jobs_run += 1
+            await worker.send(message)
+            
+            while True:
+                reply = await worker.receive()
+                if reply["type"] == "line":
+                    if on_line:
+                        on_line(reply["line"])
+                    continue
+                if reply["type"] == "entry":
+                    if on_entry:
+                        on_entry(reply["entry"])
+                    continue
+                
+                healthy = True
+                if not reply.get("ok"):
+                    raise Exception(reply.get("error") or "yt-dlp worker failed")
+                return reply
+        finally:
+            # A worker interrupted mid-job may still be writing; never reuse it
+            if not healthy or worker.jobs_run >= self.max_jobs_per_worker:
+                asyncio.ensure_future(self._recycle(worker, idle))
+            elif self._is_current(idle):
+                idle.put_nowait(worker)
+            else:
+                # The pool was stopped while this job ran
+                asyncio.ensure_future(worker.kill())
+    
+    async def _acquire(self, light: bool) -> Tuple[_PoolWorker, asyncio.Queue]:
+        """Take an idle worker and the queue it goes back to.
+        
+        Light requests (metadata, playlists) take a reserved worker or an
+        idle download worker, whichever is free first; downloads only
+        take download workers.
+        """
+        if not light or not self.reserved:
+            return await self._idle.get(), self._idle
+        
+        for queue in (self._reserved, self._idle):
+            if not queue.empty():
+                return queue.get_nowait(), queue
+        reserved = self._reserved
+        return await reserved.get(), reserved
+    
+    def _is_current(self, queue: asyncio.Queue) -> bool:
+        """Check if a queue belongs to the running pool, not a stopped one."""
+        return queue is self._idle or queue is self._reserved
+    
+    async def _spawn(self) -> _PoolWorker:
+        """Start a worker process and wait until yt_dlp is imported."""
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "src.services.ytdlp_worker",
+            cwd=BACKEND_DIR,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=WORKER_MESSAGE_LIMIT
+        )
+        worker = _PoolWorker(process)
+        
+        ready = await worker.receive()
+        if ready.get("type") != "ready" or not ready.get("ok"):
+            await worker.kill()
+            raise Exception(f"yt-dlp worker failed to start: {ready.get('error')}")
+        
+        self._workers.append(worker)
+        self._workers_spawned += 1
+        return worker
+    
+    async def _replace(self, worker: _PoolWorker) -> _PoolWorker:
+        """Kill a worker and start a fresh one in its place."""
+        if worker in self._workers:
+            self._workers.remove(worker)
+        await worker.kill()
+        return await self._spawn()
+    
+    async def _recycle(self, worker: _PoolWorker, idle: asyncio.Queue) -> None:
+        """Replace a used-up or broken worker and return the new one to the pool."""
+        if not self._is_current(idle):
+            await worker.kill()
+            return
+        
+        try:
+            replacement = await self._replace(worker)
+        except Exception as e:
+            self.logger.error(f"Failed to respawn yt-dlp worker: {e}")
+            # Hand back the dead worker; _dispatch retries the spawn on next use
+            replacement = worker
+        
+        if self._is_current(idle):
+            idle.put_nowait(replacement)
+        else:
+            await replacement.kill()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        alive = sum(1 for worker in self._workers if worker.alive)
+        return {
+            "engine": self.name,
+            "pool_size": self.size,
+            "reserved_workers": self.reserved,
+            "idle_workers": self._idle.qsize() if self._idle else 0,
+            "idle_reserved_workers": self._reserved.qsize() if self._reserved else 0,
+            "workers_alive": alive,
+            "active_processes": alive,
+            "workers_spawned": self._workers_spawned,
+            "jobs_dispatched": self._jobs_dispatched
+        }
+
+
+def create_engine(name: Optional[str] = None) -> YtDlpEngine:
+    """Create the engine selected by the YTDLP_ENGINE setting."""
+    name = (name or os.getenv("YTDLP_ENGINE", "cli")).lower()
+    
+    if name == "cli":
+        return CliEngine()
+    if name == "pool":
+        return PooledEngine()
+    
+    raise ValueError(f"Unknown yt-dlp engine: {name}")
+
+
+_engine: Optional[YtDlpEngine] = None
+
+
+def get_engine() -> YtDlpEngine:
+    """Get the engine shared by every YtDlpService instance."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine()
+    return _engine
@@ -3,47 +3,63 @@ YtDlpService for handling yt-dlp operations.
 """
 
 import asyncio
-import json
 import os
+import shlex
 import subprocess
-import tempfile
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional, Callable
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Sequence, Tuple
 
 from ..models.download_request import DownloadRequest, DownloadFormat
-from ..models.download_job import DownloadJob, JobStatus
-from ..models.video_metadata import VideoMetadata
-from ..storage.job_storage import get_job, save_job
+from ..models.download_job import DownloadJob, JobStage, JobStatus
+from ..models.video_metadata import FormatInfo, VideoMetadata
+from ..storage.job_storage import save_job
+from .format_planner import FormatPlanner, format_planner as shared_format_planner
+from .metadata_cache import MetadataCache, metadata_cache as shared_metadata_cache
+from .postprocess_planner import PostprocessPlan, PostprocessPlanner, postprocess_planner as shared_postprocess_planner
+from .metrics import downloaded_bytes, metadata_duration
+from .progress_parser import PROGRESS_TEMPLATE, parse_progress_line
+from .stage_timeline import parse_stage_line
+from .ytdlp_engine import YtDlpEngine, get_engine
 
 
 class YtDlpService:
     """Service for handling yt-dlp operations."""
     
-    def __init__(self, temp_dir: Optional[str] = None):
+    def __init__(
+        self,
+        temp_dir: Optional[str] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        engine: Optional[YtDlpEngine] = None,
+        format_planner: Optional[FormatPlanner] = None,
+        postprocess_planner: Optional[PostprocessPlanner] = None
+    ):
         """Initialize YtDlpService."""
         self.temp_dir = temp_dir or "downloads"
         self.download_dir = Path(self.temp_dir)
         self.download_dir.mkdir(exist_ok=True)
+        self.metadata_cache = metadata_cache or shared_metadata_cache
+        self.engine = engine or get_engine()
+        self.format_planner = format_planner or shared_format_planner
+        self.postprocess_planner = postprocess_planner or shared_postprocess_planner
+        self.ffmpeg_command = shlex.split(os.getenv("FFMPEG_COMMAND", "ffmpeg"))
+        
+        # Job ID -> latest reported speed of downloads in progress
+        self._speeds: Dict[str, float] = {}
     
     async def extract_metadata(self, url: str) -> VideoMetadata:
+        """Extract video metadata, reusing cached results for the same video."""
+        return await self.metadata_cache.get_or_load(
+            url, lambda: self._extract_metadata_uncached(url)
+        )
+    
+    async def _extract_metadata_uncached(self, url: str) -> VideoMetadata:
         """Extract video metadata using yt-dlp."""
         try:
             # Run yt-dlp to get metadata
-            cmd = [
-                "yt-dlp",
-                "--dump-json",
-                "--no-download",
-                url
-            ]
-            
-            result = await self._run_command(cmd)
-            
-            if result.returncode != 0:
-                raise Exception(f"yt-dlp failed: {result.stderr.decode()}")
-            
-            # Parse JSON output
-            metadata_json = json.loads(result.stdout.decode())
+            started = time.perf_counter()
+            metadata_json = await self.engine.extract_info(url)
+            metadata_duration.observe(time.perf_counter() - started)
             
             # Extract relevant information
             return VideoMetadata(
@@ -56,12 +72,21 @@ class YtDlpService:
                 view_count=metadata_json.get("view_count", 0),
                 upload_date=metadata_json.get("upload_date", ""),
                 available_formats=self._extract_available_formats(metadata_json),
-                available_subtitles=self._extract_available_subtitles(metadata_json)
+                formats=self._extract_format_index(metadata_json),
+                available_subtitles=self._extract_available_subtitles(metadata_json),
+                filesize=self._estimate_filesize(metadata_json)
             )
             
         except Exception as e:
             raise Exception(f"Failed to extract metadata: {str(e)}")
     
+    async def expand_playlist(self, url: str, on_entry: Callable[[Dict[str, Any]], None]) -> None:
+        """Pass each flat entry of a playlist or channel to on_entry as it is found."""
+        try:
+            await self.engine.expand_playlist(url, on_entry)
+        except Exception as e:
+            raise Exception(f"Failed to expand playlist: {str(e)}")
+    
     async def download_video(
         self, 
         request: DownloadRequest, 
@@ -97,10 +122,121 @@ class YtDlpService:
             save_job(job)  # Save failed job to storage
             raise
     
-    def _build_download_command(self, request: DownloadRequest, job: DownloadJob) -> list:
-        """Build yt-dlp command for download."""
+    async def fetch(
+        self,
+        request: DownloadRequest,
+        job: DownloadJob
+    ) -> Tuple[str, Optional[PostprocessPlan]]:
+        """Download media without running audio conversion.
+        
+        Returns the downloaded file and, for audio that still needs
+        converting, the plan for convert_audio; the job stays PROCESSING
+        until then. Any other download is completed here and returns None.
+        """
+        try:
+            job.update_progress(0, JobStatus.PROCESSING)
+            
+            plan = None
+            if request.format in (DownloadFormat.AUDIO_MP3, DownloadFormat.AUDIO_WAV):
+                plan = self.postprocess_planner.plan(request, self.metadata_cache.peek(request.url))
+                job.cpu_seconds_saved = plan.cpu_seconds_saved
+            cmd = self._build_download_command(request, job, fetch_only=True, plan=plan)
+            
+            job_dir = self.download_dir / job.id
+            job_dir.mkdir(exist_ok=True)
+            file_path = await self._run_download_with_progress(
+                cmd, job_dir, job, finalize=plan is None or plan.action == "copy"
+            )
+            
+            if plan is not None:
+                if plan.action != "copy":
+                    return file_path, plan
+                if not file_path.endswith(f".{plan.audio_format}"):
+                    # The planned MP3 stream was gone and yt-dlp fell back to another
+                    job.cpu_seconds_saved = 0.0
+                    return file_path, PostprocessPlan(plan.audio_format, "unplanned")
+            
+            file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+            job.mark_completed(str(file_path), file_size)
+            save_job(job)
+            return file_path, None
+            
+        except Exception as e:
+            job.mark_failed(str(e))
+            save_job(job)
+            raise
+    
+    async def convert_audio(
+        self,
+        job: DownloadJob,
+        source_path: str,
+        plan: PostprocessPlan,
+        command_prefix: Sequence[str] = ()
+    ) -> str:
+        """Convert a fetched audio download with ffmpeg and complete the job.
+        
+        command_prefix is put in front of the ffmpeg command, e.g. to
+        lower its priority with ``nice``.
+        """
+        source = Path(source_path)
+        target = source.with_suffix(f".{plan.audio_format}")
+        partial = source.with_suffix(f".part.{plan.audio_format}")
+        cmd = [
+            *command_prefix, *self.ffmpeg_command, "-nostdin", "-v", "error", "-y",
+            "-i", str(source), "-vn", *(plan.codec_args() or ["-c:a", "copy"]), str(partial)
+        ]
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                _, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                partial.unlink(missing_ok=True)
+                raise
+            
+            if process.returncode != 0:
+                partial.unlink(missing_ok=True)
+                error_output = "\n".join(stderr.decode(errors="replace").strip().splitlines()[-20:])
+                raise Exception(f"Audio conversion failed: {error_output}")
+            
+            os.replace(partial, target)
+            if source != target:
+                source.unlink(missing_ok=True)
+            
+            job.mark_stage(JobStage.FINALIZE)
+            job.mark_completed(str(target), target.stat().st_size)
+            save_job(job)
+            return str(target)
+            
+        except Exception as e:
+            job.mark_failed(str(e))
+            save_job(job)
+            raise
+    
+    def _build_download_command(
+        self,
+        request: DownloadRequest,
+        job: DownloadJob,
+        fetch_only: bool = False,
+        plan: Optional[PostprocessPlan] = None
+    ) -> list:
+        """Build yt-dlp command for download.
+        
+        With fetch_only, audio is downloaded as is for convert_audio
+        instead of being converted by yt-dlp.
+        """
         cmd = ["yt-dlp"]
         
+        # One machine-readable progress line per tick
+        cmd.extend(["--newline", "--progress", "--progress-template", PROGRESS_TEMPLATE])
+        
         # Set output template
         output_template = f"{job.id}/%(title)s.%(ext)s"
         if request.advanced_options and "output_template" in request.advanced_options:
@@ -110,11 +246,13 @@ class YtDlpService:
         
         # Set format based on request
         if request.format == DownloadFormat.VIDEO:
-            cmd.extend(["-f", "best[height<=720]"])
-        elif request.format == DownloadFormat.AUDIO_MP3:
-            cmd.extend(["-f", "bestaudio", "--extract-audio", "--audio-format", "mp3"])
-        elif request.format == DownloadFormat.AUDIO_WAV:
-            cmd.extend(["-f", "bestaudio", "--extract-audio", "--audio-format", "wav"])
+            format_plan = self.format_planner.plan(request, self.metadata_cache.peek(request.url))
+            cmd.extend(["-f", format_plan.selector])
+        elif request.format in (DownloadFormat.AUDIO_MP3, DownloadFormat.AUDIO_WAV):
+            if plan is None:
+                plan = self.postprocess_planner.plan(request, self.metadata_cache.peek(request.url))
+                job.cpu_seconds_saved = plan.cpu_seconds_saved
+            cmd.extend(plan.fetch_args if fetch_only else plan.args)
         elif request.format == DownloadFormat.METADATA:
             cmd.extend(["--write-info-json", "--skip-download"])
         
@@ -139,67 +277,64 @@ class YtDlpService:
         cmd: list, 
         output_dir: Path, 
         job: DownloadJob,
-        progress_callback: Optional[Callable[[int], None]] = None
+        progress_callback: Optional[Callable[[int], None]] = None,
+        finalize: bool = True
     ) -> str:
         """Run download command with progress tracking."""
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            cwd=self.download_dir,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+        received = 0
         
-        # Monitor progress
-        while True:
-            # Check if process is still running
-            if process.returncode is not None:
-                break
+        def handle_line(line: str):
+            nonlocal received
+            stage = parse_stage_line(line)
+            if stage is not None:
+                job.mark_stage(stage)
             
-            # Read stderr for progress information
-            try:
-                stderr_data = await asyncio.wait_for(process.stderr.read(1024), timeout=1.0)
-                if stderr_data:
-                    progress = self._parse_progress(stderr_data.decode())
-                    if progress is not None:
-                        job.update_progress(progress)
-                        save_job(job)  # Save progress to storage
-                        if progress_callback:
-                            progress_callback(progress)
-            except asyncio.TimeoutError:
-                pass
-            
-            await asyncio.sleep(0.5)
-        
-        # Wait for process to complete
-        stdout, stderr = await process.communicate()
+            update = parse_progress_line(line)
+            if update is None:
+                return
+            
+            # Counters restart for each file yt-dlp fetches (e.g. video then audio)
+            if update.downloaded_bytes is not None:
+                if update.downloaded_bytes < received:
+                    received = 0
+                downloaded_bytes.inc(update.downloaded_bytes - received)
+                received = update.downloaded_bytes
+            self._speeds[job.id] = update.speed or 0.0
+            
+            job.update_transfer(
+                update.downloaded_bytes,
+                update.total_bytes,
+                update.speed,
+                update.eta,
+                progress=update.percent
+            )
+            save_job(job)  # Save progress to storage
+            if progress_callback and update.percent is not None:
+                progress_callback(update.percent)
         
-        if process.returncode != 0:
-            raise Exception(f"Download failed: {stderr.decode()}")
+        try:
+            await self.engine.run_download(cmd, self.download_dir, handle_line)
+        finally:
+            self._speeds.pop(job.id, None)
+        if finalize:
+            job.mark_stage(JobStage.FINALIZE)
         
         # Find the downloaded file
-        downloaded_files = list(output_dir.glob("*"))
+        downloaded_files = [path for path in output_dir.glob("*") if path.is_file()]
         if not downloaded_files:
             raise Exception("No files were downloaded")
         
-        # Return the first file (main download)
-        return str(downloaded_files[0])
+        # The media is the largest file; subtitles and info JSON sit beside it
+        return str(max(downloaded_files, key=lambda path: path.stat().st_size))
     
-    def _parse_progress(self, stderr_output: str) -> Optional[int]:
-        """Parse progress from yt-dlp stderr output."""
-        try:
-            # Look for progress percentage in stderr
-            lines = stderr_output.split('\n')
-            for line in lines:
-                if '%' in line and 'ETA' in line:
-                    # Extract percentage
-                    parts = line.split()
-                    for part in parts:
-                        if part.endswith('%'):
-                            return int(part[:-1])
-        except (ValueError, IndexError):
-            pass
-        
-        return None
+    def get_throughput(self) -> float:
+        """Combined speed of running downloads in bytes per second."""
+        return sum(self._speeds.values())
+    
+    def _parse_progress(self, output_line: str) -> Optional[int]:
+        """Parse progress percentage from a line of yt-dlp output."""
+        update = parse_progress_line(output_line)
+        return update.percent if update else None
     
     def _extract_available_formats(self, metadata_json: Dict[str, Any]) -> list:
         """Extract available formats from metadata."""
@@ -213,6 +348,46 @@ class YtDlpService:
         
         return list(set(formats))  # Remove duplicates
     
+    def _extract_format_index(self, metadata_json: Dict[str, Any]) -> List[FormatInfo]:
+        """Reduce yt-dlp's formats to the fields format planning needs."""
+        index = {}
+        for fmt in metadata_json.get("formats", []):
+            vcodec = fmt.get("vcodec")
+            acodec = fmt.get("acodec")
+            if "format_id" not in fmt or (vcodec == "none" and acodec == "none"):
+                continue
+            
+            index[fmt["format_id"]] = FormatInfo(
+                format_id=fmt["format_id"],
+                ext=fmt.get("ext", ""),
+                height=fmt.get("height"),
+                fps=fmt.get("fps"),
+                vcodec=None if vcodec == "none" else vcodec,
+                acodec=None if acodec == "none" else acodec,
+                tbr=fmt.get("tbr") or (fmt.get("vbr") or 0) + (fmt.get("abr") or 0) or None,
+                asr=fmt.get("asr"),
+                audio_channels=fmt.get("audio_channels"),
+                filesize=fmt.get("filesize") or fmt.get("filesize_approx"),
+                protocol=fmt.get("protocol")
+            )
+        
+        return list(index.values())
+    
+    def _estimate_filesize(self, metadata_json: Dict[str, Any]) -> Optional[int]:
+        """Estimate the size of a video download from metadata."""
+        size = metadata_json.get("filesize") or metadata_json.get("filesize_approx")
+        if size:
+            return int(size)
+        
+        # Largest progressive format the video download could pick
+        sizes = [
+            fmt.get("filesize") or fmt.get("filesize_approx") or 0
+            for fmt in metadata_json.get("formats", [])
+            if fmt.get("vcodec") != "none" and fmt.get("acodec") != "none"
+            and (fmt.get("height") or 0) <= 720
+        ]
+        return int(max(sizes)) if any(sizes) else None
+    
     def _extract_available_subtitles(self, metadata_json: Dict[str, Any]) -> list:
         """Extract available subtitle languages from metadata."""
         subtitles = []
@@ -238,3 +413,14 @@ class YtDlpService:
             stdout=stdout,
             stderr=stderr
         )
+
+
+_ytdlp_service: Optional[YtDlpService] = None
+
+
+def get_ytdlp_service() -> YtDlpService:
+    """Get the YtDlpService shared by every API module."""
+    global _ytdlp_service
+    if _ytdlp_service is None:
+        _ytdlp_service = YtDlpService()
+    return _ytdlp_service
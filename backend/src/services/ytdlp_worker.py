@@ -0,0 +1,165 @@
+"""
+Warm yt-dlp worker process used by PooledEngine.
+
+Run as ``python -m src.services.ytdlp_worker``. The worker imports
+yt_dlp once, then serves one JSON request per stdin line and answers
+with JSON messages on stdout: any number of ``line`` messages carrying
+yt-dlp's screen output (and ``entry`` messages carrying playlist
+entries), followed by one ``result`` message.
+"""
+
+import json
+import os
+import sys
+import traceback
+
+from .progress_parser import PROGRESS_MARKER
+
+
+class _Channel:
+    """Writes protocol messages to the parent process."""
+    
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def send(self, message: dict) -> None:
+        self.stream.write(json.dumps(message, default=str) + "\n")
+        self.stream.flush()
+    
+    def line(self, text: str) -> None:
+        self.send({"type": "line", "line": text})
+
+
+class _LineLogger:
+    """yt-dlp logger that forwards screen output as protocol lines."""
+    
+    def __init__(self, channel: _Channel):
+        self.channel = channel
+    
+    def debug(self, message: str) -> None:
+        # yt-dlp routes regular screen output through debug()
+        if not message.startswith("[debug] "):
+            self.channel.line(message)
+    
+    def info(self, message: str) -> None:
+        self.channel.line(message)
+    
+    def warning(self, message: str) -> None:
+        self.channel.line(f"WARNING: {message}")
+    
+    def error(self, message: str) -> None:
+        self.channel.line(message)
+
+
+def _value(value) -> str:
+    """Render a progress field the way --progress-template does."""
+    return "NA" if value is None else str(value)
+
+
+def _progress_hook(channel: _Channel):
+    """Build a progress hook emitting PROGRESS_TEMPLATE-formatted lines."""
+    def hook(status: dict) -> None:
+        if status.get("status") not in ("downloading", "finished"):
+            return
+        channel.line(" ".join([
+            PROGRESS_MARKER,
+            _value(status.get("downloaded_bytes")),
+            _value(status.get("total_bytes")),
+            _value(status.get("total_bytes_estimate")),
+            _value(status.get("speed")),
+            _value(status.get("eta")),
+        ]))
+    return hook
+
+
+def _download(yt_dlp, channel: _Channel, request: dict) -> dict:
+    """Run a download from a yt-dlp argument list."""
+    parsed = yt_dlp.parse_options(request["args"])
+    options = dict(parsed.ydl_opts)
+    options.update({
+        "logger": _LineLogger(channel),
+        "noprogress": True,
+        "progress_hooks": [_progress_hook(channel)] + list(options.get("progress_hooks") or []),
+    })
+    
+    os.chdir(request["cwd"])
+    with yt_dlp.YoutubeDL(options) as ydl:
+        return_code = ydl.download(parsed.urls)
+    
+    if return_code:
+        return {"ok": False, "error": f"Download failed with exit code {return_code}"}
+    return {"ok": True}
+
+
+def _extract_info(yt_dlp, channel: _Channel, request: dict) -> dict:
+    """Extract the info dict for a URL without downloading."""
+    options = {"logger": _LineLogger(channel), "skip_download": True, "noprogress": True}
+    with yt_dlp.YoutubeDL(options) as ydl:
+        info = ydl.extract_info(request["url"], download=False)
+        return {"ok": True, "info": ydl.sanitize_info(info)}
+
+
+def _expand_playlist(yt_dlp, channel: _Channel, request: dict) -> dict:
+    """Stream the flat entries of a playlist as they are discovered."""
+    options = {
+        "logger": _LineLogger(channel),
+        "skip_download": True,
+        "noprogress": True,
+        "extract_flat": "in_playlist",
+        "lazy_playlist": True,
+    }
+    with yt_dlp.YoutubeDL(options) as ydl:
+        # Follow redirects (e.g. watch?v=...&list=...) without processing
+        # the playlist, which would fetch every page before returning
+        info = ydl.extract_info(request["url"], download=False, process=False)
+        while info.get("_type") in ("url", "url_transparent"):
+            info = ydl.extract_info(info["url"], download=False, process=False, ie_key=info.get("ie_key"))
+        
+        if info.get("_type") not in ("playlist", "multi_video"):
+            channel.send({"type": "entry", "entry": ydl.sanitize_info(info)})
+            return {"ok": True, "count": 1}
+        
+        count = 0
+        for entry in info.get("entries") or []:
+            if entry:
+                channel.send({"type": "entry", "entry": ydl.sanitize_info(entry)})
+                count += 1
+        return {"ok": True, "count": count}
+
+
+HANDLERS = {
+    "download": _download,
+    "extract_info": _extract_info,
+    "expand_playlist": _expand_playlist,
+}
+
+
+def main() -> None:
+    # Reserve the real stdout for the protocol; stray prints go to stderr
+    channel = _Channel(os.fdopen(os.dup(sys.stdout.fileno()), "w"))
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    
+    try:
+        import yt_dlp
+    except ImportError as e:
+        channel.send({"type": "ready", "ok": False, "error": str(e)})
+        return
+    
+    channel.send({"type": "ready", "ok": True, "pid": os.getpid()})
+    
+    for raw in sys.stdin:
+        try:
+            request = json.loads(raw)
+            result = HANDLERS[request["op"]](yt_dlp, channel, request)
+        except SystemExit as e:
+            result = {"ok": False, "error": f"yt-dlp exited with status {e.code}"}
+        except Exception as e:
+            traceback.print_exc()
+            result = {"ok": False, "error": str(e)}
+        
+        result["type"] = "result"
+        channel.send(result)
+
+
+if __name__ == "__main__":
+    main()
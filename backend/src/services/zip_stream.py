@@ -0,0 +1,220 @@
+"""
+ZipStream for serving several files as one ZIP archive built on the fly.
+"""
+
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import AsyncIterator, Iterable, List, Optional
+
+import anyio
+
+# Bytes read from disk per chunk
+CHUNK_SIZE = 1024 * 1024
+
+# Extensions of small text artifacts worth compressing; everything else
+# (audio and video) is already compressed and is stored as-is
+DEFLATE_EXTENSIONS = {".json", ".vtt", ".srt", ".ass", ".lrc", ".txt", ".description"}
+
+_ZIP32_LIMIT = 0xFFFFFFFF
+_ZIP64_VERSION = 45
+_ZIP_VERSION = 20
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_METHOD_STORED = 0
+_METHOD_DEFLATED = 8
+
+
+class ZipEntry:
+    """A file to add to a ZipStream."""
+    
+    __slots__ = ("path", "name", "size", "mtime", "mode", "compress")
+    
+    def __init__(self, path: str, name: str, compress: Optional[bool] = None):
+        st = os.stat(path)
+        self.path = path
+        self.name = name
+        self.size = st.st_size
+        self.mtime = st.st_mtime
+        self.mode = st.st_mode
+        if compress is None:
+            compress = Path(name).suffix.lower() in DEFLATE_EXTENSIONS
+        self.compress = compress
+    
+    @property
+    def zip64(self) -> bool:
+        # Deflate can grow incompressible data slightly, so leave headroom
+        return self.size >= _ZIP32_LIMIT - (1 << 16)
+
+
+def _dos_datetime(timestamp: float):
+    """Convert a timestamp to the DOS (time, date) pair ZIP headers use."""
+    t = time.localtime(timestamp)
+    year = max(1980, min(2107, t.tm_year))
+    dos_date = (year - 1980) << 9 | t.tm_mon << 5 | t.tm_mday
+    dos_time = t.tm_hour << 11 | t.tm_min << 5 | t.tm_sec // 2
+    return dos_time, dos_date
+
+
+class ZipStream:
+    """ZIP archive generated chunk by chunk from files on disk.
+    
+    Nothing is staged: each file is read, optionally deflated, and sent
+    straight away, with its CRC and sizes following in a data descriptor.
+    Memory use is one chunk plus a central directory record per file,
+    whatever the archive size. ZIP64 records are used when sizes or
+    offsets need them.
+    """
+    
+    def __init__(self, entries: Iterable[ZipEntry], chunk_size: int = CHUNK_SIZE):
+        """Initialize ZipStream."""
+        self.entries: List[ZipEntry] = list(entries)
+        self.chunk_size = chunk_size
+    
+    def content_length(self) -> Optional[int]:
+        """Exact archive size, or None if any entry is deflated."""
+        if any(entry.compress for entry in self.entries):
+            return None
+        
+        offset = 0
+        central_size = 0
+        for entry in self.entries:
+            local = len(self._local_header(entry))
+            central_size += len(self._central_record(entry, 0, entry.size, entry.size, offset))
+            offset += local + entry.size + self._descriptor_size(entry)
+        return offset + central_size + len(self._end_records(offset, central_size))
+    
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        offset = 0
+        records = []
+        
+        for entry in self.entries:
+            header = self._local_header(entry)
+            yield header
+            
+            crc = 0
+            compressed_size = 0
+            uncompressed_size = 0
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15) if entry.compress else None
+            
+            with open(entry.path, "rb") as f:
+                while True:
+                    chunk = await anyio.to_thread.run_sync(f.read, self.chunk_size)
+                    if not chunk:
+                        break
+                    crc = zlib.crc32(chunk, crc)
+                    uncompressed_size += len(chunk)
+                    if compressor:
+                        chunk = compressor.compress(chunk)
+                    if chunk:
+                        compressed_size += len(chunk)
+                        yield chunk
+            
+            if compressor:
+                tail = compressor.flush()
+                compressed_size += len(tail)
+                if tail:
+                    yield tail
+            
+            if uncompressed_size != entry.size:
+                raise RuntimeError(f"File changed while being archived: {entry.path}")
+            
+            yield self._data_descriptor(entry, crc, compressed_size, uncompressed_size)
+            records.append(self._central_record(entry, crc, compressed_size, uncompressed_size, offset))
+            offset += len(header) + compressed_size + self._descriptor_size(entry)
+        
+        central_size = sum(len(record) for record in records)
+        for record in records:
+            yield record
+        yield self._end_records(offset, central_size)
+    
+    def _flags(self, entry: ZipEntry) -> int:
+        flags = _FLAG_DATA_DESCRIPTOR
+        if not entry.name.isascii():
+            flags |= _FLAG_UTF8
+        return flags
+    
+    def _local_header(self, entry: ZipEntry) -> bytes:
+        name = entry.name.encode("utf-8")
+        dos_time, dos_date = _dos_datetime(entry.mtime)
+        version = _ZIP64_VERSION if entry.zip64 else _ZIP_VERSION
+        method = _METHOD_DEFLATED if entry.compress else _METHOD_STORED
+        
+        # Sizes follow in the data descriptor; a zip64 extra field marks
+        # that the descriptor uses 8-byte sizes
+        extra = b""
+        sizes = 0
+        if entry.zip64:
+            extra = struct.pack("<HHQQ", 0x0001, 16, 0, 0)
+            sizes = _ZIP32_LIMIT
+        
+        return struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50, version, self._flags(entry), method, dos_time, dos_date,
+            0, sizes, sizes, len(name), len(extra)
+        ) + name + extra
+    
+    def _descriptor_size(self, entry: ZipEntry) -> int:
+        return 24 if entry.zip64 else 16
+    
+    def _data_descriptor(self, entry: ZipEntry, crc: int, compressed_size: int, size: int) -> bytes:
+        if entry.zip64:
+            return struct.pack("<IIQQ", 0x08074B50, crc, compressed_size, size)
+        return struct.pack("<IIII", 0x08074B50, crc, compressed_size, size)
+    
+    def _central_record(
+        self,
+        entry: ZipEntry,
+        crc: int,
+        compressed_size: int,
+        size: int,
+        offset: int
+    ) -> bytes:
+        name = entry.name.encode("utf-8")
+        dos_time, dos_date = _dos_datetime(entry.mtime)
+        method = _METHOD_DEFLATED if entry.compress else _METHOD_STORED
+        
+        # Values that don't fit in 32 bits move to the zip64 extra field
+        zip64_fields = []
+        if entry.zip64:
+            zip64_fields += [size, compressed_size]
+            size = compressed_size = _ZIP32_LIMIT
+        if offset >= _ZIP32_LIMIT:
+            zip64_fields.append(offset)
+            offset = _ZIP32_LIMIT
+        
+        extra = b""
+        version = _ZIP_VERSION
+        if zip64_fields:
+            extra = struct.pack(f"<HH{len(zip64_fields)}Q", 0x0001, 8 * len(zip64_fields), *zip64_fields)
+            version = _ZIP64_VERSION
+        
+        return struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014B50, 3 << 8 | version, version, self._flags(entry), method,
+            dos_time, dos_date, crc, compressed_size, size,
+            len(name), len(extra), 0, 0, 0, (entry.mode & 0xFFFF) << 16, offset
+        ) + name + extra
+    
+    def _end_records(self, central_offset: int, central_size: int) -> bytes:
+        count = len(self.entries)
+        records = b""
+        
+        if count >= 0xFFFF or central_offset >= _ZIP32_LIMIT or central_size >= _ZIP32_LIMIT:
+            zip64_end_offset = central_offset + central_size
+            records += struct.pack(
+                "<IQHHIIQQQQ",
+                0x06064B50, 44, _ZIP64_VERSION, _ZIP64_VERSION, 0, 0,
+                count, count, central_size, central_offset
+            )
+            records += struct.pack("<IIQI", 0x07064B50, 0, zip64_end_offset, 1)
+            count = min(count, 0xFFFF)
+            central_offset = min(central_offset, _ZIP32_LIMIT)
+            central_size = min(central_size, _ZIP32_LIMIT)
+        
+        return records + struct.pack(
+            "<IHHHHIIH",
+            0x06054B50, 0, 0, count, count, central_size, central_offset, 0
+        )
@@ -0,0 +1,183 @@
+"""
+Cross-process job change notifications for yt-dlp Web UI.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from ..models.download_job import DownloadJob, current_worker_id
+
+# Seconds between rescans of the directory for new or departed processes
+PEER_REFRESH_INTERVAL = 1.0
+
+# Seconds between probes the leader makes to notice processes that exited
+PEER_PROBE_INTERVAL = 5.0
+
+# Largest notification accepted; a serialized job is a few KB
+MAX_MESSAGE_SIZE = 256 * 1024
+
+# Attempts, and seconds between them, to deliver a finished job to a busy peer
+FINAL_SEND_ATTEMPTS = 20
+FINAL_SEND_RETRY_DELAY = 0.05
+
+
+class JobNotifier:
+    """Broadcasts saved jobs to the other API processes on this host.
+    
+    Every process (e.g. each ``uvicorn --workers`` worker) binds a Unix
+    datagram socket in a shared directory. A saved job is serialized
+    once per event loop iteration, however often it was saved, and sent
+    to every other socket found there; the receivers hand it to
+    ``on_job``. Sends never block: progress updates are dropped if a
+    peer is too busy to read them, since a newer one will follow, while
+    a job's final state is retried for a while.
+    """
+    
+    def __init__(self, directory: str, on_job: Callable[[DownloadJob], None]):
+        """Initialize JobNotifier."""
+        self.directory = Path(directory)
+        self.on_job = on_job
+        self.logger = logging.getLogger(__name__)
+        self.path = self.directory / f"{current_worker_id()}.sock"
+        
+        self._socket: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._peers: List[str] = []
+        self._peers_read_at = 0.0
+        self._pending: Dict[str, DownloadJob] = {}
+        self._flush_scheduled = False
+        
+        # Counters
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self.departed = 0
+    
+    def start(self) -> int:
+        """Bind this process's socket and return how many peers are alive."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._loop = asyncio.get_running_loop()
+        
+        # Named after the worker id jobs record, so their owner can be probed
+        self.path = self.directory / f"{current_worker_id()}.sock"
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        if self.path.exists():
+            self.path.unlink()
+        self._socket.bind(str(self.path))
+        self._loop.add_reader(self._socket.fileno(), self._on_readable)
+        return len(self.probe()) - 1
+    
+    def probe(self) -> Set[str]:
+        """Return the worker ids of the live processes, this one included."""
+        # An empty datagram probes each socket, removing those left by dead processes
+        self._refresh_peers(force=True)
+        for peer in list(self._peers):
+            self._send(peer, b"")
+        return {Path(peer).stem for peer in self._peers} | {self.path.stem}
+    
+    def stop(self) -> None:
+        if self._socket is None:
+            return
+        self._loop.remove_reader(self._socket.fileno())
+        self._socket.close()
+        self._socket = None
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def publish(self, job: DownloadJob) -> None:
+        """Queue a saved job for broadcast (used as a job save listener)."""
+        if self._socket is None:
+            return
+        
+        self._pending[job.id] = job
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon_threadsafe(self._flush)
+    
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, {}
+        if self._socket is None:
+            return
+        
+        self._refresh_peers()
+        if not self._peers:
+            return
+        
+        for job in pending.values():
+            data = job.model_dump_json().encode()
+            for peer in list(self._peers):
+                self._send(peer, data, final=job.is_finished())
+    
+    def _send(self, peer: str, data: bytes, final: bool = False, attempt: int = 1) -> None:
+        if self._socket is None:
+            return
+        try:
+            self._socket.sendto(data, peer)
+            if data:
+                self.sent += 1
+        except BlockingIOError:
+            if final and attempt < FINAL_SEND_ATTEMPTS:
+                self._loop.call_later(FINAL_SEND_RETRY_DELAY, self._send, peer, data, final, attempt + 1)
+            else:
+                self.dropped += 1
+        except (ConnectionRefusedError, FileNotFoundError):
+            # The process that bound it has exited
+            self._forget_peer(peer)
+        except OSError as e:
+            self.dropped += 1
+            self.logger.warning(f"Failed to notify {peer}: {e}")
+    
+    def _forget_peer(self, peer: str) -> None:
+        if peer in self._peers:
+            self._peers.remove(peer)
+            self.departed += 1
+        try:
+            os.unlink(peer)
+        except OSError:
+            pass
+    
+    def _refresh_peers(self, force: bool = False) -> None:
+        now = self._loop.time()
+        if not force and now - self._peers_read_at < PEER_REFRESH_INTERVAL:
+            return
+        self._peers_read_at = now
+        
+        own = str(self.path)
+        self._peers = [
+            str(path) for path in self.directory.glob("*.sock") if str(path) != own
+        ]
+    
+    def _on_readable(self) -> None:
+        while self._socket is not None:
+            try:
+                data = self._socket.recv(MAX_MESSAGE_SIZE)
+            except BlockingIOError:
+                return
+            if not data:
+                continue
+            
+            self.received += 1
+            try:
+                job = DownloadJob.model_validate_json(data)
+            except ValueError as e:
+                self.logger.warning(f"Ignoring malformed job notification: {e}")
+                continue
+            self.on_job(job)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get notifier statistics."""
+        return {
+            "peers": len(self._peers),
+            "sent": self.sent,
+            "received": self.received,
+            "dropped": self.dropped,
+            "departed": self.departed
+        }
@@ -2,28 +2,104 @@
 Global job storage for yt-dlp Web UI.
 """
 
-from typing import Dict
-from ..models.download_job import DownloadJob
+import os
+from datetime import datetime
+from typing import Callable, Collection, Dict, List, Optional, Union
+
+from ..models.download_job import DownloadJob, JobStatus
+from ..models.job_record import JobRecord
+from .job_store import JobStore, MemoryJobStore
+
+
+def _create_job_store() -> JobStore:
+    """Create the job store selected by the JOB_STORAGE_BACKEND setting."""
+    backend = os.getenv("JOB_STORAGE_BACKEND", "sqlite").lower()
+    
+    if backend == "memory":
+        return MemoryJobStore()
+    
+    if backend == "sqlite":
+        from .sqlite_job_store import SQLiteJobStore
+        
+        return SQLiteJobStore(
+            os.getenv("JOB_STORAGE_PATH", "data/jobs.sqlite3"),
+            flush_interval=float(os.getenv("JOB_STORAGE_FLUSH_INTERVAL", "0.5"))
+        )
+    
+    raise ValueError(f"Unknown job storage backend: {backend}")
+
 
 # Global job storage
-jobs_storage: Dict[str, DownloadJob] = {}
+job_store: JobStore = _create_job_store()
 
-def get_job(job_id: str) -> DownloadJob:
+# Callbacks invoked with every saved job, e.g. to tell other processes
+_save_listeners: List[Callable[[DownloadJob], None]] = []
+
+def add_save_listener(listener: Callable[[DownloadJob], None]) -> None:
+    """Register a callback invoked after every save_job."""
+    _save_listeners.append(listener)
+
+def get_job(job_id: str) -> Optional[DownloadJob]:
     """Get a job by ID."""
-    return jobs_storage.get(job_id)
+    return job_store.get(job_id)
+
+def peek_job(job_id: str) -> Optional[Union[DownloadJob, JobRecord]]:
+    """Get a job for reading only, without rebuilding a model for finished jobs."""
+    return job_store.peek(job_id)
 
 def save_job(job: DownloadJob) -> None:
     """Save a job to storage."""
-    jobs_storage[job.id] = job
+    job_store.save(job)
+    for listener in _save_listeners:
+        listener(job)
+
+def accept_job(job: DownloadJob) -> None:
+    """Take in a job saved by another process sharing the storage."""
+    job_store.accept(job)
 
 def delete_job(job_id: str) -> bool:
     """Delete a job from storage."""
-    if job_id in jobs_storage:
-        del jobs_storage[job_id]
-        return True
-    return False
+    return job_store.delete(job_id)
 
 def get_all_jobs() -> Dict[str, DownloadJob]:
     """Get all jobs."""
-    return jobs_storage.copy()
+    return job_store.all()
+
+def get_jobs_by_status(status: str) -> List[DownloadJob]:
+    """Get all jobs with the given status."""
+    return job_store.find_by_status(status)
+
+def get_jobs_by_request_id(request_id: str) -> List[DownloadJob]:
+    """Get all jobs created for a download request."""
+    return job_store.find_by_request_id(request_id)
+
+def get_jobs_expiring_before(cutoff: datetime) -> List[DownloadJob]:
+    """Get all jobs that expire before the cutoff, oldest first."""
+    return job_store.find_expiring_before(cutoff)
+
+def fail_interrupted_jobs(live_workers: Optional[Collection[str]] = None) -> List[str]:
+    """Mark jobs left pending or processing by exited processes as failed.
+    
+    With live_workers, jobs owned by those worker processes are left
+    running; without, every unfinished job is failed (a cold start).
+    """
+    interrupted = []
+    for status in (JobStatus.PENDING, JobStatus.PROCESSING):
+        for job in job_store.find_by_status(status):
+            if live_workers is not None and job.worker_id in live_workers:
+                continue
+            
+            # Stage times were read from the exited process's monotonic clock
+            job.stage_times.clear()
+            job.mark_failed("Download interrupted by server restart")
+            save_job(job)
+            interrupted.append(job.id)
+    return interrupted
+
+def is_storage_shared() -> bool:
+    """Check if other processes can see the jobs this process saves."""
+    return not isinstance(job_store, MemoryJobStore)
 
+def close_storage() -> None:
+    """Flush pending writes and close the job store."""
+    job_store.close()
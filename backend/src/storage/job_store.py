@@ -0,0 +1,101 @@
+"""
+Job storage backends for yt-dlp Web UI.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+from ..models.download_job import DownloadJob
+from ..models.job_record import JobRecord
+
+
+class JobStore:
+    """Interface implemented by every job storage backend."""
+    
+    def get(self, job_id: str) -> Optional[DownloadJob]:
+        """Get a job by ID."""
+        raise NotImplementedError
+    
+    def peek(self, job_id: str) -> Optional[Union[DownloadJob, JobRecord]]:
+        """Get a job for reading only; finished jobs may come back as a JobRecord."""
+        return self.get(job_id)
+    
+    def save(self, job: DownloadJob) -> None:
+        """Save a job."""
+        raise NotImplementedError
+    
+    def delete(self, job_id: str) -> bool:
+        """Delete a job, returning whether it existed."""
+        raise NotImplementedError
+    
+    def accept(self, job: DownloadJob) -> None:
+        """Take in a job another process has saved, without writing it again."""
+        raise NotImplementedError
+    
+    def all(self) -> Dict[str, DownloadJob]:
+        """Get all jobs keyed by ID."""
+        raise NotImplementedError
+    
+    def find_by_status(self, status: str) -> List[DownloadJob]:
+        """Get all jobs with the given status."""
+        raise NotImplementedError
+    
+    def find_by_request_id(self, request_id: str) -> List[DownloadJob]:
+        """Get all jobs created for the given request."""
+        raise NotImplementedError
+    
+    def find_expiring_before(self, cutoff: datetime) -> List[DownloadJob]:
+        """Get all jobs whose expires_at is earlier than cutoff."""
+        raise NotImplementedError
+    
+    def flush(self) -> None:
+        """Write any buffered changes to durable storage."""
+    
+    def close(self) -> None:
+        """Flush and release the backend's resources."""
+        self.flush()
+
+
+def _load(entry: Union[DownloadJob, JobRecord]) -> DownloadJob:
+    """Get the model for a stored entry, rebuilding it from a record."""
+    return entry.to_job() if isinstance(entry, JobRecord) else entry
+
+
+class MemoryJobStore(JobStore):
+    """Process-local, non-persistent job store backed by a dict.
+    
+    Running jobs are kept as the live models the pipeline mutates, and
+    finished jobs as compact JobRecords, rebuilt into models on lookup.
+    """
+    
+    def __init__(self):
+        """Initialize MemoryJobStore."""
+        self._jobs: Dict[str, Union[DownloadJob, JobRecord]] = {}
+    
+    def get(self, job_id: str) -> Optional[DownloadJob]:
+        entry = self._jobs.get(job_id)
+        return None if entry is None else _load(entry)
+    
+    def peek(self, job_id: str) -> Optional[Union[DownloadJob, JobRecord]]:
+        return self._jobs.get(job_id)
+    
+    def save(self, job: DownloadJob) -> None:
+        self._jobs[job.id] = JobRecord(job) if job.is_finished() else job
+    
+    def delete(self, job_id: str) -> bool:
+        return self._jobs.pop(job_id, None) is not None
+    
+    def accept(self, job: DownloadJob) -> None:
+        self.save(job)
+    
+    def all(self) -> Dict[str, DownloadJob]:
+        return {job_id: _load(entry) for job_id, entry in self._jobs.items()}
+    
+    def find_by_status(self, status: str) -> List[DownloadJob]:
+        return [_load(entry) for entry in self._jobs.values() if entry.status == status]
+    
+    def find_by_request_id(self, request_id: str) -> List[DownloadJob]:
+        return [_load(entry) for entry in self._jobs.values() if entry.request_id == request_id]
+    
+    def find_expiring_before(self, cutoff: datetime) -> List[DownloadJob]:
+        return [_load(entry) for entry in self._jobs.values() if entry.expires_at < cutoff]
@@ -0,0 +1,84 @@
+"""
+Leader election among worker processes for yt-dlp Web UI.
+"""
+
+import asyncio
+import fcntl
+import logging
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+# Seconds between attempts to take over the lock from a leader
+LEADER_POLL_INTERVAL = 2.0
+
+
+class LeaderLock:
+    """Elects one of the processes sharing the job store to do housekeeping.
+    
+    Expiry, eviction and cleanup delete files and rewrite jobs, so only
+    one process may run them. The leader is whichever process holds an
+    exclusive ``flock`` on a file in the shared directory; the kernel
+    releases it when that process exits, however it exits, and the next
+    poll by another process takes over, calling ``on_elected``.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        on_elected: Callable[[], Awaitable[None]],
+        poll_interval: float = LEADER_POLL_INTERVAL
+    ):
+        """Initialize LeaderLock."""
+        self.path = Path(path)
+        self.on_elected = on_elected
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self._fd: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+    
+    async def start(self) -> bool:
+        """Try to become leader, polling in the background if another process is."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if await self._try_acquire():
+            return True
+        
+        self._task = asyncio.create_task(self._poll())
+        return False
+    
+    async def stop(self):
+        """Stop polling and give up leadership."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        if self._fd is not None:
+            # Closing the descriptor releases the lock
+            os.close(self._fd)
+            self._fd = None
+    
+    async def _poll(self):
+        while not await self._try_acquire():
+            await asyncio.sleep(self.poll_interval)
+        self._task = None
+    
+    async def _try_acquire(self) -> bool:
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        
+        self._fd = fd
+        self.logger.info(f"Process {os.getpid()} elected leader for housekeeping")
+        await self.on_elected()
+        return True
@@ -0,0 +1,297 @@
+"""
+SQLite job storage backend for yt-dlp Web UI.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from ..models.download_job import DownloadJob, JobStatus
+from ..models.job_record import JobRecord
+from .job_store import JobStore, _load
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    request_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS idx_jobs_expires_at ON jobs (expires_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_request_id ON jobs (request_id);
+"""
+
+
+def _epoch(value: datetime) -> float:
+    """Convert a naive UTC datetime to a sortable epoch value."""
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+class SQLiteJobStore(JobStore):
+    """Persistent job store backed by SQLite in WAL mode.
+    
+    Saved jobs are kept in an in-process identity cache and marked dirty;
+    a background thread writes dirty jobs in a single transaction every
+    ``flush_interval`` seconds, or sooner once ``batch_size`` jobs are
+    pending. Frequent progress saves therefore cost a dict update rather
+    than a transaction and fsync each.
+    
+    Like MemoryJobStore, the cache holds running jobs as the live models
+    the pipeline mutates and finished jobs as compact JobRecords, rebuilt
+    into models on lookup. Jobs waiting to be written stay models.
+    Only finished jobs are evicted when the cache is full, so there is
+    never a second model of a job the pipeline is still mutating.
+    
+    Queries read the committed rows without flushing and overlay the
+    changes still waiting to be written, so they never start a write
+    transaction on the caller's thread.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 0.5,
+        batch_size: int = 500,
+        cache_size: int = 10000
+    ):
+        """Initialize SQLiteJobStore."""
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.logger = logging.getLogger(__name__)
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # Separate reader and writer connections so lookups from the event
+        # loop never wait on a commit in progress (WAL allows both at once)
+        self._write_conn = self._connect()
+        self._write_conn.executescript(SCHEMA)
+        self._conn = self._connect()
+        
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._cache: "OrderedDict[str, Union[DownloadJob, JobRecord]]" = OrderedDict()
+        self._dirty: Dict[str, DownloadJob] = {}
+        self._deleted: set = set()
+        self._writing: Dict[str, Optional[DownloadJob]] = {}
+        
+        self._closed = False
+        self._wakeup = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name="sqlite-job-store-flusher", daemon=True
+        )
+        self._flusher.start()
+    
+    def get(self, job_id: str) -> Optional[DownloadJob]:
+        entry = self.peek(job_id)
+        return None if entry is None else _load(entry)
+    
+    def peek(self, job_id: str) -> Optional[Union[DownloadJob, JobRecord]]:
+        with self._lock:
+            entry = self._cache.get(job_id)
+            if entry is not None:
+                self._cache.move_to_end(job_id)
+                return entry
+            if job_id in self._deleted:
+                return None
+            if job_id in self._writing:
+                return self._writing[job_id]
+            
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            job = DownloadJob.model_validate_json(row[0])
+            self._remember(job)
+            return self._cache.get(job_id, job)
+    
+    def save(self, job: DownloadJob) -> None:
+        with self._lock:
+            self._remember(job)
+            self._deleted.discard(job.id)
+            self._dirty[job.id] = job
+            pending = len(self._dirty)
+        
+        if pending >= self.batch_size:
+            self._wakeup.set()
+    
+    def accept(self, job: DownloadJob) -> None:
+        with self._lock:
+            # Our own unwritten changes to the job take precedence
+            if job.id in self._dirty or job.id in self._deleted:
+                return
+            self._remember(job)
+    
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            existed = self._cache.pop(job_id, None) is not None
+            existed = self._dirty.pop(job_id, None) is not None or existed
+            if not existed:
+                existed = self._conn.execute(
+                    "SELECT 1 FROM jobs WHERE id = ?", (job_id,)
+                ).fetchone() is not None
+            if existed:
+                self._deleted.add(job_id)
+        
+        return existed
+    
+    def all(self) -> Dict[str, DownloadJob]:
+        return {job.id: job for job in self._query("SELECT id, data FROM jobs", (), lambda job: True)}
+    
+    def find_by_status(self, status: str) -> List[DownloadJob]:
+        value = JobStatus(status).value
+        return self._query(
+            "SELECT id, data FROM jobs WHERE status = ?",
+            (value,),
+            lambda job: JobStatus(job.status).value == value
+        )
+    
+    def find_by_request_id(self, request_id: str) -> List[DownloadJob]:
+        return self._query(
+            "SELECT id, data FROM jobs WHERE request_id = ?",
+            (request_id,),
+            lambda job: job.request_id == request_id
+        )
+    
+    def find_expiring_before(self, cutoff: datetime) -> List[DownloadJob]:
+        jobs = self._query(
+            "SELECT id, data FROM jobs WHERE expires_at < ?",
+            (_epoch(cutoff),),
+            lambda job: job.expires_at < cutoff
+        )
+        jobs.sort(key=lambda job: job.expires_at)
+        return jobs
+    
+    def flush(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty and not self._deleted:
+                    return
+                
+                dirty = list(self._dirty.values())
+                deleted = list(self._deleted)
+                self._dirty.clear()
+                self._deleted.clear()
+                self._writing = {job.id: job for job in dirty}
+                self._writing.update((job_id, None) for job_id in deleted)
+                
+                now = time.time()
+                rows = [
+                    (
+                        job.id,
+                        job.request_id,
+                        JobStatus(job.status).value,
+                        _epoch(job.expires_at),
+                        now,
+                        job.model_dump_json()
+                    )
+                    for job in dirty
+                ]
+            
+            try:
+                self._write_conn.execute("BEGIN")
+                self._write_conn.executemany(
+                    "INSERT OR REPLACE INTO jobs "
+                    "(id, request_id, status, expires_at, updated_at, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._write_conn.executemany(
+                    "DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in deleted]
+                )
+                self._write_conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._write_conn.execute("ROLLBACK")
+                # Keep the changes so the next flush retries them
+                with self._lock:
+                    for job in dirty:
+                        self._dirty.setdefault(job.id, job)
+                    self._deleted.update(
+                        job_id for job_id in deleted if job_id not in self._dirty
+                    )
+                raise
+            finally:
+                with self._lock:
+                    self._writing = {}
+    
+    def close(self) -> None:
+        if self._closed:
+            return
+        
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        self._conn.close()
+        self._write_conn.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection configured for WAL mode."""
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _remember(self, job: DownloadJob) -> None:
+        """Add a job to the identity cache, evicting clean finished entries if full."""
+        self._cache[job.id] = JobRecord(job) if job.is_finished() else job
+        self._cache.move_to_end(job.id)
+        
+        overflow = len(self._cache) - self.cache_size
+        if overflow <= 0:
+            return
+        
+        victims = []
+        for job_id, entry in self._cache.items():
+            if len(victims) >= overflow:
+                break
+            if isinstance(entry, JobRecord) and job_id not in self._dirty and job_id not in self._writing:
+                victims.append(job_id)
+        
+        for job_id in victims:
+            del self._cache[job_id]
+    
+    def _query(
+        self,
+        sql: str,
+        params: tuple,
+        matches: Callable[[DownloadJob], bool]
+    ) -> List[DownloadJob]:
+        """Run a query over written jobs, overlaying unwritten changes that match."""
+        with self._lock:
+            # Latest unwritten state of each job; None for a deletion
+            pending: Dict[str, Optional[DownloadJob]] = dict(self._writing)
+            pending.update((job_id, None) for job_id in self._deleted)
+            pending.update(self._dirty)
+            
+            jobs = []
+            for job_id, data in self._conn.execute(sql, params):
+                if job_id in pending:
+                    continue
+                entry = self._cache.get(job_id)
+                jobs.append(_load(entry) if entry is not None else DownloadJob.model_validate_json(data))
+            
+            jobs.extend(job for job in pending.values() if job is not None and matches(job))
+            return jobs
+    
+    def _flush_loop(self) -> None:
+        """Periodically write dirty jobs until the store is closed."""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                self.logger.error(f"Error flushing job store: {e}")
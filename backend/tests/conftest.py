@@ -0,0 +1,23 @@
+"""
+Shared test configuration for yt-dlp Web UI backend.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+STUBS_DIR = Path(__file__).resolve().parents[1] / "benchmarks" / "stubs"
+
+# Settings are read when the services are built, so keep every test run
+# away from the real job data and activity file
+_TEST_ROOT = tempfile.mkdtemp(prefix="ytdlp-webui-tests-")
+os.environ.setdefault("JOB_STORAGE_BACKEND", "memory")
+os.environ.setdefault("JOB_NOTIFY_DIR", os.path.join(_TEST_ROOT, "workers"))
+os.environ.setdefault("ACTIVITY_FILE", os.path.join(_TEST_ROOT, ".last_activity"))
+
+# yt-dlp runs as the offline stub package used by the benchmarks
+os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [str(STUBS_DIR), os.environ.get("PYTHONPATH")]))
+os.environ.setdefault("YTDLP_COMMAND", f"{sys.executable} -m yt_dlp")
+os.environ.setdefault("STUB_YTDLP_IMPORT_DELAY", "0")
+os.environ.setdefault("STUB_YTDLP_FILESIZE", str(256 * 1024))
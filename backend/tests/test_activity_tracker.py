@@ -0,0 +1,92 @@
+"""
+Tests for activity tracking for the idle monitor.
+"""
+
+import asyncio
+
+import pytest
+
+from src.services import activity_tracker as activity_tracker_module
+from src.services.activity_tracker import ActivityTracker
+
+
+class FakeClock:
+    """Stands in for the time module with a settable now."""
+    
+    def __init__(self, now: float):
+        self.now = now
+    
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock(1_000_000.0)
+    monkeypatch.setattr(activity_tracker_module, "time", clock)
+    return clock
+
+
+def test_heartbeats_within_interval_cost_one_write(clock, tmp_path):
+    path = tmp_path / ".last_activity"
+    tracker = ActivityTracker(str(path), persist_interval=60)
+    
+    async def scenario():
+        await tracker.start()
+        for _ in range(50):
+            clock.now += 0.01
+            tracker.touch()
+        await asyncio.sleep(0.05)
+        assert tracker.writes == 1
+        
+        # More heartbeats before the interval is up are only kept in memory
+        for _ in range(50):
+            clock.now += 1
+            tracker.touch()
+        await asyncio.sleep(0.05)
+        assert tracker.writes == 1
+        assert path.read_text() == "1000000"
+        
+        await tracker.stop()
+    
+    asyncio.run(scenario())
+    assert tracker.heartbeats == 100
+    assert tracker.writes == 2
+    assert path.read_text() == "1000050"
+
+
+def test_timestamp_never_moves_backwards_across_processes(clock, tmp_path):
+    path = tmp_path / ".last_activity"
+    earlier = ActivityTracker(str(path))
+    later = ActivityTracker(str(path))
+    
+    clock.now += 100
+    later.touch()
+    later.persist()
+    assert path.read_text() == "1000100"
+    
+    # A process whose last activity is older leaves the file alone
+    earlier.persist()
+    assert earlier.writes == 0
+    assert path.read_text() == "1000100"
+    
+    # and reports the newer activity it found there
+    clock.now += 5
+    status = earlier.get_status()
+    assert status["last_activity"] == 1000100
+    assert status["idle_seconds"] == 5
+
+
+def test_busy_source_keeps_server_active(clock, tmp_path):
+    tracker = ActivityTracker(str(tmp_path / ".last_activity"))
+    downloads = 1
+    tracker.add_busy_source("downloads", lambda: downloads)
+    
+    clock.now += 600
+    status = tracker.get_status()
+    assert status["idle_seconds"] == 0
+    assert status["busy"] == {"downloads": 1}
+    
+    downloads = 0
+    clock.now += 30
+    assert tracker.get_status()["idle_seconds"] == 30
@@ -0,0 +1,125 @@
+"""
+Tests for sharing downloads between identical requests.
+"""
+
+import os
+
+import pytest
+
+from src.models.download_job import DownloadJob, JobStatus, remove_job_listener
+from src.models.download_request import DownloadRequest
+from src.services import artifact_store as artifact_store_module
+from src.services.artifact_store import ArtifactStore
+
+SIZE = 4096
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    yield store
+    remove_job_listener(store._on_job_changed)
+
+
+def _request():
+    return DownloadRequest(url=URL, format="video")
+
+
+def _leader(store):
+    """A job downloading the artifact for _request()."""
+    job = DownloadJob(request_id="request-1")
+    assert not store.attach(_request(), job)
+    store.register_leader(job)
+    return job
+
+
+def _complete(job, tmp_path):
+    job_dir = tmp_path / job.id
+    job_dir.mkdir()
+    path = job_dir / "video.mp4"
+    path.write_bytes(b"x" * SIZE)
+    job.mark_completed(str(path), SIZE)
+
+
+def test_completed_artifact_is_reused_through_hard_links(store, tmp_path):
+    leader = _leader(store)
+    _complete(leader, tmp_path)
+    
+    job = DownloadJob(request_id="request-2")
+    assert store.attach(_request(), job)
+    
+    assert job.status == JobStatus.COMPLETED
+    assert job.file_path == str(tmp_path / job.id / "video.mp4")
+    assert os.stat(job.file_path).st_ino == os.stat(leader.file_path).st_ino
+    assert store.get_stats()["reused"] == 1
+    assert store.get_stats()["bytes_saved"] == SIZE
+
+
+def test_reuse_shares_the_leaders_path_when_linking_fails(store, tmp_path, monkeypatch):
+    leader = _leader(store)
+    _complete(leader, tmp_path)
+    
+    def cross_device(source, target):
+        raise OSError(18, "Invalid cross-device link")
+    
+    monkeypatch.setattr(artifact_store_module.os, "link", cross_device)
+    job = DownloadJob(request_id="request-2")
+    assert store.attach(_request(), job)
+    
+    assert job.status == JobStatus.COMPLETED
+    assert job.file_path == leader.file_path
+
+
+def test_follower_mirrors_a_running_leader_and_gets_its_files(store, tmp_path):
+    leader = _leader(store)
+    follower = DownloadJob(request_id="request-2")
+    assert store.attach(_request(), follower)
+    assert store.get_stats()["followers"] == 1
+    
+    leader.update_progress(0, JobStatus.PROCESSING)
+    leader.update_transfer(1024, SIZE, 512.0, 6, progress=25)
+    assert follower.status == JobStatus.PROCESSING
+    assert follower.progress == 25
+    assert follower.downloaded_bytes == 1024
+    
+    _complete(leader, tmp_path)
+    assert follower.status == JobStatus.COMPLETED
+    assert follower.file_path == str(tmp_path / follower.id / "video.mp4")
+    assert store.get_stats()["inflight"] == 0
+    assert store.get_stats()["followers"] == 0
+
+
+def test_follower_fails_with_its_leader(store):
+    leader = _leader(store)
+    follower = DownloadJob(request_id="request-2")
+    assert store.attach(_request(), follower)
+    
+    leader.mark_failed("Video unavailable")
+    
+    assert follower.status == JobStatus.FAILED
+    assert follower.error_message == "Video unavailable"
+    
+    # The next request downloads again rather than following a dead leader
+    assert not store.attach(_request(), DownloadJob(request_id="request-3"))
+
+
+def test_deleted_leader_files_are_downloaded_again(store, tmp_path):
+    leader = _leader(store)
+    _complete(leader, tmp_path)
+    os.remove(leader.file_path)
+    
+    job = DownloadJob(request_id="request-2")
+    assert not store.attach(_request(), job)
+    assert job.status == JobStatus.PENDING
+    assert store.get_stats()["artifacts"] == 0
+
+
+def test_expired_leader_is_no_longer_handed_out(store, tmp_path):
+    leader = _leader(store)
+    _complete(leader, tmp_path)
+    
+    leader.mark_expired()
+    
+    assert store.get_stats()["artifacts"] == 0
+    assert not store.attach(_request(), DownloadJob(request_id="request-2"))
@@ -0,0 +1,171 @@
+"""
+Tests for playlist batch fan-out.
+"""
+
+import asyncio
+
+from src.models.batch_request import BatchRequest
+from src.models.download_job import JobStatus
+from src.services import batch_service as batch_module
+from src.services.batch_service import BatchService
+from src.services.download_scheduler import SchedulerFullError
+from src.services.file_service import FileService
+
+PLAYLIST_URL = "https://www.youtube.com/playlist?list=PL0123456789"
+
+
+def _entries(count):
+    return [{"ie_key": "Youtube", "id": f"video{index:05d}"} for index in range(count)]
+
+
+class FakeYtDlpService:
+    """Lists a fixed playlist, one entry per event loop iteration."""
+    
+    def __init__(self, entries):
+        self.entries = entries
+    
+    async def expand_playlist(self, url, on_entry):
+        for entry in self.entries:
+            on_entry(entry)
+            await asyncio.sleep(0)
+
+
+class FakeScheduler:
+    """Records admitted children; can refuse the first few as full."""
+    
+    def __init__(self, refuse=0):
+        self.refuse = refuse
+        self.jobs = []
+        self.running = []
+        self.peak = 0
+    
+    def enqueue(self, request, job):
+        if self.refuse:
+            self.refuse -= 1
+            raise SchedulerFullError("full")
+        self.jobs.append(job)
+        self.running.append(job)
+        self.peak = max(self.peak, len(self.running))
+        return len(self.running)
+    
+    async def finish_all(self, fail_every=0):
+        """Complete admitted children as they arrive."""
+        finished = 0
+        while self.running:
+            job = self.running.pop(0)
+            finished += 1
+            if fail_every and finished % fail_every == 0:
+                job.mark_failed("boom")
+            else:
+                job.mark_completed(f"/tmp/{job.id}.mp4", 1)
+            await asyncio.sleep(0)
+
+
+def _service(scheduler, entries, tmp_path, **kwargs):
+    return BatchService(
+        scheduler.enqueue,
+        FakeYtDlpService(entries),
+        file_service=FileService(str(tmp_path)),
+        **kwargs
+    )
+
+
+async def _drain(service, batch, scheduler, **kwargs):
+    while not batch.is_finished():
+        await scheduler.finish_all(**kwargs)
+        await asyncio.sleep(0)
+
+
+def test_children_in_flight_never_exceed_max_parallel(tmp_path):
+    async def scenario():
+        scheduler = FakeScheduler()
+        service = _service(scheduler, _entries(20), tmp_path, max_parallel=3)
+        batch = service.create_batch(BatchRequest(url=PLAYLIST_URL, format="video"))
+        
+        # Nothing finishes yet: expansion stalls once three children are admitted
+        for _ in range(50):
+            await asyncio.sleep(0)
+        admitted_while_blocked = len(scheduler.jobs)
+        
+        await asyncio.wait_for(_drain(service, batch, scheduler), 5)
+        return batch, scheduler, admitted_while_blocked
+    
+    batch, scheduler, admitted_while_blocked = asyncio.run(scenario())
+    assert admitted_while_blocked == 3
+    assert scheduler.peak == 3
+    assert batch.total == 20
+    assert batch.completed == 20
+    assert batch.status == JobStatus.COMPLETED
+
+
+def test_request_max_parallel_and_max_entries(tmp_path):
+    async def scenario():
+        scheduler = FakeScheduler()
+        service = _service(scheduler, _entries(20), tmp_path, max_parallel=5, max_entries=100)
+        batch = service.create_batch(BatchRequest(url=PLAYLIST_URL, format="video", max_parallel=2, max_entries=7))
+        for _ in range(50):
+            await asyncio.sleep(0)
+        await asyncio.wait_for(_drain(service, batch, scheduler), 5)
+        return batch, scheduler
+    
+    batch, scheduler = asyncio.run(scenario())
+    assert scheduler.peak == 2
+    assert batch.total == 7
+    assert len(scheduler.jobs) == 7
+
+
+def test_service_max_entries_caps_request(tmp_path):
+    async def scenario():
+        scheduler = FakeScheduler()
+        service = _service(scheduler, _entries(20), tmp_path, max_entries=4)
+        batch = service.create_batch(BatchRequest(url=PLAYLIST_URL, format="video", max_entries=10))
+        await asyncio.wait_for(_drain(service, batch, scheduler), 5)
+        return batch
+    
+    assert asyncio.run(scenario()).total == 4
+
+
+def test_non_video_entries_are_skipped_and_failures_recorded(tmp_path):
+    entries = _entries(4) + [{"ie_key": "YoutubeTab", "url": "https://www.youtube.com/channel/abc"}]
+    
+    async def scenario():
+        scheduler = FakeScheduler()
+        service = _service(scheduler, entries, tmp_path, max_parallel=2)
+        batch = service.create_batch(BatchRequest(url=PLAYLIST_URL, format="video"))
+        await asyncio.wait_for(_drain(service, batch, scheduler, fail_every=2), 5)
+        return batch
+    
+    batch = asyncio.run(scenario())
+    assert batch.skipped == 1
+    assert batch.total == 4
+    assert (batch.completed, batch.failed) == (2, 2)
+    assert [failure["error"] for failure in batch.failures] == ["boom", "boom"]
+    assert batch.status == JobStatus.COMPLETED
+
+
+def test_full_scheduler_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_module, "ADMIT_RETRY_INTERVAL", 0)
+    
+    async def scenario():
+        scheduler = FakeScheduler(refuse=3)
+        service = _service(scheduler, _entries(2), tmp_path)
+        batch = service.create_batch(BatchRequest(url=PLAYLIST_URL, format="video"))
+        await asyncio.wait_for(_drain(service, batch, scheduler), 5)
+        return batch, scheduler
+    
+    batch, scheduler = asyncio.run(scenario())
+    assert len(scheduler.jobs) == 2
+    assert batch.completed == 2
+
+
+def test_empty_playlist_fails(tmp_path):
+    async def scenario():
+        scheduler = FakeScheduler()
+        service = _service(scheduler, [], tmp_path)
+        batch = service.create_batch(BatchRequest(url=PLAYLIST_URL, format="video"))
+        await asyncio.wait_for(_drain(service, batch, scheduler), 5)
+        return batch
+    
+    batch = asyncio.run(scenario())
+    assert batch.status == JobStatus.FAILED
+    assert batch.error_message == "No downloadable videos found"
@@ -0,0 +1,53 @@
+"""
+Tests for what importing the app builds before startup.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Generous ceiling on importing the app, in milliseconds; slow machines
+# can raise it
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "3000"))
+
+_IMPORT_SNIPPET = """
+import src.main
+from src.services import file_service, ytdlp_service
+print(file_service._file_service is None, ytdlp_service._ytdlp_service is None)
+"""
+
+_TIMED_IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import src.main
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def _run_fresh(snippet: str, cwd: Path) -> str:
+    """Run a snippet in a new interpreter and return its output."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")]))
+    env["JOB_STORAGE_BACKEND"] = "memory"
+    
+    return subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+
+
+def test_import_does_not_build_file_or_ytdlp_service(tmp_path):
+    output = _run_fresh(_IMPORT_SNIPPET, tmp_path)
+    assert output.split() == ["True", "True"]
+
+
+def test_import_stays_within_budget(tmp_path):
+    elapsed_ms = float(_run_fresh(_TIMED_IMPORT_SNIPPET, tmp_path))
+    assert elapsed_ms < IMPORT_BUDGET_MS, f"Importing the app took {elapsed_ms:.0f} ms"
@@ -0,0 +1,142 @@
+"""
+Tests for disk accounting of hard-linked artifacts and eviction.
+"""
+
+import asyncio
+import os
+from collections import namedtuple
+
+import pytest
+
+from src.models.download_job import DownloadJob, JobStatus
+from src.models.download_request import DownloadRequest
+from src.services.disk_sweeper import DiskSweeper
+from src.services.file_service import FileService
+from src.services.storage_governor import StorageFullError, StorageGovernor
+from src.storage.job_storage import get_job, save_job
+
+SIZE = 64 * 1024
+DiskUsage = namedtuple("DiskUsage", "total used free")
+
+
+def _completed_job(base_dir, link_from=None):
+    """A completed job whose file is new, or hard-linked from another job's."""
+    job = DownloadJob(request_id="request-1")
+    job_dir = base_dir / job.id
+    job_dir.mkdir()
+    path = job_dir / "video.mp4"
+    if link_from is None:
+        path.write_bytes(b"x" * SIZE)
+    else:
+        os.link(link_from.file_path, path)
+    job.mark_completed(str(path), SIZE)
+    save_job(job)
+    return job
+
+
+def test_hard_linked_files_count_once(tmp_path):
+    sweeper = DiskSweeper(str(tmp_path))
+    leader = _completed_job(tmp_path)
+    follower = _completed_job(tmp_path, link_from=leader)
+    sweeper.refresh(leader.id)
+    sweeper.refresh(follower.id)
+    
+    assert sweeper.total_bytes == SIZE
+    assert sweeper.get_directory_size(leader.id) == 0
+    assert sweeper.get_directory_size(follower.id) == 0
+    assert sweeper.get_freeable_bytes([leader.id]) == 0
+    assert sweeper.get_freeable_bytes([leader.id, follower.id]) == SIZE
+
+
+def test_last_link_becomes_freeable(tmp_path):
+    sweeper = DiskSweeper(str(tmp_path))
+    leader = _completed_job(tmp_path)
+    follower = _completed_job(tmp_path, link_from=leader)
+    sweeper.refresh(leader.id)
+    sweeper.refresh(follower.id)
+    
+    os.remove(leader.file_path)
+    os.rmdir(tmp_path / leader.id)
+    sweeper.refresh(leader.id)
+    
+    assert sweeper.total_bytes == SIZE
+    assert sweeper.get_directory_size(follower.id) == SIZE
+
+
+def test_sweep_frees_shared_bytes_once(tmp_path):
+    sweeper = DiskSweeper(str(tmp_path))
+    leader = _completed_job(tmp_path)
+    _completed_job(tmp_path, link_from=leader)
+    
+    async def sweep():
+        await sweeper.sweep(max_age_hours=24)
+        measured = sweeper.total_bytes
+        await sweeper.sweep(max_age_hours=-1)
+        return measured
+    
+    try:
+        measured = asyncio.run(sweep())
+    finally:
+        sweeper.close()
+    
+    assert measured == SIZE
+    assert sweeper.bytes_freed == SIZE
+    assert sweeper.total_bytes == 0
+
+
+@pytest.fixture
+def governor(tmp_path, monkeypatch):
+    sweeper = DiskSweeper(str(tmp_path))
+    governor = StorageGovernor(
+        file_service=FileService(str(tmp_path)),
+        high_watermark=0.9,
+        low_watermark=0.8,
+        disk_sweeper=sweeper
+    )
+    monkeypatch.setattr(governor, "estimate_size", lambda request: 10 * SIZE)
+    yield governor
+    sweeper.close()
+
+
+def _fill_disk(governor, monkeypatch, used):
+    usage = DiskUsage(100 * SIZE, used, 100 * SIZE - used)
+    monkeypatch.setattr(governor, "_disk_usage", lambda: (usage.total, usage.used))
+    monkeypatch.setattr("src.services.storage_governor.shutil.disk_usage", lambda path: usage)
+
+
+def test_admission_counts_linked_copies_once(governor, tmp_path, monkeypatch):
+    leader = _completed_job(tmp_path)
+    followers = [_completed_job(tmp_path, link_from=leader) for _ in range(20)]
+    for job in [leader] + followers:
+        governor.disk_sweeper.refresh(job.id)
+        governor.track(job)
+    
+    assert governor.get_stats()["evictable_bytes"] == SIZE
+    
+    # 85 + 10 is over the 90 limit, and evicting every copy frees only one
+    _fill_disk(governor, monkeypatch, 85 * SIZE)
+    request = DownloadRequest(url="https://www.youtube.com/watch?v=dQw4w9WgXcQ", format="video")
+    with pytest.raises(StorageFullError):
+        governor.admit(request, DownloadJob(request_id=request.id))
+    assert governor.refused == 1
+
+
+def test_eviction_only_counts_released_bytes(governor, tmp_path, monkeypatch):
+    leader = _completed_job(tmp_path)
+    follower = _completed_job(tmp_path, link_from=leader)
+    other = _completed_job(tmp_path)
+    for job in (leader, follower, other):
+        governor.disk_sweeper.refresh(job.id)
+        governor.track(job)
+    
+    # Freeing a single file's worth is enough to reach the low watermark
+    _fill_disk(governor, monkeypatch, 80 * SIZE + 1)
+    asyncio.run(governor._evict())
+    
+    # The leader's copy freed nothing, so eviction went on to the next job
+    assert governor.bytes_evicted == SIZE
+    assert governor.evicted == 2
+    assert get_job(leader.id).status == JobStatus.EXPIRED
+    assert get_job(follower.id).status == JobStatus.EXPIRED
+    assert get_job(other.id).status == JobStatus.COMPLETED
+    assert governor.disk_sweeper.total_bytes == SIZE
@@ -0,0 +1,87 @@
+"""
+Tests for download scheduler accounting of jobs handed to post-processing.
+"""
+
+import asyncio
+
+import pytest
+
+from src.models.download_job import DownloadJob, JobStatus
+from src.models.download_request import DownloadRequest
+from src.services.download_scheduler import DownloadScheduler, SchedulerFullError
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def _request():
+    return DownloadRequest(url=URL, format="audio_mp3", user_id="alice")
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_handed_off_job_counts_once_finished():
+    handed = []
+    
+    async def handler(request, job):
+        # Leave the job PROCESSING, as when the pool takes over the conversion
+        handed.append(job)
+    
+    async def scenario():
+        scheduler = DownloadScheduler(handler, worker_count=1, max_jobs_per_user=1)
+        await scheduler.start()
+        try:
+            scheduler.submit(_request(), DownloadJob(request_id="request-1"))
+            await _settle()
+            
+            stats = scheduler.get_stats()
+            assert stats["active_workers"] == 0
+            assert stats["handed_off"] == 1
+            assert stats["completed"] == 0
+            assert handed[0].status == JobStatus.PROCESSING
+            
+            # Still converting, so it counts against the user's limit
+            with pytest.raises(SchedulerFullError):
+                scheduler.submit(_request(), DownloadJob(request_id="request-2"))
+            
+            handed[0].mark_completed("/downloads/audio.mp3", 1024)
+            scheduler.finish(handed[0])
+            scheduler.finish(handed[0])
+            
+            stats = scheduler.get_stats()
+            assert stats["handed_off"] == 0
+            assert stats["completed"] == 1
+            assert stats["failed"] == 0
+            scheduler.submit(_request(), DownloadJob(request_id="request-3"))
+            await _settle()
+            
+            handed[1].mark_failed("conversion failed")
+            scheduler.finish(handed[1])
+            assert scheduler.get_stats()["failed"] == 1
+        finally:
+            await scheduler.stop()
+    
+    asyncio.run(scenario())
+
+
+def test_finished_job_releases_the_worker_and_user():
+    async def handler(request, job):
+        job.mark_completed("/downloads/video.mp4", 1024)
+    
+    async def scenario():
+        scheduler = DownloadScheduler(handler, worker_count=1, max_jobs_per_user=1)
+        await scheduler.start()
+        try:
+            scheduler.submit(_request(), DownloadJob(request_id="request-1"))
+            await _settle()
+            scheduler.submit(_request(), DownloadJob(request_id="request-2"))
+            await _settle()
+            return scheduler.get_stats()
+        finally:
+            await scheduler.stop()
+    
+    stats = asyncio.run(scenario())
+    assert stats["completed"] == 2
+    assert stats["handed_off"] == 0
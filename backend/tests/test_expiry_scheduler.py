@@ -0,0 +1,134 @@
+"""
+Tests for expiring and purging jobs on time.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.download_job import DownloadJob, JobStatus, remove_job_listener
+from src.services import expiry_scheduler as expiry_scheduler_module
+from src.services.disk_sweeper import DiskSweeper
+from src.services.expiry_scheduler import ExpiryScheduler
+from src.services.file_service import FileService
+from src.storage.job_storage import delete_job, get_job, save_job
+
+GRACE = 60
+
+
+class FakeClock:
+    """Stands in for the time module; only advances when told to."""
+    
+    def __init__(self, now: float):
+        self.now = now
+    
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock((datetime.utcnow() - datetime(1970, 1, 1)).total_seconds())
+    monkeypatch.setattr(expiry_scheduler_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    scheduler = ExpiryScheduler(FileService(str(tmp_path)), GRACE, DiskSweeper(str(tmp_path)))
+    yield scheduler
+    remove_job_listener(scheduler._on_job_changed)
+
+
+def _job(tmp_path, clock, status=JobStatus.COMPLETED):
+    """A saved job with files on disk, expiring 10 seconds from now."""
+    job = DownloadJob(request_id="request-1")
+    job.expires_at = datetime(1970, 1, 1) + timedelta(seconds=clock.now + 10)
+    (tmp_path / job.id).mkdir()
+    (tmp_path / job.id / "video.mp4").write_bytes(b"x")
+    if status == JobStatus.COMPLETED:
+        job.mark_completed(str(tmp_path / job.id / "video.mp4"), 1)
+    else:
+        job.update_progress(10, status)
+    save_job(job)
+    return job
+
+
+async def _advance(scheduler, clock, seconds):
+    """Move the clock on and let the timer process whatever became due."""
+    clock.now += seconds
+    scheduler._wakeup.set()
+    for _ in range(20):
+        await asyncio.sleep(0.01)
+
+
+def test_job_is_expired_then_purged_after_the_grace_period(scheduler, clock, tmp_path):
+    job = _job(tmp_path, clock)
+    
+    async def scenario():
+        scheduler.load([job])
+        await scheduler.start()
+        try:
+            await _advance(scheduler, clock, 5)
+            assert get_job(job.id).status == JobStatus.COMPLETED
+            
+            await _advance(scheduler, clock, 6)
+            assert get_job(job.id).status == JobStatus.EXPIRED
+            assert not (tmp_path / job.id).exists()
+            assert scheduler.get_stats()["next_deadline"] == pytest.approx(clock.now - 1 + GRACE)
+            assert scheduler.purged == 0
+            
+            await _advance(scheduler, clock, GRACE)
+            assert get_job(job.id) is None
+            assert (scheduler.expired, scheduler.purged) == (1, 1)
+        finally:
+            await scheduler.stop()
+    
+    asyncio.run(scenario())
+
+
+def test_running_job_is_rechecked_instead_of_expired(scheduler, clock, tmp_path):
+    job = _job(tmp_path, clock, status=JobStatus.PROCESSING)
+    
+    async def scenario():
+        scheduler.load([job])
+        await scheduler.start()
+        try:
+            await _advance(scheduler, clock, 11)
+            assert get_job(job.id).status == JobStatus.PROCESSING
+            assert (tmp_path / job.id).exists()
+            assert scheduler.get_stats()["next_deadline"] == pytest.approx(
+                clock.now + expiry_scheduler_module._RUNNING_RECHECK_SECONDS
+            )
+            
+            job.mark_completed(str(tmp_path / job.id / "video.mp4"), 1)
+            save_job(job)
+            await _advance(scheduler, clock, expiry_scheduler_module._RUNNING_RECHECK_SECONDS)
+            # The grace period has also passed by the recheck, so it is purged too
+            assert scheduler.get_stats()["expired"] == 1
+            assert not (tmp_path / job.id).exists()
+        finally:
+            await scheduler.stop()
+            delete_job(job.id)
+    
+    asyncio.run(scenario())
+
+
+def test_repeated_job_changes_keep_one_heap_entry(scheduler, clock, tmp_path):
+    job = _job(tmp_path, clock, status=JobStatus.PROCESSING)
+    try:
+        for progress in range(20, 100, 10):
+            job.update_progress(progress)
+        
+        stats = scheduler.get_stats()
+        assert stats["scheduled"] == 1
+        assert stats["heap_size"] == 1
+        
+        # A new deadline supersedes the old entry, which is skipped when popped
+        job.expires_at += timedelta(hours=1)
+        job.update_progress(100)
+        assert scheduler.get_stats()["heap_size"] == 2
+        assert scheduler.get_stats()["scheduled"] == 1
+    finally:
+        delete_job(job.id)
@@ -0,0 +1,117 @@
+"""
+Tests for choosing the formats a video download fetches.
+"""
+
+from src.models.download_request import DownloadRequest
+from src.models.video_metadata import FormatInfo, VideoMetadata
+from src.services.format_planner import FormatPlanner
+
+DURATION = 600
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+# (format_id, ext, height, vcodec, acodec, kbit/s)
+_FORMATS = [
+    ("140", "m4a", None, None, "mp4a.40.2", 130),
+    ("251", "webm", None, None, "opus", 135),
+    ("18", "mp4", 360, "avc1.42001E", "mp4a.40.2", 600),
+    ("134", "mp4", 360, "avc1.4d401e", None, 400),
+    ("136", "mp4", 720, "avc1.4d401f", None, 1500),
+    ("247", "webm", 720, "vp9", None, 1200),
+    ("398", "mp4", 720, "av01.0.05M.08", None, 900),
+    ("399", "mp4", 1080, "av01.0.08M.08", None, 1700),
+]
+
+
+def _bytes(*kbits):
+    return int(sum(kbits) * 1000 / 8 * DURATION)
+
+
+def _metadata(formats=_FORMATS, extra=()):
+    return VideoMetadata(
+        url=URL,
+        title="Test video",
+        duration=DURATION,
+        thumbnail_url="https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg",
+        uploader="Test",
+        view_count=0,
+        upload_date="20240101",
+        formats=[
+            FormatInfo(format_id=format_id, ext=ext, height=height, vcodec=vcodec, acodec=acodec, tbr=tbr, protocol="https")
+            for format_id, ext, height, vcodec, acodec, tbr in formats
+        ] + list(extra)
+    )
+
+
+def _request(**kwargs):
+    return DownloadRequest(url=URL, format="video", **kwargs)
+
+
+def test_smallest_pair_at_the_tallest_allowed_height():
+    planner = FormatPlanner(default_max_height=720)
+    plan = planner.plan(_request(), _metadata())
+    
+    # Same height, so the fewest bytes win; mp4 video pairs with m4a audio
+    assert plan.format_ids == ("398", "140")
+    assert plan.merge
+    assert plan.estimated_size == _bytes(900, 130)
+    assert plan.selector == "398+140/" + planner.fallback_selector(720)
+    assert planner.merged == 1
+
+
+def test_single_file_beats_a_smaller_pair_of_the_same_height():
+    planner = FormatPlanner(default_max_height=720)
+    plan = planner.plan(_request(max_height=360), _metadata())
+    
+    assert plan.format_ids == ("18",)
+    assert not plan.merge
+    assert plan.estimated_size == _bytes(600)
+    assert planner.single == 1
+
+
+def test_preferred_codec_wins_over_size():
+    planner = FormatPlanner(default_max_height=720)
+    
+    assert planner.plan(_request(preferred_codec="h264"), _metadata()).format_ids == ("136", "140")
+    assert planner.plan(_request(preferred_codec="vp9"), _metadata()).format_ids == ("247", "251")
+
+
+def test_size_limit_drops_to_a_lower_height():
+    planner = FormatPlanner(default_max_height=720)
+    request = _request(max_height=1080, max_filesize=_bytes(1100))
+    plan = planner.plan(request, _metadata())
+    
+    assert plan.format_ids == ("398", "140")
+    assert planner.estimate_size(request, _metadata()) == plan.estimated_size
+
+
+def test_storyboards_are_never_chosen():
+    storyboard = FormatInfo(format_id="sb0", ext="mhtml", height=90, vcodec="none", acodec=None, protocol="mhtml")
+    planner = FormatPlanner(default_max_height=720)
+    plan = planner.plan(_request(max_height=144), _metadata(formats=_FORMATS[:2], extra=[storyboard]))
+    
+    assert plan.format_ids == ()
+    assert planner.fallback == 1
+
+
+def test_fallback_selector_without_a_format_index():
+    planner = FormatPlanner(default_max_height=720)
+    plan = planner.plan(_request(max_height=480, max_filesize=1000, preferred_codec="h264"))
+    
+    assert plan.format_ids == ()
+    assert plan.estimated_size is None
+    assert not plan.merge
+    assert plan.selector == (
+        "bestvideo[height<=480][filesize<=?1000][vcodec^=avc1]+bestaudio"
+        "/bestvideo[height<=480][filesize<=?1000]+bestaudio"
+        "/best[height<=480][filesize<=?1000]"
+    )
+    assert planner.estimate_size(_request(), _metadata(formats=[])) is None
+
+
+def test_nothing_under_the_size_limit_falls_back():
+    planner = FormatPlanner(default_max_height=720)
+    plan = planner.plan(_request(max_filesize=1000), _metadata())
+    
+    assert plan.format_ids == ()
+    assert plan.selector == planner.fallback_selector(720, 1000)
+    assert planner.get_stats() == {"single": 0, "merged": 0, "fallback": 1, "default_max_height": 720}
@@ -0,0 +1,102 @@
+"""
+Tests for conditional and long-polling job status requests.
+"""
+
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api import status
+from src.models.download_job import DownloadJob, JobStatus
+from src.services.job_waiter import job_waiter
+from src.storage.job_storage import delete_job, save_job
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(status.router, prefix="/api")
+    return TestClient(app, base_url="http://localhost")
+
+
+@pytest.fixture
+def job():
+    job = DownloadJob(request_id="request")
+    save_job(job)
+    yield job
+    delete_job(job.id)
+
+
+def _change_later(job, delay):
+    """Update and save a job from another thread after a delay."""
+    def change():
+        job.update_progress(50, JobStatus.PROCESSING)
+        save_job(job)
+    
+    timer = threading.Timer(delay, change)
+    timer.start()
+    return timer
+
+
+def test_matching_etag_answers_not_modified(client, job):
+    first = client.get("/api/status", params={"ids": job.id})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    
+    cached = client.get("/api/status", params={"ids": job.id}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+    
+    single = client.get(f"/api/status/{job.id}", headers={"If-None-Match": f"W/{etag}"})
+    assert single.status_code == 304
+    
+    job.update_progress(10, JobStatus.PROCESSING)
+    save_job(job)
+    changed = client.get("/api/status", params={"ids": job.id}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["jobs"][0]["progress"] == 10
+
+
+def test_long_poll_returns_as_soon_as_a_job_is_saved(client, job):
+    etag = client.get("/api/status", params={"ids": job.id}).headers["etag"]
+    woken = job_waiter.woken
+    
+    # The change lands on a thread other than the one serving the request
+    timer = _change_later(job, 0.2)
+    started = time.monotonic()
+    try:
+        response = client.get(
+            "/api/status",
+            params={"ids": job.id, "wait": 30},
+            headers={"If-None-Match": etag}
+        )
+    finally:
+        timer.join()
+    
+    assert time.monotonic() - started < 10
+    assert response.status_code == 200
+    assert response.json()["jobs"][0]["progress"] == 50
+    assert job_waiter.woken == woken + 1
+    assert job_waiter.waiting == 0
+
+
+def test_long_poll_times_out_when_nothing_changes(client, job):
+    etag = client.get("/api/status", params={"ids": job.id}).headers["etag"]
+    timed_out = job_waiter.timed_out
+    
+    started = time.monotonic()
+    response = client.get(
+        "/api/status",
+        params={"ids": job.id, "wait": 0.2},
+        headers={"If-None-Match": etag}
+    )
+    
+    assert time.monotonic() - started >= 0.2
+    assert response.status_code == 304
+    assert job_waiter.timed_out == timed_out + 1
+    assert job_waiter.get_stats()["watched_jobs"] == 0
@@ -0,0 +1,115 @@
+"""
+Tests for single-flight metadata loads.
+"""
+
+import asyncio
+
+import pytest
+
+from src.models.video_metadata import VideoMetadata
+from src.services.metadata_cache import MetadataCache
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def _metadata():
+    return VideoMetadata(
+        url=URL,
+        title="Test video",
+        duration=60,
+        thumbnail_url="https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg",
+        uploader="Test",
+        view_count=0,
+        upload_date="20240101"
+    )
+
+
+class SlowLoader:
+    """Loader that blocks until released, counting its calls."""
+    
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+    
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return _metadata()
+
+
+def test_concurrent_callers_share_one_load():
+    async def scenario():
+        cache = MetadataCache()
+        loader = SlowLoader()
+        callers = [asyncio.create_task(cache.get_or_load(URL, loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        results = await asyncio.gather(*callers)
+        return cache, loader, results
+    
+    cache, loader, results = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert cache.coalesced == 2
+    assert all(result.title == "Test video" for result in results)
+
+
+def test_followers_retry_when_the_leading_caller_is_cancelled():
+    async def scenario():
+        cache = MetadataCache()
+        loader = SlowLoader()
+        leader = asyncio.create_task(cache.get_or_load(URL, loader))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_load(URL, loader))
+        await asyncio.sleep(0)
+        
+        # e.g. the leading request's client disconnected
+        leader.cancel()
+        await asyncio.sleep(0)
+        loader.release.set()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return loader, await follower
+    
+    loader, metadata = asyncio.run(scenario())
+    assert metadata.title == "Test video"
+    assert loader.calls == 2
+
+
+def test_cancelled_follower_leaves_the_load_running():
+    async def scenario():
+        cache = MetadataCache()
+        loader = SlowLoader()
+        leader = asyncio.create_task(cache.get_or_load(URL, loader))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_load(URL, loader))
+        await asyncio.sleep(0)
+        
+        follower.cancel()
+        await asyncio.sleep(0)
+        loader.release.set()
+        
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return loader, await leader
+    
+    loader, metadata = asyncio.run(scenario())
+    assert metadata.title == "Test video"
+    assert loader.calls == 1
+
+
+def test_loader_errors_reach_every_caller_once():
+    async def scenario():
+        cache = MetadataCache()
+        loader = SlowLoader(error=RuntimeError("Video unavailable"))
+        callers = [asyncio.create_task(cache.get_or_load(URL, loader)) for _ in range(2)]
+        await asyncio.sleep(0)
+        loader.release.set()
+        return loader, await asyncio.gather(*callers, return_exceptions=True)
+    
+    loader, results = asyncio.run(scenario())
+    assert loader.calls == 1
+    assert [str(result) for result in results] == ["Video unavailable", "Video unavailable"]
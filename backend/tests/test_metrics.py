@@ -0,0 +1,110 @@
+"""
+Tests for the /metrics endpoint under load.
+"""
+
+import asyncio
+import re
+
+import httpx
+
+_TYPE = re.compile(r"^# TYPE ([a-zA-Z_:][a-zA-Z0-9_:]*) (counter|gauge|histogram)$")
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_]+="(?:[^"\\]|\\.)*",?)*\})? (\S+)$')
+
+DOWNLOADS = 12
+
+
+def parse_exposition(text):
+    """Parse exposition text into {series: value}, failing on anything malformed."""
+    assert text.endswith("\n")
+    declared = {}
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("#"):
+            match = _TYPE.match(line)
+            assert match, f"Malformed comment line: {line!r}"
+            assert match.group(1) not in declared, f"Metric declared twice: {match.group(1)}"
+            declared[match.group(1)] = match.group(2)
+            continue
+        
+        match = _SAMPLE.match(line)
+        assert match, f"Malformed sample line: {line!r}"
+        name, labels, value = match.groups()
+        family = re.sub(r"_(total|bucket|sum|count)$", "", name)
+        assert family in declared or name in declared, f"Sample without a TYPE line: {line!r}"
+        series = name + (labels or "")
+        assert series not in samples, f"Duplicate series: {series}"
+        samples[series] = float(value)
+    return samples
+
+
+def _check_monotonic(previous, current):
+    for series, value in current.items():
+        name = series.split("{", 1)[0]
+        if name.endswith(("_total", "_count", "_bucket")):
+            assert value >= previous.get(series, 0), f"Counter went backwards: {series}"
+
+
+def test_metrics_scrape_during_downloads(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from src import main
+    
+    async def scenario():
+        await main.startup_event()
+        try:
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+                before = parse_exposition((await client.get("/metrics")).text)
+                scrapes = []
+                done = asyncio.Event()
+                
+                async def submit():
+                    for index in range(DOWNLOADS):
+                        url = f"https://www.youtube.com/watch?v=metrics{index:04d}"
+                        # Retry while the scheduler has no room
+                        while True:
+                            response = await client.post("/api/download", json={"url": url, "format": "video"})
+                            if response.status_code != 429:
+                                break
+                            await asyncio.sleep(0.05)
+                        assert response.status_code == 200
+                    scheduler = main.download.download_scheduler
+                    while scheduler.active_workers or scheduler.queue_depth:
+                        await asyncio.sleep(0.05)
+                    done.set()
+                
+                async def scrape():
+                    previous = before
+                    while not done.is_set():
+                        response = await client.get("/metrics")
+                        assert response.status_code == 200
+                        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+                        current = parse_exposition(response.text)
+                        _check_monotonic(previous, current)
+                        scrapes.append(current)
+                        previous = current
+                        await asyncio.sleep(0.01)
+                
+                await asyncio.wait_for(asyncio.gather(submit(), scrape(), scrape()), 60)
+                after = parse_exposition((await client.get("/metrics")).text)
+                return before, scrapes, after
+        finally:
+            await main.shutdown_event()
+    
+    before, scrapes, after = asyncio.run(scenario())
+    
+    def moved(series):
+        return after.get(series, 0) - before.get(series, 0)
+    
+    assert scrapes
+    assert moved('ytdlp_scheduler_jobs_total{outcome="submitted"}') == DOWNLOADS
+    assert moved('ytdlp_scheduler_jobs_total{outcome="completed"}') == DOWNLOADS
+    assert moved('ytdlp_downloads_total{format="video",status="completed"}') == DOWNLOADS
+    # Downloads admitted and then turned away by a full scheduler are withdrawn
+    admitted = moved('ytdlp_storage_admissions_total{decision="admitted"}')
+    assert admitted - moved('ytdlp_storage_admissions_total{decision="withdrawn"}') == DOWNLOADS
+    assert moved('ytdlp_download_duration_seconds_count{format="video"}') == DOWNLOADS
+    assert moved("ytdlp_downloaded_bytes_total") > 0
+    assert after["ytdlp_queue_depth"] == 0
+    assert after["ytdlp_download_workers_active"] == 0
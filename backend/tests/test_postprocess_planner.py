@@ -0,0 +1,110 @@
+"""
+Tests for choosing how audio downloads are converted.
+"""
+
+import pytest
+
+from src.models.download_request import DownloadRequest
+from src.models.video_metadata import FormatInfo, VideoMetadata
+from src.services.postprocess_planner import PostprocessPlanner
+
+DURATION = 600
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+_OPUS = FormatInfo(format_id="251", ext="webm", acodec="opus", tbr=135, asr=48000, audio_channels=2)
+_AAC = FormatInfo(format_id="140", ext="m4a", acodec="mp4a.40.2", tbr=130, asr=44100, audio_channels=2)
+_VIDEO = FormatInfo(format_id="18", ext="mp4", vcodec="avc1.42001E", acodec="mp4a.40.2", tbr=600)
+
+
+def _metadata(*formats):
+    return VideoMetadata(
+        url=URL,
+        title="Test video",
+        duration=DURATION,
+        thumbnail_url="https://i.ytimg.com/vi/dQw4w9WgXcQ/hqdefault.jpg",
+        uploader="Test",
+        view_count=0,
+        upload_date="20240101",
+        formats=list(formats)
+    )
+
+
+def _request(format):
+    return DownloadRequest(url=URL, format=format)
+
+
+def test_mp3_source_is_copied_without_encoding():
+    mp3 = FormatInfo(format_id="mp3-128", ext="mp3", acodec="mp3", tbr=128)
+    planner = PostprocessPlanner(encode_speed=40)
+    plan = planner.plan(_request("audio_mp3"), _metadata(_OPUS, mp3, _VIDEO))
+    
+    assert plan.action == "copy"
+    assert plan.source is mp3
+    assert plan.codec_args() is None
+    assert plan.fetch_args == ["-f", "mp3-128/bestaudio"]
+    assert plan.cpu_seconds_saved == 15.0
+    assert planner.get_stats()["cpu_seconds_saved"] == 15.0
+
+
+def test_mp3_in_another_container_is_remuxed():
+    mp3 = FormatInfo(format_id="mp3-mp4", ext="mp4", acodec="mp3", tbr=128)
+    plan = PostprocessPlanner().plan(_request("audio_mp3"), _metadata(mp3))
+    
+    assert plan.action == "remux"
+    assert plan.codec_args() == ["-c:a", "copy"]
+
+
+def test_mp3_encode_uses_smallest_bitrate_above_the_source():
+    planner = PostprocessPlanner()
+    plan = planner.plan(_request("audio_mp3"), _metadata(_AAC, _OPUS, _VIDEO))
+    
+    # The video's own audio track is never a source
+    assert plan.source is _OPUS
+    assert plan.action == "encode"
+    assert plan.bitrate == 160
+    assert plan.codec_args() == ["-c:a", "libmp3lame", "-b:a", "160k"]
+    assert plan.args == [
+        "-f", "251/bestaudio", "--extract-audio", "--audio-format", "mp3", "--audio-quality", "160K"
+    ]
+    assert plan.estimated_size == 160 * 1000 // 8 * DURATION
+    assert planner.actions["encode"] == 1
+
+
+@pytest.mark.parametrize("source_kbps, bitrate", [(None, None), (64, 96), (128, 128), (129, 160), (500, 320)])
+def test_choose_bitrate(source_kbps, bitrate):
+    assert PostprocessPlanner().choose_bitrate(source_kbps) == bitrate
+
+
+def test_wav_prefers_a_lossless_source():
+    flac = FormatInfo(format_id="flac", ext="flac", acodec="flac", tbr=90, asr=44100, audio_channels=2)
+    plan = PostprocessPlanner().plan(_request("audio_wav"), _metadata(_OPUS, flac))
+    
+    assert plan.source is flac
+    assert plan.action == "encode"
+    assert plan.codec_args() == ["-c:a", "pcm_s16le"]
+    assert plan.estimated_size == DURATION * 44100 * 2 * 2
+
+
+def test_pcm_wav_source_is_copied():
+    wav = FormatInfo(format_id="wav", ext="wav", acodec="pcm_s16le", tbr=1411, asr=44100, audio_channels=1)
+    plan = PostprocessPlanner().plan(_request("audio_wav"), _metadata(_AAC, wav))
+    
+    assert plan.action == "copy"
+    assert plan.estimated_size == DURATION * 44100 * 1 * 2
+
+
+def test_without_a_format_index_yt_dlp_chooses():
+    planner = PostprocessPlanner()
+    plan = planner.plan(_request("audio_mp3"))
+    
+    assert plan.action == "unplanned"
+    assert plan.source is None
+    assert plan.args == ["-f", "bestaudio", "--extract-audio", "--audio-format", "mp3"]
+    assert plan.codec_args() == ["-c:a", "libmp3lame", "-q:a", "5"]
+    assert planner.estimate_size(_request("audio_wav"), _metadata(_VIDEO)) is None
+    assert planner.actions["unplanned"] == 1
+
+
+def test_video_requests_have_no_post_processing():
+    with pytest.raises(ValueError):
+        PostprocessPlanner().plan(_request("video"), _metadata(_AAC))
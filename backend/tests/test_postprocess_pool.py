@@ -0,0 +1,117 @@
+"""
+Tests for the post-processing pool's converter limits and shutdown.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from src.api import download as download_module
+from src.models.download_job import DownloadJob, JobStatus
+from src.models.download_request import DownloadRequest
+from src.services import postprocess_pool as postprocess_pool_module
+from src.services.download_scheduler import DownloadScheduler
+from src.services.postprocess_pool import PostprocessPool, PostprocessTask
+from src.storage.job_storage import delete_job, get_job
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+_LIMITS_SNIPPET = "import os; print(os.nice(0), sorted(os.sched_getaffinity(0)))"
+
+
+def _request():
+    return DownloadRequest(url=URL, format="audio_mp3", user_id="alice")
+
+
+def _task(name):
+    return PostprocessTask(_request(), DownloadJob(request_id=name), f"/downloads/{name}.m4a", None, 0.0)
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.skipif(
+    not (shutil.which("nice") and shutil.which("taskset") and hasattr(os, "sched_getaffinity")),
+    reason="needs nice, taskset and CPU affinity"
+)
+def test_command_prefix_applies_nice_and_cpus():
+    pool = PostprocessPool(lambda task: None, nice=5, cpus="0")
+    assert pool.command_prefix == ["nice", "-n", "5", "taskset", "-c", "0"]
+    
+    output = subprocess.run(
+        [*pool.command_prefix, sys.executable, "-c", _LIMITS_SNIPPET],
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout.split(maxsplit=1)
+    assert int(output[0]) == min(os.nice(0) + 5, 19)
+    assert output[1].strip() == "[0]"
+
+
+def test_command_prefix_skips_missing_tools(monkeypatch):
+    monkeypatch.setattr(
+        postprocess_pool_module.shutil, "which", lambda name: None if name == "taskset" else f"/usr/bin/{name}"
+    )
+    assert PostprocessPool(lambda task: None, nice=10, cpus="0-1,3").command_prefix == ["nice", "-n", "10"]
+    assert PostprocessPool(lambda task: None, nice=0).command_prefix == []
+
+
+def test_stop_hands_queued_tasks_to_on_dropped():
+    dropped = []
+    
+    async def handler(task):
+        await asyncio.Event().wait()
+    
+    async def scenario():
+        pool = PostprocessPool(handler, worker_count=1, on_dropped=dropped.append)
+        await pool.start()
+        tasks = [_task(f"request-{index}") for index in range(3)]
+        for task in tasks:
+            pool.submit(task)
+        await _settle()
+        
+        await pool.stop()
+        return pool, tasks
+    
+    pool, tasks = asyncio.run(scenario())
+    assert dropped == tasks[1:]
+    assert pool.queue_depth == 0
+    assert pool.get_stats()["dropped"] == 2
+
+
+def test_dropped_job_fails_and_frees_its_scheduler_slot(monkeypatch):
+    handed = []
+    
+    async def handler(request, job):
+        handed.append(PostprocessTask(request, job, "/downloads/audio.m4a", None, 0.0))
+    
+    async def scenario():
+        scheduler = DownloadScheduler(handler, worker_count=1)
+        await scheduler.start()
+        try:
+            scheduler.submit(_request(), DownloadJob(request_id="request"))
+            await _settle()
+            assert scheduler.get_stats()["handed_off"] == 1
+            
+            monkeypatch.setattr(download_module, "download_scheduler", scheduler)
+            download_module._drop_postprocess(handed[0])
+            return scheduler.get_stats()
+        finally:
+            await scheduler.stop()
+    
+    stats = asyncio.run(scenario())
+    job = handed[0].job
+    try:
+        assert stats["handed_off"] == 0
+        assert stats["failed"] == 1
+        assert get_job(job.id).status == JobStatus.FAILED
+        assert "shut down" in get_job(job.id).error_message
+    finally:
+        delete_job(job.id)
+
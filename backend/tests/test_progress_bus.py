@@ -0,0 +1,70 @@
+"""
+Tests for the progress bus.
+"""
+
+import asyncio
+
+from src.models.download_job import DownloadJob, JobStatus
+from src.services.progress_bus import ProgressBus
+
+
+async def _collect(subscription, limit=10):
+    events = []
+    async for event in subscription:
+        events.append(event)
+        if len(events) >= limit:
+            break
+    return events
+
+
+def test_final_event_published_before_subscribing_is_not_missed():
+    async def scenario():
+        bus = ProgressBus(heartbeat_interval=0.05)
+        job = DownloadJob(request_id="request-1", status=JobStatus.PROCESSING)
+        cursor = bus.latest_event_id(job.id)
+        
+        # The job finishes between the snapshot and the subscription
+        job.mark_completed("/tmp/video.mp4", 10)
+        bus.publish_job(job)
+        
+        subscription = bus.subscribe(job.id, last_event_id=cursor, refresh=lambda: job)
+        return await asyncio.wait_for(_collect(subscription, limit=3), 1)
+    
+    events = asyncio.run(scenario())
+    assert len(events) == 1
+    assert events[0].final
+    assert events[0].data["status"] == "completed"
+
+
+def test_subscription_ends_when_job_is_gone():
+    async def scenario():
+        bus = ProgressBus(heartbeat_interval=0.05)
+        subscription = bus.subscribe("missing", refresh=lambda: None)
+        events = await asyncio.wait_for(_collect(subscription, limit=3), 1)
+        return events, bus.get_stats()
+    
+    events, stats = asyncio.run(scenario())
+    assert events == []
+    assert stats["topics"] == 0
+    assert stats["subscribers"] == 0
+
+
+def test_events_after_subscribing_are_delivered():
+    async def scenario():
+        bus = ProgressBus(heartbeat_interval=0.05)
+        job = DownloadJob(request_id="request-1", status=JobStatus.PROCESSING)
+        subscription = bus.subscribe(job.id, refresh=lambda: job)
+        collecting = asyncio.create_task(_collect(subscription))
+        await asyncio.sleep(0)
+        
+        job.progress = 50
+        bus.publish_job(job)
+        await asyncio.sleep(0)
+        job.mark_completed("/tmp/video.mp4", 10)
+        bus.publish_job(job)
+        return await asyncio.wait_for(collecting, 1)
+    
+    events = [event for event in asyncio.run(scenario()) if event is not None]
+    # Updates published in quick succession may be coalesced
+    assert events[-1].final
+    assert events[-1].data["progress"] == 100
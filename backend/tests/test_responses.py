@@ -0,0 +1,98 @@
+"""
+Tests for range-aware file responses.
+"""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.api.responses import RangeFileResponse, parse_range_header
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(CONTENT)
+    
+    app = FastAPI()
+    
+    @app.api_route("/file", methods=["GET", "HEAD"])
+    async def serve(request: Request):
+        return RangeFileResponse(str(path), request.headers, filename="video.mp4", method=request.method)
+    
+    return TestClient(app, base_url="http://localhost")
+
+
+def test_parse_range_header_merges_and_clamps():
+    assert parse_range_header("bytes=0-9,5-19,30-", 40) == [(0, 19), (30, 39)]
+    assert parse_range_header("bytes=-5", 40) == [(35, 39)]
+    assert parse_range_header("bytes=50-60", 40) == []
+    assert parse_range_header("items=0-1", 40) is None
+    assert parse_range_header("bytes=abc", 40) is None
+
+
+def test_whole_file(client):
+    response = client.get("/file")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-length"] == str(len(CONTENT))
+
+
+def test_single_range(client):
+    response = client.get("/file", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+
+
+def test_multiple_ranges(client):
+    response = client.get("/file", headers={"Range": "bytes=0-9,-10"})
+    assert response.status_code == 206
+    assert response.headers["content-type"].startswith("multipart/byteranges; boundary=")
+    assert int(response.headers["content-length"]) == len(response.content)
+    assert CONTENT[:10] in response.content
+    assert CONTENT[-10:] in response.content
+
+
+def test_unsatisfiable_range(client):
+    response = client.get("/file", headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+    assert response.content == b""
+
+
+def test_if_range_with_current_etag_honours_range(client):
+    etag = client.head("/file").headers["etag"]
+    response = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert response.status_code == 206
+    assert response.content == CONTENT[:10]
+
+
+def test_if_range_with_stale_validator_sends_whole_file(client):
+    for validator in ('"stale"', "W/" + client.head("/file").headers["etag"], "Thu, 01 Jan 1970 00:00:00 GMT"):
+        response = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": validator})
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+
+def test_if_range_with_last_modified_honours_range(client):
+    last_modified = client.head("/file").headers["last-modified"]
+    response = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": last_modified})
+    assert response.status_code == 206
+
+
+def test_conditional_requests(client):
+    headers = client.head("/file").headers
+    assert client.get("/file", headers={"If-None-Match": headers["etag"]}).status_code == 304
+    assert client.get("/file", headers={"If-None-Match": '"other"'}).status_code == 200
+    assert client.get("/file", headers={"If-Modified-Since": headers["last-modified"]}).status_code == 304
+
+
+def test_head_sends_no_body(client):
+    response = client.head("/file", headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.headers["content-length"] == "10"
+    assert response.content == b""
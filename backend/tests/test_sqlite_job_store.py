@@ -0,0 +1,126 @@
+"""
+Tests for the SQLite job store.
+"""
+
+import pytest
+
+from src.models.download_job import DownloadJob, JobStatus
+from src.models.job_record import JobRecord
+from src.storage.sqlite_job_store import SQLiteJobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), flush_interval=60)
+    yield store
+    store.close()
+
+
+def test_find_by_status_after_save(store):
+    job = DownloadJob(request_id="request-1")
+    store.save(job)
+    
+    assert [found.id for found in store.find_by_status("pending")] == [job.id]
+    assert [found.id for found in store.find_by_status(JobStatus.PENDING)] == [job.id]
+    assert store.find_by_status("processing") == []
+
+
+def test_status_column_holds_values(store):
+    created = DownloadJob(request_id="request-1", status=JobStatus.PROCESSING)
+    loaded = DownloadJob.model_validate_json(DownloadJob(request_id="request-2").model_dump_json())
+    store.save(created)
+    store.save(loaded)
+    store.flush()
+    
+    statuses = sorted(row[0] for row in store._conn.execute("SELECT status FROM jobs"))
+    assert statuses == ["pending", "processing"]
+
+
+def test_status_change_moves_job(store):
+    job = DownloadJob(request_id="request-1")
+    store.save(job)
+    store.flush()
+    
+    job.mark_failed("boom")
+    store.save(job)
+    
+    assert store.find_by_status("pending") == []
+    assert [found.id for found in store.find_by_status("failed")] == [job.id]
+
+
+def test_cache_keeps_finished_jobs_as_records(store):
+    running = DownloadJob(request_id="request-1")
+    finished = DownloadJob(request_id="request-2")
+    finished.mark_completed("/downloads/video.mp4", 1024)
+    store.save(running)
+    store.save(finished)
+    store.flush()
+    
+    # Running jobs stay the live instance the pipeline mutates
+    assert store.get(running.id) is running
+    assert store.peek(running.id) is running
+    
+    record = store.peek(finished.id)
+    assert isinstance(record, JobRecord)
+    rebuilt = store.get(finished.id)
+    assert isinstance(rebuilt, DownloadJob)
+    assert rebuilt.model_dump() == finished.model_dump()
+    assert [found.id for found in store.find_by_status("completed")] == [finished.id]
+
+
+def test_finished_job_read_from_disk_is_cached_as_record(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = SQLiteJobStore(path, flush_interval=60)
+    job = DownloadJob(request_id="request-1")
+    job.mark_failed("boom")
+    store.save(job)
+    store.close()
+    
+    reopened = SQLiteJobStore(path, flush_interval=60)
+    try:
+        assert reopened.get(job.id).error_message == "boom"
+        assert isinstance(reopened.peek(job.id), JobRecord)
+    finally:
+        reopened.close()
+
+
+def test_queries_overlay_unwritten_changes_without_flushing(store):
+    kept = DownloadJob(request_id="request-1")
+    moved = DownloadJob(request_id="request-1")
+    deleted = DownloadJob(request_id="request-1")
+    for job in (kept, moved, deleted):
+        store.save(job)
+    store.flush()
+    
+    moved.mark_failed("boom")
+    store.save(moved)
+    store.delete(deleted.id)
+    added = DownloadJob(request_id="request-1")
+    store.save(added)
+    
+    assert {job.id for job in store.find_by_request_id("request-1")} == {kept.id, moved.id, added.id}
+    assert {job.id for job in store.find_by_status("pending")} == {kept.id, added.id}
+    assert [job.id for job in store.find_by_status("failed")] == [moved.id]
+    assert set(store.all()) == {kept.id, moved.id, added.id}
+    
+    # Nothing was written by the queries
+    rows = dict(store._conn.execute("SELECT id, status FROM jobs"))
+    assert rows == {kept.id: "pending", moved.id: "pending", deleted.id: "pending"}
+
+
+def test_cache_never_evicts_running_jobs(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), flush_interval=60, cache_size=2)
+    try:
+        running = DownloadJob(request_id="request-1")
+        store.save(running)
+        store.flush()
+        for index in range(5):
+            finished = DownloadJob(request_id=f"request-{index + 2}")
+            finished.mark_failed("boom")
+            store.save(finished)
+            store.flush()
+        
+        assert store.get(running.id) is running
+        assert len(store._cache) == 2
+    finally:
+        store.close()
@@ -0,0 +1,91 @@
+"""
+Tests for electing the housekeeping worker and failing jobs of exited workers.
+"""
+
+import asyncio
+import socket
+
+from src.models.download_job import DownloadJob, JobStatus, current_worker_id
+from src.storage.job_notifier import JobNotifier
+from src.storage.job_storage import delete_job, fail_interrupted_jobs, get_job, save_job
+from src.storage.leader_lock import LeaderLock
+
+
+def test_only_one_process_leads_until_it_steps_down(tmp_path):
+    elected = []
+    
+    async def scenario():
+        async def on_elected(name):
+            elected.append(name)
+        
+        path = tmp_path / "leader.lock"
+        first = LeaderLock(str(path), lambda: on_elected("first"), poll_interval=0.01)
+        second = LeaderLock(str(path), lambda: on_elected("second"), poll_interval=0.01)
+        
+        assert await first.start()
+        assert not await second.start()
+        await asyncio.sleep(0.05)
+        assert elected == ["first"]
+        assert not second.is_leader
+        
+        # The lock is released with its descriptor, as when the process exits
+        await first.stop()
+        for _ in range(100):
+            if second.is_leader:
+                break
+            await asyncio.sleep(0.01)
+        await second.stop()
+    
+    asyncio.run(scenario())
+    assert elected == ["first", "second"]
+
+
+def test_probe_reports_live_workers_and_removes_dead_sockets(tmp_path):
+    live_peer = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    live_peer.bind(str(tmp_path / "111-live.sock"))
+    dead_peer = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    dead_peer.bind(str(tmp_path / "222-dead.sock"))
+    dead_peer.close()
+    
+    async def scenario():
+        notifier = JobNotifier(str(tmp_path), lambda job: None)
+        try:
+            assert notifier.start() == 1
+            return notifier.probe(), notifier.departed
+        finally:
+            notifier.stop()
+    
+    try:
+        live_workers, departed = asyncio.run(scenario())
+    finally:
+        live_peer.close()
+    
+    assert live_workers == {"111-live", current_worker_id()}
+    assert departed == 1
+    assert not (tmp_path / "222-dead.sock").exists()
+
+
+def test_jobs_of_exited_workers_fail_while_live_ones_keep_running():
+    jobs = {
+        "own": DownloadJob(request_id="request"),
+        "peer": DownloadJob(request_id="request", worker_id="111-live"),
+        "exited": DownloadJob(request_id="request", worker_id="222-dead"),
+        "legacy": DownloadJob(request_id="request", worker_id=None),
+    }
+    jobs["peer"].update_progress(10, JobStatus.PROCESSING)
+    for job in jobs.values():
+        save_job(job)
+    
+    try:
+        interrupted = fail_interrupted_jobs({current_worker_id(), "111-live"})
+        
+        assert sorted(interrupted) == sorted([jobs["exited"].id, jobs["legacy"].id])
+        assert get_job(jobs["own"].id).status == JobStatus.PENDING
+        assert get_job(jobs["peer"].id).status == JobStatus.PROCESSING
+        assert get_job(jobs["exited"].id).status == JobStatus.FAILED
+        
+        # A cold start fails everything left unfinished
+        assert sorted(fail_interrupted_jobs()) == sorted([jobs["own"].id, jobs["peer"].id])
+    finally:
+        for job in jobs.values():
+            delete_job(job.id)
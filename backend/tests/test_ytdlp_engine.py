@@ -0,0 +1,67 @@
+"""
+Tests for the yt-dlp engines.
+"""
+
+import asyncio
+
+from src.services.ytdlp_engine import PooledEngine
+
+
+def _engine(size, reserved):
+    """A pool whose queues hold placeholder workers instead of processes."""
+    engine = PooledEngine(size=size, max_jobs_per_worker=100, reserved=reserved)
+    engine._idle = asyncio.Queue()
+    engine._reserved = asyncio.Queue()
+    for index in range(size):
+        engine._idle.put_nowait(f"download-{index}")
+    for index in range(reserved):
+        engine._reserved.put_nowait(f"reserved-{index}")
+    return engine
+
+
+def test_metadata_uses_reserved_worker_while_downloads_are_busy():
+    async def scenario():
+        engine = _engine(size=2, reserved=1)
+        busy = [await engine._acquire(light=False) for _ in range(2)]
+        worker, queue = await asyncio.wait_for(engine._acquire(light=True), 1)
+        return busy, worker, queue is engine._reserved
+    
+    busy, worker, from_reserved = asyncio.run(scenario())
+    assert [worker for worker, _ in busy] == ["download-0", "download-1"]
+    assert worker == "reserved-0"
+    assert from_reserved
+
+
+def test_downloads_never_take_reserved_workers():
+    async def scenario():
+        engine = _engine(size=1, reserved=1)
+        await engine._acquire(light=False)
+        try:
+            await asyncio.wait_for(engine._acquire(light=False), 0.05)
+        except asyncio.TimeoutError:
+            return engine._reserved.qsize()
+        return None
+    
+    assert asyncio.run(scenario()) == 1
+
+
+def test_metadata_uses_idle_download_worker_when_reserved_is_busy():
+    async def scenario():
+        engine = _engine(size=1, reserved=1)
+        first, _ = await engine._acquire(light=True)
+        second, queue = await asyncio.wait_for(engine._acquire(light=True), 1)
+        return first, second, queue is engine._idle
+    
+    first, second, from_idle = asyncio.run(scenario())
+    assert first == "reserved-0"
+    assert second == "download-0"
+    assert from_idle
+
+
+def test_without_reserved_workers_metadata_shares_download_workers():
+    async def scenario():
+        engine = _engine(size=1, reserved=0)
+        worker, queue = await asyncio.wait_for(engine._acquire(light=True), 1)
+        return worker, queue is engine._idle
+    
+    assert asyncio.run(scenario()) == ("download-0", True)
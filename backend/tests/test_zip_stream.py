@@ -0,0 +1,102 @@
+"""
+Tests for streamed ZIP archives.
+"""
+
+import asyncio
+import io
+import struct
+import zipfile
+
+import pytest
+
+from src.services.zip_stream import ZipEntry, ZipStream
+
+
+class Zip64Entry(ZipEntry):
+    """An entry written with ZIP64 records whatever its size."""
+    
+    __slots__ = ()
+    
+    @property
+    def zip64(self) -> bool:
+        return True
+
+
+def _build(entries, chunk_size=7):
+    async def collect():
+        return b"".join([chunk async for chunk in ZipStream(entries, chunk_size=chunk_size)])
+    
+    return asyncio.run(collect())
+
+
+def _files(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(bytes(range(256)) * 50)
+    subtitles = tmp_path / "video.en.vtt"
+    subtitles.write_text("WEBVTT\n\n" + "00:00.000 --> 00:01.000\nhello\n\n" * 200)
+    return video, subtitles
+
+
+def test_archive_round_trips(tmp_path):
+    video, subtitles = _files(tmp_path)
+    data = _build([ZipEntry(str(video), "video.mp4"), ZipEntry(str(subtitles), "Vidéo.en.vtt")])
+    
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["video.mp4", "Vidéo.en.vtt"]
+        assert archive.read("video.mp4") == video.read_bytes()
+        assert archive.read("Vidéo.en.vtt") == subtitles.read_bytes()
+        assert archive.getinfo("video.mp4").compress_type == zipfile.ZIP_STORED
+        assert archive.getinfo("Vidéo.en.vtt").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_content_length_is_exact_for_stored_entries(tmp_path):
+    video, subtitles = _files(tmp_path)
+    entries = [ZipEntry(str(video), "a.mp4"), ZipEntry(str(subtitles), "b.vtt", compress=False)]
+    stream = ZipStream(entries)
+    
+    assert stream.content_length() == len(_build(entries))
+    assert ZipStream([ZipEntry(str(subtitles), "b.vtt")]).content_length() is None
+
+
+def test_zip64_entries_round_trip(tmp_path):
+    video, subtitles = _files(tmp_path)
+    entries = [Zip64Entry(str(video), "video.mp4"), Zip64Entry(str(subtitles), "video.en.vtt")]
+    data = _build(entries)
+    
+    assert ZipStream(entries).content_length() is None
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert archive.read("video.mp4") == video.read_bytes()
+        assert archive.read("video.en.vtt") == subtitles.read_bytes()
+    
+    stored = [Zip64Entry(str(video), "video.mp4", compress=False)]
+    assert ZipStream(stored).content_length() == len(_build(stored))
+
+
+def test_end_records_switch_to_zip64_past_four_gigabytes(tmp_path):
+    video, _ = _files(tmp_path)
+    stream = ZipStream([ZipEntry(str(video), "video.mp4")])
+    central_offset = 5 * 1024 ** 3
+    records = stream._end_records(central_offset, 100)
+    
+    signature, _, _, _, _, _, _, _, _, offset = struct.unpack_from("<IQHHIIQQQQ", records)
+    assert signature == 0x06064B50
+    assert offset == central_offset
+    
+    locator = struct.unpack_from("<IIQI", records, 56)
+    assert locator[0] == 0x07064B50
+    assert locator[2] == central_offset + 100
+    
+    end = struct.unpack_from("<IHHHHIIH", records, 76)
+    assert end[0] == 0x06054B50
+    assert end[6] == 0xFFFFFFFF
+
+
+def test_changed_file_is_reported(tmp_path):
+    video, _ = _files(tmp_path)
+    entry = ZipEntry(str(video), "video.mp4")
+    video.write_bytes(b"shorter")
+    
+    with pytest.raises(RuntimeError, match="changed"):
+        _build([entry])
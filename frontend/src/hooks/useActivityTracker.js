@@ -5,8 +5,9 @@ import { apiService } from '../services/api'
  * Hook to track user activity and update server-side activity timestamp
  * This helps with idle monitoring to prevent automatic shutdown
  */
-export const useActivityTracker = (intervalMs = 30000) => { // 30 seconds
+export const useActivityTracker = (intervalMs = 30000, minGapMs = 10000) => { // 30 / 10 seconds
   const intervalRef = useRef(null)
+  const lastSentRef = useRef(0)
 
   useEffect(() => {
     // Function to update activity
@@ -25,8 +26,11 @@ export const useActivityTracker = (intervalMs = 30000) => { // 30 seconds
     // Set up interval to update activity periodically
     intervalRef.current = setInterval(updateActivity, intervalMs)
 
-    // Update activity on user interactions
+    // Update activity on user interactions, at most once per minGapMs
     const handleUserActivity = () => {
+      const now = Date.now()
+      if (now - lastSentRef.current < minGapMs) return
+      lastSentRef.current = now
       updateActivity()
     }
 
@@ -56,7 +60,7 @@ export const useActivityTracker = (intervalMs = 30000) => { // 30 seconds
         document.removeEventListener(event, handleUserActivity, true)
       })
     }
-  }, [intervalMs])
+  }, [intervalMs, minGapMs])
 
   return null // This hook doesn't return anything
 }
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react'
+import React, { useState, useEffect, useCallback, useRef } from 'react'
 import UrlInput from '../components/UrlInput'
 import FormatSelector from '../components/FormatSelector'
 import ProgressIndicator from '../components/ProgressIndicator'
@@ -6,7 +6,7 @@ import DownloadButton from '../components/DownloadButton'
 import LogPanel from '../components/LogPanel'
 import AdvancedOptions from '../components/AdvancedOptions'
 import apiService from '../services/api'
-import sseService from '../services/sse'
+import progressSocketService from '../services/progressSocket'
 
 const DownloadPage = () => {
   // State management
@@ -28,6 +28,7 @@ const DownloadPage = () => {
   const [logs, setLogs] = useState([])
   const [error, setError] = useState('')
   const [metadata, setMetadata] = useState(null)
+  const unsubscribeRef = useRef(null)
 
   // Add log entry
   const addLog = useCallback((level, message) => {
@@ -130,10 +131,11 @@ const DownloadPage = () => {
 
   // Monitor download progress
   const monitorProgress = useCallback((jobId) => {
-    const progressUrl = apiService.getProgressStreamUrl(jobId)
+    unsubscribeRef.current?.()
+    addLog('info', 'Progress monitoring started')
     
-    sseService.connect(
-      progressUrl,
+    unsubscribeRef.current = progressSocketService.subscribe(
+      jobId,
       (data) => {
         setProgress(data.progress)
         setStatus(data.status)
@@ -141,11 +143,9 @@ const DownloadPage = () => {
         if (data.status === 'completed') {
           addLog('info', 'Download completed successfully!')
           setMessage('Download completed! Click "Download File" to save.')
-          sseService.disconnect() // Disconnect when completed
         } else if (data.status === 'failed') {
           addLog('error', 'Download failed')
           setMessage('Download failed. Check logs for details.')
-          sseService.disconnect() // Disconnect when failed
         } else {
           setMessage(`Downloading... ${data.progress}%`)
         }
@@ -154,9 +154,6 @@ const DownloadPage = () => {
         addLog('error', `Progress monitoring error: ${error.message || error}`)
         // Try to get status via polling as fallback
         pollStatus(jobId)
-      },
-      () => {
-        addLog('info', 'Progress monitoring started')
       }
     )
   }, [addLog])
@@ -210,7 +207,7 @@ const DownloadPage = () => {
   // Cleanup on unmount
   useEffect(() => {
     return () => {
-      sseService.disconnect()
+      unsubscribeRef.current?.()
     }
   }, [])
 
@@ -107,6 +107,11 @@ export const apiService = {
     return `${API_BASE_URL}/progress/${jobId}`
   },
 
+  // Get WebSocket path for batched progress of many jobs
+  getProgressSocketUrl() {
+    return `${API_BASE_URL}/progress/ws`
+  },
+
   // Health check
   async healthCheck() {
     try {
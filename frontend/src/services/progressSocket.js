@@ -0,0 +1,138 @@
+import apiService from './api'
+
+const RECONNECT_DELAY_MS = 1000
+const MAX_RECONNECT_DELAY_MS = 15000
+const FINISHED_STATUSES = ['completed', 'failed', 'expired']
+
+// Progress for any number of jobs over a single WebSocket
+class ProgressSocketService {
+  constructor() {
+    this.socket = null
+    this.subscriptions = new Map()
+    this.reconnectDelay = RECONNECT_DELAY_MS
+    this.reconnectTimer = null
+  }
+
+  // Follow a job; returns a function that stops following it
+  subscribe(jobId, onMessage, onError) {
+    this.subscriptions.set(jobId, { onMessage, onError })
+
+    if (this.isConnected()) {
+      this.send('subscribe', [jobId])
+    } else {
+      this.connect()
+    }
+
+    return () => this.unsubscribe(jobId)
+  }
+
+  // Stop following a job, closing the socket when nothing is left
+  unsubscribe(jobId) {
+    if (!this.subscriptions.delete(jobId)) return
+
+    if (this.isConnected()) {
+      this.send('unsubscribe', [jobId])
+    }
+    if (this.subscriptions.size === 0) {
+      this.disconnect()
+    }
+  }
+
+  connect() {
+    if (this.socket || this.reconnectTimer) return
+
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
+    this.socket = new WebSocket(`${protocol}//${window.location.host}${apiService.getProgressSocketUrl()}`)
+    let opened = false
+
+    this.socket.onopen = () => {
+      console.log('Progress socket opened')
+      opened = true
+      this.reconnectDelay = RECONNECT_DELAY_MS
+      // Resubscribe everything, including jobs followed before a reconnect
+      this.send('subscribe', [...this.subscriptions.keys()])
+    }
+
+    this.socket.onmessage = (event) => {
+      let frame
+      try {
+        frame = JSON.parse(event.data)
+      } catch (error) {
+        console.error('Error parsing progress frame:', error)
+        return
+      }
+
+      frame.events?.forEach((data) => {
+        const subscription = this.subscriptions.get(data.job_id)
+        subscription?.onMessage?.(data)
+        // The server drops finished jobs on its own
+        if (FINISHED_STATUSES.includes(data.status)) {
+          this.subscriptions.delete(data.job_id)
+        }
+      })
+
+      frame.errors?.forEach((error) => {
+        console.error('Progress socket error:', error.detail)
+        const subscription = error.job_id && this.subscriptions.get(error.job_id)
+        if (subscription) {
+          this.subscriptions.delete(error.job_id)
+          subscription.onError?.(new Error(error.detail))
+        }
+      })
+
+      if (this.subscriptions.size === 0) {
+        this.disconnect()
+      }
+    }
+
+    this.socket.onclose = () => {
+      this.socket = null
+      if (!opened) {
+        // The server refused the socket; let subscribers fall back to polling
+        const subscriptions = [...this.subscriptions.values()]
+        this.subscriptions.clear()
+        subscriptions.forEach(({ onError }) => onError?.(new Error('Progress socket unavailable')))
+      } else if (this.subscriptions.size > 0) {
+        console.log(`Progress socket closed, reconnecting in ${this.reconnectDelay}ms`)
+        this.reconnectTimer = setTimeout(() => {
+          this.reconnectTimer = null
+          this.connect()
+        }, this.reconnectDelay)
+        this.reconnectDelay = Math.min(this.reconnectDelay * 2, MAX_RECONNECT_DELAY_MS)
+      }
+    }
+
+    this.socket.onerror = (event) => {
+      console.error('Progress socket error:', event)
+    }
+  }
+
+  disconnect() {
+    if (this.reconnectTimer) {
+      clearTimeout(this.reconnectTimer)
+      this.reconnectTimer = null
+    }
+    if (this.socket) {
+      const socket = this.socket
+      this.socket = null
+      socket.onclose = null
+      socket.close()
+    }
+  }
+
+  send(action, jobIds) {
+    if (jobIds.length > 0) {
+      this.socket.send(JSON.stringify({ action, job_ids: jobIds }))
+    }
+  }
+
+  // Check if connected
+  isConnected() {
+    return this.socket && this.socket.readyState === WebSocket.OPEN
+  }
+}
+
+// Create singleton instance
+const progressSocketService = new ProgressSocketService()
+
+export default progressSocketService
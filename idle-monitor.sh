@@ -1,11 +1,15 @@
 #!/bin/bash
 
 # yt-dlp Web UI - Idle Monitor Script
-# Monitors activity and shuts down services after 3 minutes of inactivity
+# Monitors activity and shuts down services after 3 minutes of inactivity.
+# When the backend runs under src.launcher, only the server is stopped:
+# the launcher keeps the port open and starts it again on the next request.
 
 IDLE_TIMEOUT=180  # 3 minutes in seconds
 LOG_FILE="logs/idle-monitor.log"
 LAST_ACTIVITY_FILE=".last_activity"
+BACKEND_WORKER_PID_FILE=".backend-worker.pid"
+ACTIVITY_URL="http://localhost:8000/api/activity"
 
 # Colors for output
 RED='\033[0;31m'
@@ -31,6 +35,32 @@ update_activity() {
     echo $(date +%s) > "$LAST_ACTIVITY_FILE"
 }
 
+# Function to get seconds since the last activity. The backend reports it
+# with running downloads and open progress streams counted as activity;
+# the activity file is the fallback while the backend cannot answer.
+get_idle_seconds() {
+    local idle=$(curl -s --max-time 5 "$ACTIVITY_URL" 2>/dev/null | sed -n 's/.*"idle_seconds":[[:space:]]*\([0-9]*\).*/\1/p')
+    if [ -n "$idle" ]; then
+        echo "$idle"
+        return
+    fi
+    
+    if [ ! -f "$LAST_ACTIVITY_FILE" ]; then
+        update_activity
+    fi
+    local last_activity=$(cat "$LAST_ACTIVITY_FILE")
+    
+    # A server the launcher just started counts as activity
+    if [ -f "$BACKEND_WORKER_PID_FILE" ]; then
+        local worker_started=$(date -r "$BACKEND_WORKER_PID_FILE" +%s 2>/dev/null || echo 0)
+        if [ "$worker_started" -gt "$last_activity" ]; then
+            last_activity=$worker_started
+        fi
+    fi
+    
+    echo $(($(date +%s) - last_activity))
+}
+
 # Function to check if services are running
 check_services() {
     local backend_running=false
@@ -57,6 +87,24 @@ check_services() {
     fi
 }
 
+# Function to check if the launcher has a backend server running
+backend_worker_running() {
+    [ -f "$BACKEND_WORKER_PID_FILE" ] && kill -0 "$(cat "$BACKEND_WORKER_PID_FILE")" 2>/dev/null
+}
+
+# Function to check if the backend runs under the launcher
+launcher_mode() {
+    [ -f ".backend.pid" ] && ps -p "$(cat .backend.pid)" -o args= 2>/dev/null | grep -q "src.launcher"
+}
+
+# Function to stop the backend server, leaving the launcher to restart it
+stop_backend_worker() {
+    local worker_pid=$(cat "$BACKEND_WORKER_PID_FILE")
+    print_warning "No activity detected for $IDLE_TIMEOUT seconds. Stopping backend server (PID: $worker_pid)..."
+    kill "$worker_pid" 2>/dev/null
+    print_success "Backend server stopped; it will start again on the next request"
+}
+
 # Function to shutdown services
 shutdown_services() {
     print_warning "No activity detected for $IDLE_TIMEOUT seconds. Shutting down services..."
@@ -97,21 +145,24 @@ shutdown_services() {
 monitor_api_activity() {
     while true; do
         if check_services; then
+            # Asking a stopped backend would make the launcher start it again
+            if launcher_mode && ! backend_worker_running; then
+                sleep 10
+                continue
+            fi
+            
             # Check if there's been recent API activity
-            if [ -f "$LAST_ACTIVITY_FILE" ]; then
-                local last_activity=$(cat "$LAST_ACTIVITY_FILE")
-                local current_time=$(date +%s)
-                local time_diff=$((current_time - last_activity))
-                
-                if [ $time_diff -ge $IDLE_TIMEOUT ]; then
-                    shutdown_services
+            local time_diff=$(get_idle_seconds)
+            
+            if [ $time_diff -ge $IDLE_TIMEOUT ]; then
+                if launcher_mode; then
+                    stop_backend_worker
                 else
-                    local remaining=$((IDLE_TIMEOUT - time_diff))
-                    print_status "Services active. Shutdown in $remaining seconds if no activity..."
+                    shutdown_services
                 fi
             else
-                # No activity file, create one
-                update_activity
+                local remaining=$((IDLE_TIMEOUT - time_diff))
+                print_status "Services active. Shutdown in $remaining seconds if no activity..."
             fi
         else
             print_status "Services not running, exiting monitor..."
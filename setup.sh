@@ -145,13 +145,15 @@ start_services() {
     
     # Kill any existing processes
     pkill -f "python -m src.main" 2>/dev/null || true
+    pkill -f "python -m src.launcher" 2>/dev/null || true
     pkill -f "npm run dev" 2>/dev/null || true
     
-    # Start backend in background
+    # Start backend in background; the launcher holds port 8000 and starts
+    # the server on the first request, and again after an idle shutdown
     print_status "Starting backend server..."
     cd backend
     source venv/bin/activate
-    nohup python -m src.main > ../logs/backend.log 2>&1 &
+    nohup python -m src.launcher --pid-file ../.backend-worker.pid > ../logs/backend.log 2>&1 &
     BACKEND_PID=$!
     cd ..
     
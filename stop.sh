@@ -34,6 +34,7 @@ if [ -f ".backend.pid" ]; then
 else
     print_status "No backend PID file found, killing any running backend processes..."
     pkill -f "python -m src.main" 2>/dev/null || true
+    pkill -f "python -m src.launcher" 2>/dev/null || true
 fi
 
 # Stop frontend
@@ -72,6 +73,7 @@ fi
 print_status "Cleaning up any remaining processes..."
 pkill -f "vite" 2>/dev/null || true
 pkill -f "uvicorn" 2>/dev/null || true
+rm -f .backend-worker.pid
 
 print_success "🎉 All services stopped successfully!"
 